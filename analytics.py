@@ -0,0 +1,195 @@
+"""
+Application Analytics
+=====================
+Funnel conversion and time-in-stage numbers from the job_events log.
+
+A job's stage history is its 'created' event (initial status) followed by
+its 'status' events. Each status event already carries the stage it left
+(old_value) and how long the job spent there (stage_days, set by the
+trigger), so every figure here is a scan of the user's range of a
+covering index on job_events (each leads with user_id) - no per-job
+pairing of events at read time, which keeps the queries fast at hundreds
+of thousands of events.
+
+SQLite has no MEDIAN or PERCENTILE, so medians and 90th percentiles are
+taken from ROW_NUMBER() over the sorted durations (nearest rank).
+"""
+
+# Summary of a durations(group_key, days) CTE: count, mean, median, p90.
+# Both window functions share one ordered window, so the rows are sorted once
+_DURATION_SUMMARY = """
+    ranked AS (
+        SELECT group_key, days,
+               ROW_NUMBER() OVER by_days AS rank,
+               COUNT(*) OVER (by_days ROWS BETWEEN UNBOUNDED PRECEDING AND UNBOUNDED FOLLOWING) AS total
+        FROM durations
+        WHERE days IS NOT NULL
+        WINDOW by_days AS (PARTITION BY group_key ORDER BY days)
+    )
+    SELECT group_key, MAX(total), AVG(days),
+           AVG(CASE WHEN rank IN ((total + 1) / 2, (total + 2) / 2) THEN days END),
+           MIN(CASE WHEN rank >= 0.9 * total THEN days END)
+    FROM ranked
+    GROUP BY group_key
+"""
+
+
+def _summary(row):
+    count, mean, median, p90 = row[1:]
+    return {
+        'count': count,
+        'mean_days': round(mean, 2),
+        'median_days': round(median, 2),
+        'p90_days': round(p90, 2),
+    }
+
+
+def funnel(cur, user_id):
+    """
+    A user's applications per stage and stage-to-stage conversion.
+
+    Returns:
+        dict: {'applications': jobs with history,
+               'reached': {stage: jobs that were ever in it},
+               'transitions': {"A->B": {'jobs', 'rate'}}} - rate is the
+        share of jobs that were ever in A and moved straight on to B
+    """
+    cur.execute("SELECT COUNT(*) FROM job_events WHERE user_id = ? AND event_type = 'created'", (user_id,))
+    applications = cur.fetchone()[0]
+
+    cur.execute("""
+        SELECT new_value, COUNT(DISTINCT job_id)
+        FROM job_events
+        WHERE user_id = ? AND event_type IN ('created', 'status')
+        GROUP BY new_value
+    """, (user_id,))
+    reached = dict(cur.fetchall())
+
+    cur.execute("""
+        SELECT old_value, new_value, COUNT(DISTINCT job_id)
+        FROM job_events
+        WHERE user_id = ? AND event_type = 'status'
+        GROUP BY old_value, new_value
+    """, (user_id,))
+    transitions = {}
+    for from_stage, to_stage, count in cur.fetchall():
+        transitions[f"{from_stage}->{to_stage}"] = {
+            'jobs': count,
+            'rate': round(count / reached[from_stage], 4) if reached.get(from_stage) else 0.0,
+        }
+
+    return {'applications': applications, 'reached': reached, 'transitions': transitions}
+
+
+def time_in_stage(cur, user_id):
+    """
+    How long a user's jobs stay in each stage before moving on.
+
+    Only finished stays count toward the durations; jobs still in a stage
+    are reported as 'current'.
+
+    Returns:
+        dict: stage -> {'count', 'mean_days', 'median_days', 'p90_days', 'current'}
+    """
+    cur.execute(f"""
+        WITH durations AS (
+            SELECT old_value AS group_key, stage_days AS days
+            FROM job_events
+            WHERE user_id = ? AND event_type = 'status'
+        ),
+        {_DURATION_SUMMARY}
+    """, (user_id,))
+    result = {row[0]: _summary(row) for row in cur.fetchall()}
+
+    cur.execute(
+        "SELECT bucket, count FROM job_stats WHERE user_id = ? AND dimension = 'status' AND count > 0",
+        (user_id,)
+    )
+    for stage, count in cur.fetchall():
+        result.setdefault(stage, {'count': 0, 'mean_days': None, 'median_days': None, 'p90_days': None})
+        result[stage]['current'] = count
+    for stats in result.values():
+        stats.setdefault('current', 0)
+    return result
+
+
+def days_between(cur, user_id, from_stage, to_stage):
+    """
+    Days from first entering from_stage to first reaching to_stage (e.g.
+    Applied -> Interview), over a user's jobs that got there in that order.
+
+    Returns:
+        dict: {'count', 'mean_days', 'median_days', 'p90_days'}, or None if
+        no job went from from_stage to to_stage
+    """
+    cur.execute(f"""
+        WITH starts AS (
+            SELECT job_id, MIN(occurred_at) AS started
+            FROM job_events
+            WHERE user_id = ? AND event_type IN ('created', 'status') AND new_value = ?
+            GROUP BY job_id
+        ),
+        reaches AS (
+            SELECT job_id, MIN(occurred_at) AS reached
+            FROM job_events
+            WHERE user_id = ? AND event_type IN ('created', 'status') AND new_value = ?
+            GROUP BY job_id
+        ),
+        durations AS (
+            SELECT 1 AS group_key, julianday(reached) - julianday(started) AS days
+            FROM starts JOIN reaches USING (job_id)
+            WHERE reached >= started
+        ),
+        {_DURATION_SUMMARY}
+    """, (user_id, from_stage, user_id, to_stage))
+    row = cur.fetchone()
+    return _summary(row) if row else None
+
+
+def backfill_job_events(cur):
+    """
+    Create a best-effort history for jobs that have no events yet.
+
+    Jobs saved before job_events existed only have their current state, so
+    each gets a created event (Applied, at the application date or when it
+    was added), a status event to its current status if that is not
+    Applied, and interview date / ATS score events, all stamped with the
+    job's last change time.
+
+    Args:
+        cur: Database cursor (caller commits)
+
+    Returns:
+        int: Number of jobs backfilled
+    """
+    cur.execute("""
+        SELECT id, user_id, status, interview_date, ats_score,
+               COALESCE(NULLIF(date_applied, ''), date_added) AS applied_at,
+               COALESCE(updated_at, date_added) AS changed_at
+        FROM jobs j
+        WHERE NOT EXISTS (SELECT 1 FROM job_events e WHERE e.job_id = j.id)
+    """)
+    jobs = cur.fetchall()
+
+    events = []
+    for job_id, user_id, status, interview_date, ats_score, applied_at, changed_at in jobs:
+        changed_at = max(changed_at, applied_at)
+        events.append((job_id, 'created', None, 'Applied', applied_at, user_id))
+        if status and status != 'Applied':
+            events.append((job_id, 'status', 'Applied', status, changed_at, user_id))
+        if interview_date:
+            events.append((job_id, 'interview_date', None, interview_date, changed_at, user_id))
+        if ats_score is not None:
+            events.append((job_id, 'ats_score', None, str(ats_score), changed_at, user_id))
+
+    cur.executemany(
+        """
+        INSERT INTO job_events (job_id, event_type, old_value, new_value, occurred_at, user_id, stage_days)
+        VALUES (?1, ?2, ?3, ?4, ?5, ?6,
+                CASE WHEN ?2 = 'status' THEN julianday(?5) - julianday(
+                    (SELECT occurred_at FROM job_events WHERE job_id = ?1 AND event_type = 'created')
+                ) END)
+        """,
+        events
+    )
+    return len(jobs)
@@ -11,152 +11,387 @@ Features:
 - Job-specific keyword extraction and matching (no predefined skills list)
 """
 
-from flask import Flask, render_template, request, redirect, jsonify
-import sqlite3
+from flask import Flask, Blueprint, Response, current_app, render_template, request, redirect, jsonify
+from flask import stream_with_context, g, has_app_context
+from flask import before_render_template, template_rendered
+from markupsafe import Markup, escape
+import click
 import os
-from datetime import datetime
-from PyPDF2 import PdfReader
+import json
+import base64
+import hashlib
+import tempfile
+import time
+from datetime import datetime, timezone
 import re
+import db
+import migrations
+import tasks
+import pdf_extract
+import job_io
+import metrics
+import analytics
+import phrases
+import fragment_cache
+import resume_library
+import reports
+from db import get_db
+import scoring_engine
+from tokenizer import extract_keywords, tokenize, tokenize_many, TOP_KEYWORDS
 
-app = Flask(__name__)
-app.config["UPLOAD_FOLDER"] = "uploads"
-
-# Ensure uploads folder exists
-if not os.path.exists("uploads"):
-    os.makedirs("uploads")
+# Routes, hooks, error handlers and CLI commands; registered by create_app
+bp = Blueprint("jobtracker", __name__, cli_group=None)
 
 # ============================================================
-# DATABASE INITIALIZATION
+# APPLICATION FACTORY
 # ============================================================
 
-def get_db():
-    """Get database connection with row factory for easier data access"""
-    conn = sqlite3.connect("database.db")
-    conn.row_factory = sqlite3.Row  # Access columns by name
-    return conn
+def create_app(config=None, init=True):
+    """
+    Create and configure the Flask application.
+    
+    Importing this module has no side effects; everything happens here.
+    Under a preloading server (see wsgi.py) this runs once in the master
+    process and the configured app is shared by every forked worker.
+    
+    Args:
+        config (dict): Settings overriding the defaults below
+        init (bool): Create the upload folder and migrate the database
+            (off for apps built inside task worker processes)
+    
+    Returns:
+        Flask: The configured application
+    """
+    app = Flask(__name__)
+    app.config["DATABASE"] = db.DEFAULT_DATABASE
+    app.config["DB_POOL_SIZE"] = db.DEFAULT_POOL_SIZE  # Idle connections kept per database
+    app.config["UPLOAD_FOLDER"] = "uploads"
+    app.config["MAX_UPLOAD_BYTES"] = 10 * 1024 * 1024  # Largest accepted resume PDF
+    app.config["MAX_CONTENT_LENGTH"] = app.config["MAX_UPLOAD_BYTES"] + 64 * 1024  # PDF plus form fields
+    app.config["UPLOAD_RETENTION_DAYS"] = 7  # Stored uploads older than this are removed by gc_uploads
+    app.config["UPLOAD_MAX_TOTAL_BYTES"] = 500 * 1024 * 1024  # Size bound for the uploads folder
+    app.config["PDF_CACHE_MAX_BYTES"] = 64 * 1024 * 1024  # Extracted text kept in pdf_text_cache
+    app.config["PDF_MAX_PAGES"] = 20  # Pages read from a resume PDF (0 = all)
+    app.config["PDF_MAX_TEXT_BYTES"] = 1024 * 1024  # Text kept from a resume PDF (0 = unlimited)
+    app.config["PDF_MAX_SECONDS"] = 10  # Extraction time budget per PDF (0 = unlimited)
+    app.config["DASHBOARD_PAGE_SIZE"] = 50  # Jobs per dashboard page
+    app.config["SEARCH_PAGE_SIZE"] = 20  # Results per search page
+    app.config["IMPORT_BATCH_SIZE"] = 1000  # Jobs inserted per executemany during bulk import
+    app.config["MAX_IMPORT_BYTES"] = 200 * 1024 * 1024  # Largest file accepted by /import-jobs
+    app.config["API_PAGE_SIZE"] = 50  # Default items per JSON API page
+    app.config["API_MAX_PAGE_SIZE"] = 500  # Largest ?limit= accepted by the JSON API
+    app.config["SERVER_TIMING"] = False  # Add a Server-Timing header (db, stages, total) to every response
+    app.config["SLOW_REQUEST_SECONDS"] = 1.0  # Log requests slower than this with their breakdown (0 = off)
+    app.config["ASYNC_ANALYSIS"] = True  # Run resume analyses on the background process pool
+    app.config["ANALYSIS_WORKERS"] = None  # Pool size (None = one process per CPU)
+    app.config["SCORE_MODE"] = "legacy"  # Default ATS score: legacy, tfidf or bm25 (see scoring_engine.py)
+    app.config["SKILL_SYNONYMS"] = phrases.DEFAULT_SYNONYMS  # alias -> keyword, e.g. "js" -> "javascript" (see phrases.py)
+    app.config["FRAGMENT_CACHE"] = "memory"  # Rendered dashboard / job dropdown cache: memory, sqlite or off (see fragment_cache.py)
+    app.config["FRAGMENT_CACHE_SIZE"] = 256  # Cached fragments kept before the least recently used are evicted
+    app.config["FRAGMENT_CACHE_TTL"] = 300  # Seconds a cached fragment may be served
+    app.config["FRAGMENT_CACHE_PATH"] = "fragment_cache.db"  # File of the sqlite backend (shared by worker processes)
+    app.config["USER_HEADER"] = None  # Request header naming the signed-in user, set by an authenticating proxy (None = REMOTE_USER only)
+    app.config["DEFAULT_USER"] = "default"  # User of requests that name none (single-user installs)
+    app.config["TENANT_DATABASES"] = {}  # User name -> own SQLite file, for tenants large enough to shard out
+    if config:
+        app.config.update(config)
+        if "MAX_CONTENT_LENGTH" not in config:
+            app.config["MAX_CONTENT_LENGTH"] = app.config["MAX_UPLOAD_BYTES"] + 64 * 1024
+    
+    # Connections are managed per request by db.py (see db.get_db)
+    db.init_app(app)
+    app.extensions['fragment_cache'] = fragment_cache.create_cache(app.config)
+    app.register_blueprint(bp)
+    
+    if init:
+        os.makedirs(app.config["UPLOAD_FOLDER"], exist_ok=True)
+        with app.app_context():
+            init_db()
+        # Forked workers must not inherit the master's SQLite connections
+        db.close_pool()
+    return app
 
 
 def init_db():
     """
-    Initialize the database with the required tables.
-    Called once on first run.
-    
-    Table: jobs
-    - id: Unique job identifier
-    - company: Company name
-    - role: Job position/title
-    - job_description: Full job posting text (for keyword extraction)
-    - status: Applied, Interview, or Rejected
-    - ats_score: ATS match percentage (0-100), NULL if not analyzed yet
-    - date_added: Timestamp when job was added
-    - date_applied: Date when application was submitted
-    - interview_date: Optional date of scheduled interview
-    - notes: Optional notes or comments about the application
+    Bring the database schema up to date.
+    
+    Schema changes live in migrations.py and are applied once each, tracked
+    by PRAGMA user_version; on an up-to-date database this is a single read.
+    Tenant shards (TENANT_DATABASES) are migrated along with DATABASE.
     """
-    conn = get_db()
-    cur = conn.cursor()
+    migrations.migrate(get_db())
+    for path in tenant_shards():
+        conn = db.connect(path)
+        try:
+            migrations.migrate(conn)
+        finally:
+            conn.close()
+
+
+_task_app = None
+
+
+def run_in_app_context(conn, config, func, *args):
+    """
+    Run a task function (see tasks.submit) inside an app context.
     
-    cur.execute("""
-        CREATE TABLE IF NOT EXISTS jobs (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            company TEXT NOT NULL,
-            role TEXT NOT NULL,
-            job_description TEXT,
-            status TEXT DEFAULT 'Applied',
-            ats_score INTEGER,
-            date_added TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            date_applied TEXT,
-            interview_date TEXT,
-            notes TEXT
-        )
-    """)
+    Pool worker processes have no app context of their own, so the first
+    task in each builds an app from the submitting app's config (without
+    init) and reuses it. Tasks run inline already have one. config's
+    DATABASE is the submitting tenant's database (see task_config).
+    """
+    global _task_app
+    if has_app_context():
+        return func(conn, *args)
+    if _task_app is None:
+        _task_app = create_app(config, init=False)
+    with _task_app.app_context():
+        g.tenant_database = config["DATABASE"]
+        return func(conn, *args)
+
+
+def task_config():
+    """Config for tasks.submit, with DATABASE set to the current tenant's database"""
+    return dict(current_app.config, DATABASE=db.database_path())
+
+
+# ============================================================
+# INSTRUMENTATION
+# ============================================================
+
+# Per-request timings and Prometheus histograms live in metrics.py; SQLite
+# time is collected by db.TimedCursor, stages by metrics.stage()
+
+@bp.before_app_request
+def start_request_timer():
+    metrics.begin()
+
+
+@bp.after_app_request
+def record_request_timings(response):
+    """Observe request histograms, add Server-Timing and log slow requests"""
+    timings = metrics.end()
+    if timings is None:
+        return response
     
-    # Add new columns to existing table if they don't exist (backward compatibility)
-    try:
-        cur.execute("ALTER TABLE jobs ADD COLUMN date_applied TEXT")
-    except sqlite3.OperationalError:
-        pass
+    # View name without the blueprint prefix, so labels stay "dashboard" etc.
+    endpoint = request.endpoint.rpartition(".")[2] if request.endpoint else "unmatched"
+    elapsed = timings.elapsed()
+    metrics.REQUEST_DURATION.observe(elapsed, endpoint, request.method, str(response.status_code))
+    metrics.REQUEST_DB_TIME.observe(timings.db_seconds, endpoint)
+    metrics.REQUEST_DB_QUERIES.observe(timings.db_queries, endpoint)
     
-    try:
-        cur.execute("ALTER TABLE jobs ADD COLUMN interview_date TEXT")
-    except sqlite3.OperationalError:
-        pass
+    if current_app.config["SERVER_TIMING"]:
+        response.headers["Server-Timing"] = metrics.server_timing(timings)
     
-    try:
-        cur.execute("ALTER TABLE jobs ADD COLUMN notes TEXT")
-    except sqlite3.OperationalError:
-        pass
+    slow = current_app.config["SLOW_REQUEST_SECONDS"]
+    if slow and elapsed >= slow:
+        current_app.logger.warning(
+            "Slow request %s %s: %.3fs (%s)",
+            request.method, request.full_path.rstrip("?"), elapsed, metrics.server_timing(timings)
+        )
+    return response
+
+
+@bp.teardown_app_request
+def discard_request_timer(e=None):
+    # after_request does not run when a view raises
+    if e is not None:
+        metrics.end()
+
+
+@before_render_template.connect
+def start_render_timer(sender, template, context, **extra):
+    g.render_started = time.perf_counter()
+
+
+@template_rendered.connect
+def record_render_time(sender, template, context, **extra):
+    started = g.pop("render_started", None)
+    if started is not None:
+        metrics.record_stage("render", time.perf_counter() - started)
+
+
+# ============================================================
+# USERS & TENANCY
+# ============================================================
+
+# Every job (with its analyses, tasks, events and statistics) belongs to a
+# user and every query is scoped to the current one. Users are identified
+# by the authenticating proxy or WSGI server in front of the app - this app
+# does no authentication of its own. Tenants listed in TENANT_DATABASES get
+# their own SQLite file (shard) instead of a user_id range in DATABASE.
+
+@bp.before_app_request
+def load_tenant():
+    """Name the request's user and point get_db at their shard, if they have one"""
+    g.user_name = request_user_name()
+    g.tenant_database = current_app.config["TENANT_DATABASES"].get(g.user_name)
+
+
+def request_user_name():
+    """
+    Name of the user making the request.
     
-    conn.commit()
-    conn.close()
+    USER_HEADER (if configured) or the WSGI REMOTE_USER, else DEFAULT_USER.
+    Only set USER_HEADER behind a proxy that sets it and strips it from
+    client requests.
+    """
+    header = current_app.config["USER_HEADER"]
+    name = (request.headers.get(header) if header else None) or request.remote_user
+    return (name or "").strip() or current_app.config["DEFAULT_USER"]
+
+
+def use_tenant(name):
+    """Act as user name for the rest of the app context (CLI commands)"""
+    name = name or current_app.config["DEFAULT_USER"]
+    if "db" in g:
+        db.close_db()
+    g.pop("user_id", None)
+    g.user_name = name
+    g.tenant_database = current_app.config["TENANT_DATABASES"].get(name)
+
+
+def tenant_shards():
+    """Paths of the tenant shard databases (TENANT_DATABASES), without DATABASE"""
+    main = current_app.config["DATABASE"]
+    return sorted(set(current_app.config["TENANT_DATABASES"].values()) - {main})
+
+
+def all_databases():
+    """DATABASE followed by every tenant shard"""
+    return [current_app.config["DATABASE"]] + tenant_shards()
+
+
+def get_user_id(conn, name):
+    """Id of user name in a database, creating the user on first sight"""
+    row = conn.execute("SELECT id FROM users WHERE name = ?", (name,)).fetchone()
+    if row is None:
+        conn.execute("INSERT OR IGNORE INTO users (name) VALUES (?)", (name,))
+        conn.commit()
+        row = conn.execute("SELECT id FROM users WHERE name = ?", (name,)).fetchone()
+    return row[0]
+
 
+def current_user_id():
+    """Id of the current user in the current (tenant's) database"""
+    if "user_id" not in g:
+        name = g.get("user_name") or current_app.config["DEFAULT_USER"]
+        g.user_id = get_user_id(get_db(), name)
+    return g.user_id
 
-# Initialize database on startup
-init_db()
 
 # ============================================================
 # KEYWORD EXTRACTION & ATS MATCHING LOGIC
 # ============================================================
 
-def extract_keywords(text, min_length=3):
+# Tokenizing lives in tokenizer.py (extract_keywords, tokenize); skill phrases
+# and aliases in phrases.py; corpus-weighted scoring (TF-IDF / BM25) lives in
+# scoring_engine.py
+
+def sync_job_keywords(cur, job_id, job_description):
     """
-    Extract meaningful keywords from text using simple frequency analysis.
+    Return the precomputed keywords for a job, rebuilding them if stale.
     
-    Strategy:
-    1. Convert to lowercase and remove special characters
-    2. Split into words
-    3. Filter out common words (stop words)
-    4. Keep words of length >= min_length
-    5. Return sorted by frequency
+    Keywords are stored in the job_keywords table together with a SHA-256
+    hash of the description they were built from. When the stored hash
+    still matches, the keywords are returned without re-tokenizing; when
+    the description changed (or the job was never indexed) they are
+    recomputed and saved, and the job's full term counts are re-indexed
+    for the weighted scoring engine. Called from the add/edit write paths
+    and as a lazy backfill when a job is analyzed.
     
     Args:
-        text (str): Text to extract keywords from
-        min_length (int): Minimum word length to consider (default 3)
+        cur: Database cursor (caller commits)
+        job_id (int): Job identifier
+        job_description (str): Current job description text
     
     Returns:
         list: Keywords sorted by frequency (most common first)
     """
+    content_hash = hashlib.sha256((job_description or "").encode("utf-8")).hexdigest()
     
-    # Common English words to ignore
-    stop_words = {
-        'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for',
-        'of', 'with', 'by', 'from', 'up', 'about', 'as', 'is', 'are', 'be',
-        'been', 'being', 'have', 'has', 'had', 'do', 'does', 'did', 'will',
-        'would', 'could', 'should', 'may', 'might', 'can', 'this', 'that',
-        'these', 'those', 'i', 'you', 'he', 'she', 'it', 'we', 'they', 'your',
-        'our', 'their', 'what', 'which', 'who', 'when', 'where', 'why', 'how',
-        'all', 'each', 'every', 'both', 'few', 'more', 'most', 'other', 'some',
-        'any', 'much', 'many', 'only', 'own', 'same', 'so', 'than', 'too',
-        'very', 'just', 'such', 'no', 'not', 'nor', 'also', 'if', 'because',
-        'if', 'as', 'while', 'although', 'after', 'before', 'during', 'through',
-        'between', 'within', 'without', 'job', 'position', 'role', 'experience'
-    }
-    
-    # Convert to lowercase and remove special characters
-    text = text.lower()
-    # Replace common punctuation with spaces
-    text = re.sub(r'[^a-z0-9\s\+\#\.]', ' ', text)
+    cur.execute(
+        "SELECT content_hash, keywords FROM job_keywords WHERE job_id = ?",
+        (job_id,)
+    )
+    row = cur.fetchone()
+    if row and row[0] == content_hash:
+        return [word for word, count in json.loads(row[1])]
     
-    # Split into words
-    words = text.split()
+    with metrics.stage("tokenize"):
+        term_counts = phrases.job_terms(job_description or "", current_app.config["SKILL_SYNONYMS"])
+        frequencies = term_counts.most_common(TOP_KEYWORDS)
+    scoring_engine.index_job_terms(cur, job_id, term_counts)
+    cur.execute(
+        "INSERT OR REPLACE INTO job_keywords (job_id, content_hash, keywords) VALUES (?, ?, ?)",
+        (job_id, content_hash, json.dumps(frequencies))
+    )
+    return [word for word, count in frequencies]
+
+
+def index_all_jobs(cur, user_id):
+    """Index every job of a user that has no keyword entry yet (see sync_job_keywords)"""
+    cur.execute("""
+        SELECT j.id, j.job_description FROM jobs j
+        LEFT JOIN job_keywords k ON k.job_id = j.id
+        WHERE j.user_id = ? AND k.job_id IS NULL
+    """, (user_id,))
+    for job_id, job_description in cur.fetchall():
+        sync_job_keywords(cur, job_id, job_description)
+
+
+def index_new_jobs(cur, jobs, user_id):
+    """
+    Precompute keywords and corpus terms for many freshly inserted jobs.
     
-    # Filter words: remove stop words, keep meaningful ones
-    keywords = [
-        word for word in words 
-        if len(word) >= min_length and word not in stop_words
-    ]
+    Batch counterpart of sync_job_keywords for jobs that have never been
+    indexed: descriptions are tokenized in one call and every table is
+    written with a single executemany.
     
-    # Count frequency and return sorted by count
-    from collections import Counter
-    word_freq = Counter(keywords)
+    Args:
+        cur: Database cursor (caller commits)
+        jobs (list): (job_id, job_description) pairs
+        user_id (int): Owner of all the jobs
+    """
+    descriptions = [job_description or "" for job_id, job_description in jobs]
+    synonyms = current_app.config["SKILL_SYNONYMS"]
+    with metrics.stage("tokenize"):
+        token_lists = tokenize_many(descriptions)
+        term_count_lists = [
+            phrases.job_terms(description, synonyms, tokens)
+            for description, tokens in zip(descriptions, token_lists)
+        ]
+    job_term_counts = {}
+    keyword_rows = []
+    for (job_id, job_description), term_counts in zip(jobs, term_count_lists):
+        job_term_counts[job_id] = term_counts
+        content_hash = hashlib.sha256((job_description or "").encode("utf-8")).hexdigest()
+        keyword_rows.append((job_id, content_hash, json.dumps(term_counts.most_common(TOP_KEYWORDS))))
     
-    # Return top keywords (limit to 50 to avoid noise)
-    top_keywords = [word for word, count in word_freq.most_common(50)]
+    cur.executemany(
+        "INSERT OR REPLACE INTO job_keywords (job_id, content_hash, keywords) VALUES (?, ?, ?)",
+        keyword_rows
+    )
+    scoring_engine.index_new_jobs_terms(cur, job_term_counts, user_id)
+
+
+def find_resume_phrases(cur, resume_text, user_id):
+    """
+    Phrase and alias keywords in a resume ("machine learning", "js" as
+    "javascript"), found in one pass of the phrase automaton of a user's jobs.
     
-    return top_keywords
+    Returns:
+        list: Keywords found (see phrases.resume_phrases)
+    """
+    with metrics.stage("tokenize"):
+        return phrases.resume_phrases(
+            cur, resume_text, current_app.config["SKILL_SYNONYMS"], user_id, db.database_path()
+        )
 
 
-def calculate_ats_score(resume_text, job_description):
+def calculate_ats_score(resume_text, job_description, job_keywords=None, resume_keywords=None):
     """
     Calculate ATS match score between resume and job description.
     
@@ -169,6 +404,10 @@ def calculate_ats_score(resume_text, job_description):
     Args:
         resume_text (str): Full text extracted from resume PDF
         job_description (str): Full job posting text
+        job_keywords (list): Optional precomputed job keywords
+            (see sync_job_keywords); extracted from job_description if omitted
+        resume_keywords (list): Optional precomputed resume keywords
+            (see get_cached_pdf_text); extracted from resume_text if omitted
     
     Returns:
         tuple: (match_percentage, matched_keywords, missing_keywords)
@@ -180,9 +419,13 @@ def calculate_ats_score(resume_text, job_description):
     if not resume_text or not job_description:
         return 0, [], []
     
-    # Extract keywords from both texts
-    job_keywords = set(extract_keywords(job_description))
-    resume_keywords = set(extract_keywords(resume_text))
+    # Extract keywords from both texts (job side may be precomputed)
+    if job_keywords is None:
+        job_keywords = extract_keywords(job_description)
+    job_keywords = set(job_keywords)
+    if resume_keywords is None:
+        resume_keywords = extract_keywords(resume_text)
+    resume_keywords = set(resume_keywords)
     
     # Find matches and misses
     matched = list(job_keywords & resume_keywords)  # Intersection
@@ -202,6 +445,206 @@ def calculate_ats_score(resume_text, job_description):
     return match_percentage, matched, missing
 
 
+def score_resume_against_jobs(cur, user_id, resume_text, status=None, job_ids=None, resume_keywords=None,
+                              resume_hash=None, score_mode="legacy"):
+    """
+    Score one resume against many of a user's saved jobs in a single pass.
+    
+    The resume is tokenized once, then matched through an inverted
+    keyword -> job index built from the precomputed job_keywords table,
+    so each job costs a few dictionary lookups instead of a full
+    calculate_ats_score call. Scores use the same formula as
+    calculate_ats_score; those that changed are written back to
+    jobs.ats_score with a single executemany (each logs its job_events
+    row). With a weighted score_mode (tfidf, bm25) the stored and ranked
+    score comes from scoring_engine instead, computed against the whole
+    job-term matrix at once; the legacy percentage is still reported as
+    legacy_score.
+    
+    Args:
+        cur: Database cursor (caller commits)
+        user_id (int): Owner of the jobs to score
+        resume_text (str): Full text extracted from resume PDF
+        status (str): Optional status filter (Applied, Interview, Rejected)
+        job_ids (list): Optional list of job ids to restrict scoring to
+        resume_keywords (list): Optional precomputed resume keywords
+        resume_hash (str): SHA-256 of the resume; when given, each result is
+            also stored in the analyses table
+        score_mode (str): legacy, tfidf or bm25
+    
+    Returns:
+        list: One dict per scored job (id, company, role, status, ats_score,
+        legacy_score, matched_keywords, missing_keywords), best match first
+    """
+    query = """
+        SELECT j.id, j.company, j.role, j.status, j.ats_score, k.keywords
+        FROM jobs j
+        LEFT JOIN job_keywords k ON k.job_id = j.id
+        WHERE j.user_id = ? AND j.job_description IS NOT NULL AND TRIM(j.job_description) != ''
+    """
+    params = [user_id]
+    if status:
+        query += " AND j.status = ?"
+        params.append(status)
+    if job_ids:
+        query += f" AND j.id IN ({', '.join('?' * len(job_ids))})"
+        params.extend(job_ids)
+    cur.execute(query, params)
+    rows = cur.fetchall()
+    
+    # Build the inverted index: keyword -> ids of jobs that want it
+    jobs = {}
+    index = {}
+    for row in rows:
+        if row['keywords'] is None:
+            # Job saved before keyword indexing existed - backfill it now
+            cur.execute("SELECT job_description FROM jobs WHERE id = ?", (row['id'],))
+            keywords = sync_job_keywords(cur, row['id'], cur.fetchone()[0])
+        else:
+            keywords = [word for word, count in json.loads(row['keywords'])]
+        jobs[row['id']] = (row, keywords)
+        for word in keywords:
+            index.setdefault(word, []).append(row['id'])
+    
+    # Walk the postings of each resume keyword (and phrase) once
+    if resume_keywords is None:
+        with metrics.stage("tokenize"):
+            resume_keywords = extract_keywords(resume_text)
+    if score_mode != "legacy":
+        index_all_jobs(cur, user_id)
+    resume_phrases = find_resume_phrases(cur, resume_text, user_id)
+    
+    weighted = None
+    if score_mode != "legacy":
+        with metrics.stage("score"):
+            weighted = scoring_engine.weighted_scores(
+                cur, resume_text, score_mode, user_id, db.database_path(),
+                resume_terms=set(tokenize(resume_text)).union(resume_phrases)
+            )
+    
+    with metrics.stage("score"):
+        matches = {job_id: [] for job_id in jobs}
+        for word in set(resume_keywords).union(resume_phrases):
+            for job_id in index.get(word, ()):
+                matches[job_id].append(word)
+        
+        results = []
+        for job_id, (row, keywords) in jobs.items():
+            matched = sorted(matches[job_id])
+            matched_set = set(matched)
+            missing = sorted(word for word in keywords if word not in matched_set)
+            score = int((len(matched) / len(keywords)) * 100) if keywords else 0
+            results.append({
+                'id': job_id,
+                'company': row['company'],
+                'role': row['role'],
+                'status': row['status'],
+                'ats_score': weighted.get(job_id, 0) if weighted is not None else score,
+                'legacy_score': score,
+                'matched_keywords': matched,
+                'missing_keywords': missing,
+            })
+    
+    changed = [(result['ats_score'], result['id']) for result in results
+               if result['ats_score'] != jobs[result['id']][0]['ats_score']]
+    cur.executemany("UPDATE jobs SET ats_score = ? WHERE id = ?", changed)
+    if resume_hash:
+        resume_library.save_resume(
+            cur, user_id, resume_hash, resume_text, resume_keywords, current_app.config["SKILL_SYNONYMS"]
+        )
+        cur.executemany(
+            """
+            INSERT INTO analyses (user_id, job_id, resume_hash, ats_score, score_mode, matched_keywords, missing_keywords)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+            [(user_id, result['id'], resume_hash, result['ats_score'], score_mode,
+              encode_keywords(result['matched_keywords']), encode_keywords(result['missing_keywords']))
+             for result in results]
+        )
+    
+    results.sort(key=lambda result: (-result['ats_score'], result['company'].lower()))
+    return results
+
+
+def encode_keywords(keywords):
+    """Encode a keyword list for storage (one keyword per line)"""
+    return "\n".join(keywords)
+
+
+def decode_keywords(encoded):
+    """Decode a keyword list stored by encode_keywords"""
+    return encoded.split("\n") if encoded else []
+
+
+def save_analysis(cur, job_id, resume_hash, ats_score, matched_keywords, missing_keywords,
+                  score_mode="legacy"):
+    """
+    Store the full result of one analysis run in the analyses table.
+    
+    Every run is kept, so earlier analyses of a job stay available for
+    comparison and reports never need the resume to be uploaded again.
+    The analysis belongs to the job's user.
+    
+    Returns:
+        int: New analysis id
+    """
+    cur.execute(
+        """
+        INSERT INTO analyses (user_id, job_id, resume_hash, ats_score, score_mode, matched_keywords, missing_keywords)
+        VALUES ((SELECT user_id FROM jobs WHERE id = ?1), ?1, ?, ?, ?, ?, ?)
+        """,
+        (job_id, resume_hash, ats_score, score_mode,
+         encode_keywords(matched_keywords), encode_keywords(missing_keywords))
+    )
+    return cur.lastrowid
+
+
+def get_analyses(cur, job_id, limit=None):
+    """
+    Return the stored analyses of a job, newest first.
+    
+    Returns:
+        list: dicts with id, job_id, resume_hash, ats_score, score_mode,
+        matched_keywords, missing_keywords and created_at
+    """
+    query = """
+        SELECT id, job_id, resume_hash, ats_score, matched_keywords, missing_keywords, created_at, score_mode
+        FROM analyses WHERE job_id = ? ORDER BY created_at DESC, id DESC
+    """
+    params = [job_id]
+    if limit:
+        query += " LIMIT ?"
+        params.append(limit)
+    cur.execute(query, params)
+    return [_analysis_dict(row) for row in cur.fetchall()]
+
+
+def get_analysis(cur, analysis_id, user_id):
+    """Return one stored analysis of a user (see get_analyses) or None"""
+    cur.execute(
+        """
+        SELECT id, job_id, resume_hash, ats_score, matched_keywords, missing_keywords, created_at, score_mode
+        FROM analyses WHERE id = ? AND user_id = ?
+        """,
+        (analysis_id, user_id)
+    )
+    row = cur.fetchone()
+    return _analysis_dict(row) if row else None
+
+
+def _analysis_dict(row):
+    return {
+        'id': row[0],
+        'job_id': row[1],
+        'resume_hash': row[2],
+        'ats_score': row[3],
+        'matched_keywords': decode_keywords(row[4]),
+        'missing_keywords': decode_keywords(row[5]),
+        'created_at': row[6],
+        'score_mode': row[7],
+    }
+
+
 def get_resume_improvement_suggestions(match_score, missing_keywords_count, missing_keywords):
     """
     Generate actionable improvement suggestions based on ATS analysis.
@@ -274,449 +717,1925 @@ def get_resume_improvement_suggestions(match_score, missing_keywords_count, miss
 
 
 # ============================================================
-# ROUTES
+# RESUME PARSING
 # ============================================================
 
-@app.route("/")
-def index():
-    """Home page - shows overview and navigation"""
-    return render_template("index.html")
-
-
-@app.route("/add-job", methods=["GET", "POST"])
-def add_job():
+def extract_pdf_text(source):
     """
-    Add Job Route
+    Stream the text of a PDF page by page within the configured budgets.
     
-    GET: Display form for adding a new job
-    POST: Save job with company name, role, description, status, and optional dates
+    Extraction stops early at PDF_MAX_PAGES pages, PDF_MAX_TEXT_BYTES of
+    text or PDF_MAX_SECONDS; see pdf_extract.py.
     
-    Important: Job description is stored for ATS analysis later.
-    """
-    if request.method == "POST":
-        # Get form data
-        company = request.form.get("company", "").strip()
-        role = request.form.get("role", "").strip()
-        job_description = request.form.get("job_description", "").strip()
-        status = request.form.get("status", "Applied")
-        date_applied = request.form.get("date_applied", "").strip()
-        interview_date = request.form.get("interview_date", "").strip()
-        notes = request.form.get("notes", "").strip()
-        
-        # Validate required fields
-        errors = []
-        if not company:
-            errors.append("Company name is required")
-        if not role:
-            errors.append("Job role is required")
-        if not job_description:
-            errors.append("Job description is required for ATS analysis")
-        
-        if errors:
-            return render_template("add_job.html", errors=errors)
-        
-        # Save to database
-        conn = get_db()
-        cur = conn.cursor()
-        
-        cur.execute("""
-            INSERT INTO jobs (company, role, job_description, status, date_applied, interview_date, notes)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        """, (company, role, job_description, status, date_applied if date_applied else None, 
-              interview_date if interview_date else None, notes if notes else None))
-        
-        conn.commit()
-        conn.close()
-        
-        # Redirect to dashboard to see the new job
-        return redirect("/dashboard")
+    Args:
+        source: Path to the PDF file or a binary file-like object
     
-    # GET request - show the form
-    return render_template("add_job.html")
+    Returns:
+        pdf_extract.PdfExtraction: text ("" if no page had extractable
+        text), keyword counts, truncation reason and per-page timings
+    """
+    return pdf_extract.extract_pdf(
+        source,
+        max_pages=current_app.config["PDF_MAX_PAGES"],
+        max_bytes=current_app.config["PDF_MAX_TEXT_BYTES"],
+        max_seconds=current_app.config["PDF_MAX_SECONDS"],
+    )
 
 
-@app.route("/dashboard")
-def dashboard():
+def hash_file(filepath):
+    """Return the SHA-256 hex digest of a file, read in chunks"""
+    digest = hashlib.sha256()
+    with open(filepath, "rb") as f:
+        for chunk in iter(lambda: f.read(UPLOAD_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def count_cache_lookup(cur, cache, hit):
+    """Record a cache hit or miss in cache_counters (shared by all processes)"""
+    column = "hits" if hit else "misses"
+    cur.execute(
+        f"""
+        INSERT INTO cache_counters (name, {column}) VALUES (?, 1)
+        ON CONFLICT (name) DO UPDATE SET {column} = {column} + 1
+        """,
+        (cache,)
+    )
+
+
+def get_cached_pdf_text(cur, file_hash, filepath):
     """
-    Dashboard Route
+    Extract PDF text, reusing earlier results for identical files.
     
-    Shows:
-    - Summary cards: Total, Applied, Interview, Rejected counts
-    - Table with all jobs:
-      - Company name
-      - Job role
-      - Application status
-      - ATS match percentage (if analyzed)
-    """
-    conn = get_db()
-    cur = conn.cursor()
+    Results are cached in the pdf_text_cache table under the SHA-256 of
+    the PDF file, so uploading the same resume again (e.g. for another
+    job) skips PyPDF2 entirely. The cache holds at most
+    PDF_CACHE_MAX_BYTES of text; the least recently used entries are
+    evicted first. Extraction statistics (pages read, truncation, per-page
+    timings) are stored next to the text.
     
-    # Get all jobs from database
-    cur.execute("SELECT * FROM jobs ORDER BY date_added DESC")
-    jobs = cur.fetchall()
+    Args:
+        cur: Database cursor (caller commits)
+        file_hash (str): SHA-256 hex digest of the PDF (see store_upload)
+        filepath (str): Path to the PDF, only read on a cache miss
     
-    # Get count statistics
-    cur.execute("SELECT COUNT(*) FROM jobs")
-    total = cur.fetchone()[0]
+    Returns:
+        tuple: (page_count, text, keywords)
+    """
+    cur.execute(
+        "SELECT page_count, text, keywords FROM pdf_text_cache WHERE file_hash = ?",
+        (file_hash,)
+    )
+    row = cur.fetchone()
+    if row:
+        count_cache_lookup(cur, 'pdf_text_cache', hit=True)
+        cur.execute(
+            "UPDATE pdf_text_cache SET last_used = julianday('now') WHERE file_hash = ?",
+            (file_hash,)
+        )
+        return row[0], row[1], json.loads(row[2])
     
-    cur.execute("SELECT COUNT(*) FROM jobs WHERE status='Applied'")
-    applied = cur.fetchone()[0]
+    count_cache_lookup(cur, 'pdf_text_cache', hit=False)
     
-    cur.execute("SELECT COUNT(*) FROM jobs WHERE status='Interview'")
-    interview = cur.fetchone()[0]
+    started = time.perf_counter()
+    extraction = extract_pdf_text(filepath)
+    metrics.record_stage("pdf_parse", time.perf_counter() - started - extraction.tokenize_seconds)
+    metrics.record_stage("tokenize", extraction.tokenize_seconds)
+    page_count, text, keywords = extraction.page_count, extraction.text, extraction.keywords()
+    if extraction.truncated:
+        current_app.logger.warning(
+            "PDF %s truncated by %s budget after %d of %d pages",
+            file_hash, extraction.truncated, extraction.pages_read, page_count
+        )
     
-    cur.execute("SELECT COUNT(*) FROM jobs WHERE status='Rejected'")
-    rejected = cur.fetchone()[0]
+    size = len(text.encode("utf-8"))
+    cur.execute(
+        """
+        INSERT OR REPLACE INTO pdf_text_cache (file_hash, page_count, text, keywords, size, extraction, last_used)
+        VALUES (?, ?, ?, ?, ?, ?, julianday('now'))
+        """,
+        (file_hash, page_count, text, json.dumps(keywords), size, json.dumps(extraction.stats()))
+    )
     
-    conn.close()
+    # Evict least recently used entries beyond the size bound
+    cur.execute("""
+        DELETE FROM pdf_text_cache WHERE file_hash IN (
+            SELECT file_hash FROM (
+                SELECT file_hash, SUM(size) OVER (ORDER BY last_used DESC, file_hash) AS running
+                FROM pdf_text_cache
+            ) WHERE running > ?
+        )
+    """, (current_app.config["PDF_CACHE_MAX_BYTES"],))
     
-    return render_template(
-        "dashboard.html",
-        jobs=jobs,
-        total=total,
-        applied=applied,
-        interview=interview,
-        rejected=rejected
-    )
+    return page_count, text, keywords
 
 
-@app.route("/edit-job", methods=["GET", "POST"])
-def edit_job():
+# ============================================================
+# UPLOAD STORAGE
+# ============================================================
+
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+
+def store_upload(file):
     """
-    Edit Job Route
+    Stream an uploaded file into content-addressed storage.
     
-    GET: Display form pre-filled with job details
-    POST: Update job with new information (status, dates, notes, etc.)
-    
-    Does NOT require resume re-upload; uses existing ATS score
-    """
-    job_id = request.args.get("job_id") or request.form.get("job_id")
+    The upload is copied chunk by chunk into a temporary file inside the
+    uploads folder while its SHA-256 is computed, then atomically renamed
+    to uploads/<sha256>.pdf. Identical files therefore share one path,
+    concurrent uploads with the same filename never overwrite each other,
+    and a half-written file is never visible under its final name.
     
-    if not job_id:
-        return redirect("/dashboard")
+    Args:
+        file: Uploaded file (werkzeug FileStorage)
     
-    conn = get_db()
-    cur = conn.cursor()
-    cur.execute("SELECT * FROM jobs WHERE id = ?", (job_id,))
-    job = cur.fetchone()
-    conn.close()
+    Returns:
+        tuple: (file_hash, filepath)
     
-    if not job:
-        return redirect("/dashboard")
+    Raises:
+        ValueError: If the file is larger than MAX_UPLOAD_BYTES
+    """
+    folder = current_app.config["UPLOAD_FOLDER"]
+    max_bytes = current_app.config["MAX_UPLOAD_BYTES"]
     
-    if request.method == "POST":
-        # Get form data
-        company = request.form.get("company", "").strip()
-        role = request.form.get("role", "").strip()
-        job_description = request.form.get("job_description", "").strip()
-        status = request.form.get("status", "Applied")
-        date_applied = request.form.get("date_applied", "").strip()
-        interview_date = request.form.get("interview_date", "").strip()
-        notes = request.form.get("notes", "").strip()
-        
-        # Validate required fields
-        errors = []
-        if not company:
-            errors.append("Company name is required")
-        if not role:
-            errors.append("Job role is required")
-        
-        if errors:
-            return render_template("edit_job.html", job=job, errors=errors)
-        
-        # Update database
-        conn = get_db()
-        cur = conn.cursor()
-        
-        cur.execute("""
-            UPDATE jobs 
-            SET company=?, role=?, job_description=?, status=?, date_applied=?, interview_date=?, notes=?
-            WHERE id=?
-        """, (company, role, job_description, status, 
-              date_applied if date_applied else None, 
-              interview_date if interview_date else None, 
-              notes if notes else None, 
-              job_id))
-        
-        conn.commit()
-        conn.close()
+    digest = hashlib.sha256()
+    size = 0
+    fd, temp_path = tempfile.mkstemp(dir=folder, prefix=".upload-", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            for chunk in iter(lambda: file.stream.read(UPLOAD_CHUNK_SIZE), b""):
+                size += len(chunk)
+                if size > max_bytes:
+                    raise ValueError(
+                        f"File is too large. Please upload a PDF under {max_bytes // (1024 * 1024)}MB."
+                    )
+                digest.update(chunk)
+                out.write(chunk)
         
-        return redirect("/dashboard")
+        file_hash = digest.hexdigest()
+        filepath = os.path.join(folder, file_hash + ".pdf")
+        if os.path.exists(filepath):
+            # Duplicate upload - keep the stored copy, refresh it for retention
+            os.remove(temp_path)
+            os.utime(filepath)
+        else:
+            os.replace(temp_path, filepath)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
     
-    # GET request - show the form with pre-filled data
-    return render_template("edit_job.html", job=job)
+    return file_hash, filepath
 
 
-@app.route("/export-results/<int:job_id>")
-def export_results(job_id):
+def gc_uploads(now=None):
     """
-    Export ATS analysis results as a professional text report.
+    Remove stored uploads past their retention period or over the size bound.
     
-    Generates a summary including:
-    - Job and company details
-    - ATS match score with interpretation
-    - Matched keywords
-    - Missing keywords
-    - Actionable improvement suggestions
+    Files older than UPLOAD_RETENTION_DAYS are deleted first; if the folder
+    is still larger than UPLOAD_MAX_TOTAL_BYTES, the least recently
+    uploaded files are deleted until it fits. Files of queued or running
+    analysis tasks (in any tenant database) are never deleted. Leftover
+    temporary files from interrupted uploads are removed after an hour.
+    
+    Returns:
+        dict: {'removed': number of files deleted, 'kept': files left, 'bytes': bytes left}
     """
+    folder = current_app.config["UPLOAD_FOLDER"]
+    now = now or time.time()
+    retention_cutoff = now - current_app.config["UPLOAD_RETENTION_DAYS"] * 86400
     
-    conn = get_db()
-    cur = conn.cursor()
-    cur.execute("SELECT * FROM jobs WHERE id = ?", (job_id,))
-    job = cur.fetchone()
-    conn.close()
+    in_use = set()
+    for path in all_databases():
+        conn = db.connect(path)
+        try:
+            in_use.update(file_hash + ".pdf" for file_hash in tasks.pending_files(conn))
+        finally:
+            conn.close()
+    
+    removed = 0
+    files = []
+    pinned = 0
+    total = 0
+    for entry in os.scandir(folder):
+        if not entry.is_file():
+            continue
+        stat = entry.stat()
+        is_temp = entry.name.startswith(".upload-")
+        if entry.name in in_use:
+            pinned += 1
+            total += stat.st_size
+        elif (is_temp and stat.st_mtime < now - 3600) or (not is_temp and stat.st_mtime < retention_cutoff):
+            os.remove(entry.path)
+            removed += 1
+        elif not is_temp:
+            files.append((stat.st_mtime, stat.st_size, entry.path))
+    
+    # Enforce the total size bound, oldest files first
+    files.sort()
+    total += sum(size for mtime, size, path in files)
+    while files and total > current_app.config["UPLOAD_MAX_TOTAL_BYTES"]:
+        mtime, size, path = files.pop(0)
+        os.remove(path)
+        total -= size
+        removed += 1
+    
+    return {'removed': removed, 'kept': len(files) + pinned, 'bytes': total}
+
+
+# ============================================================
+# JOB SEARCH
+# ============================================================
+
+# Relevance weights of the jobs_fts columns (company, role, job_description, notes)
+SEARCH_COLUMN_WEIGHTS = (10.0, 5.0, 1.0, 2.0)
+
+# Control characters wrapped around matches by snippet(), replaced after escaping
+_MATCH_START = "\x02"
+_MATCH_END = "\x03"
+
+
+def fts_query(text):
+    """
+    Turn free text typed by a user into a safe FTS5 MATCH expression.
+    
+    Every word becomes a quoted prefix term and all terms must match, so
+    FTS5 operators and punctuation in the input can never cause a syntax
+    error ("node.js dev" -> "node"* "js"* "dev"*).
+    
+    Returns:
+        str: MATCH expression, or "" if the text contains no words
+    """
+    words = re.findall(r"\w+", text.lower())
+    return " ".join(f'"{word}"*' for word in words)
+
+
+def highlight_snippet(snippet):
+    """Escape a jobs_fts snippet and mark the matched terms with <mark>"""
+    escaped = str(escape(snippet or ""))
+    return Markup(escaped.replace(_MATCH_START, "<mark>").replace(_MATCH_END, "</mark>"))
+
+
+def search_jobs(cur, user_id, query, page=1, per_page=20):
+    """
+    Full-text search over the company, role, job description and notes of
+    a user's jobs.
+    
+    Matches come from the jobs_fts index (kept in sync by triggers), ranked
+    by BM25 with SEARCH_COLUMN_WEIGHTS so hits in the company or role
+    outrank hits buried in a description.
+    
+    Args:
+        cur: Database cursor
+        user_id (int): Owner of the jobs to search
+        query (str): Search text as typed by the user
+        page (int): 1-based page number
+        per_page (int): Results per page
+    
+    Returns:
+        dict: {'query', 'total', 'page', 'page_count', 'results'}; each
+        result has id, company, role, status, ats_score, date_added and
+        snippet (HTML with <mark>-highlighted matches)
+    """
+    match = fts_query(query)
+    if not match:
+        return {'query': query, 'total': 0, 'page': 1, 'page_count': 1, 'results': []}
+    
+    cur.execute("""
+        SELECT COUNT(*) FROM jobs_fts
+        JOIN jobs j ON j.id = jobs_fts.rowid
+        WHERE jobs_fts MATCH ? AND j.user_id = ?
+    """, (match, user_id))
+    total = cur.fetchone()[0]
+    page_count = max((total + per_page - 1) // per_page, 1)
+    page = min(max(page, 1), page_count)
+    
+    weights = ", ".join(str(weight) for weight in SEARCH_COLUMN_WEIGHTS)
+    cur.execute(f"""
+        SELECT j.id, j.company, j.role, j.status, j.ats_score, j.date_added,
+               snippet(jobs_fts, -1, ?, ?, '…', 16) AS snippet
+        FROM jobs_fts
+        JOIN jobs j ON j.id = jobs_fts.rowid
+        WHERE jobs_fts MATCH ? AND j.user_id = ?
+        ORDER BY bm25(jobs_fts, {weights}), j.id DESC
+        LIMIT ? OFFSET ?
+    """, (_MATCH_START, _MATCH_END, match, user_id, per_page, (page - 1) * per_page))
+    
+    results = []
+    for row in cur.fetchall():
+        result = dict(row)
+        result['snippet'] = highlight_snippet(row['snippet'])
+        results.append(result)
+    
+    return {'query': query, 'total': total, 'page': page, 'page_count': page_count, 'results': results}
+
+
+# ============================================================
+# BULK IMPORT / EXPORT
+# ============================================================
+
+# Invalid rows listed in an import report (the rest are only counted)
+IMPORT_MAX_REPORTED_ERRORS = 100
+
+# Export datasets: name -> (columns, query with a user_id parameter)
+EXPORT_DATASETS = {
+    'jobs': (
+        ['id', 'company', 'role', 'job_description', 'status', 'ats_score',
+         'date_added', 'date_applied', 'interview_date', 'notes'],
+        """
+        SELECT id, company, role, job_description, status, ats_score,
+               date_added, date_applied, interview_date, notes
+        FROM jobs WHERE user_id = ? ORDER BY id
+        """,
+    ),
+    'analyses': (
+        ['id', 'job_id', 'company', 'role', 'resume_hash', 'ats_score', 'score_mode',
+         'matched_keywords', 'missing_keywords', 'created_at'],
+        """
+        SELECT a.id, a.job_id, j.company, j.role, a.resume_hash, a.ats_score, a.score_mode,
+               a.matched_keywords, a.missing_keywords, a.created_at
+        FROM analyses a LEFT JOIN jobs j ON j.id = a.job_id
+        WHERE a.user_id = ?
+        ORDER BY a.id
+        """,
+    ),
+}
+
+
+def _insert_job_batch(cur, batch, user_id):
+    """Insert validated job rows for a user with one executemany and index them"""
+    cur.execute("SELECT COALESCE(MAX(id), 0) FROM jobs")
+    last_id = cur.fetchone()[0]
+    cur.executemany("""
+        INSERT INTO jobs (company, role, job_description, status, date_applied, interview_date, notes, user_id)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    """, [values + (user_id,) for values in batch])
+    
+    # The write lock is held, so the new rows are exactly those past last_id
+    cur.execute("SELECT id FROM jobs WHERE id > ? ORDER BY id", (last_id,))
+    description = job_io.JOB_FIELDS.index('job_description')
+    index_new_jobs(cur, [(row[0], values[description]) for row, values in zip(cur.fetchall(), batch)], user_id)
+
+
+def import_jobs(conn, records, user_id, batch_size=1000):
+    """
+    Insert jobs from an import file for a user in one transaction.
+    
+    Rows are validated like the add-job form; invalid rows are skipped and
+    reported. Valid rows are inserted with executemany in batches of
+    batch_size, and their keywords and corpus terms are precomputed per
+    batch. Any database error rolls back the whole import.
+    
+    Args:
+        conn: Database connection
+        records (iterable): (line_number, record, parse_error) tuples from
+            job_io.read_records
+        user_id (int): Owner of the imported jobs
+        batch_size (int): Rows per executemany
+    
+    Returns:
+        dict: {'imported', 'skipped', 'errors'} - errors lists up to
+        IMPORT_MAX_REPORTED_ERRORS {'line', 'errors'} entries
+    """
+    imported = 0
+    skipped = 0
+    errors = []
+    batch = []
+    
+    cur = conn.cursor()
+    if conn.in_transaction:
+        conn.commit()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        for line_number, record, parse_error in records:
+            if parse_error:
+                row_errors = [parse_error]
+            else:
+                values, row_errors = job_io.validate_job(record)
+            if row_errors:
+                skipped += 1
+                if len(errors) < IMPORT_MAX_REPORTED_ERRORS:
+                    errors.append({'line': line_number, 'errors': row_errors})
+                continue
+            
+            batch.append(values)
+            if len(batch) >= batch_size:
+                _insert_job_batch(cur, batch, user_id)
+                imported += len(batch)
+                batch = []
+        
+        if batch:
+            _insert_job_batch(cur, batch, user_id)
+            imported += len(batch)
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    
+    if imported:
+        invalidate_job_fragments(user_id)
+    return {'imported': imported, 'skipped': skipped, 'errors': errors}
+
+
+def export_rows(cur, dataset, user_id):
+    """
+    Stream a user's rows of an export dataset (see EXPORT_DATASETS) as dicts.
+    
+    Rows are fetched from the cursor one at a time; analysis keywords are
+    returned as lists.
+    """
+    columns, query = EXPORT_DATASETS[dataset]
+    cur.execute(query, (user_id,))
+    for row in cur:
+        row = dict(zip(columns, row))
+        if dataset == 'analyses':
+            row['matched_keywords'] = decode_keywords(row['matched_keywords'])
+            row['missing_keywords'] = decode_keywords(row['missing_keywords'])
+        yield row
+
+
+# ============================================================
+# FRAGMENT CACHE
+# ============================================================
+
+def cached_job_fragment(cur, name, params, render):
+    """
+    Render a fragment that only depends on jobs, through the fragment cache.
+
+    Fragments live in a namespace per database and user, and the key
+    includes that user's jobs revision, so any change to their job data -
+    from this process or any other - makes their next request render
+    afresh while other users' fragments stay cached.
+
+    Args:
+        cur: Database cursor
+        name (str): Fragment name
+        params (tuple): Request parameters the output depends on
+        render: Function returning the rendered HTML
+
+    Returns:
+        str: The rendered HTML
+    """
+    cache = current_app.extensions.get('fragment_cache')
+    if cache is None:
+        return render()
+    user_id = current_user_id()
+    revision, _ = table_revision(cur, 'jobs', user_id)
+    key = (name,) + tuple(params)
+    return cache.get_or_render(job_fragment_namespace(user_id), revision, key, render)
+
+
+def job_fragment_namespace(user_id):
+    """Fragment cache namespace of a user's jobs in the current database"""
+    return f"jobs:{db.database_path()}:{user_id}"
+
+
+def invalidate_job_fragments(user_id):
+    """Drop a user's cached job fragments; call after committing a change to their jobs"""
+    cache = current_app.extensions.get('fragment_cache')
+    if cache is not None:
+        cache.invalidate(job_fragment_namespace(user_id))
+
+
+# ============================================================
+# ROUTES
+# ============================================================
+
+@bp.route("/")
+def index():
+    """Home page - shows overview and navigation"""
+    return render_template("index.html")
+
+
+@bp.route("/add-job", methods=["GET", "POST"])
+def add_job():
+    """
+    Add Job Route
+    
+    GET: Display form for adding a new job
+    POST: Save job with company name, role, description, status, and optional dates
+    
+    Important: Job description is stored for ATS analysis later.
+    """
+    if request.method == "POST":
+        # Validate form data (same rules as bulk import, see job_io.py)
+        values, errors = job_io.validate_job(request.form)
+        
+        if errors:
+            return render_template("add_job.html", errors=errors)
+        
+        # Save to database
+        conn = get_db()
+        cur = conn.cursor()
+        
+        cur.execute("""
+            INSERT INTO jobs (company, role, job_description, status, date_applied, interview_date, notes, user_id)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, values + (current_user_id(),))
+        
+        # Precompute keywords so analyses don't re-tokenize the description
+        sync_job_keywords(cur, cur.lastrowid, values[job_io.JOB_FIELDS.index('job_description')])
+        
+        conn.commit()
+        invalidate_job_fragments(current_user_id())
+        
+        # Redirect to dashboard to see the new job
+        return redirect("/dashboard")
+    
+    # GET request - show the form
+    return render_template("add_job.html")
+
+
+def get_job_stats(cur, user_id):
+    """
+    Read a user's materialized job statistics (job_stats, kept current by triggers).
+    
+    Returns:
+        dict: {'status': {status: count}, 'ats': {bucket: count},
+        'week': {week_monday: count}} - ATS buckets are excellent (80+),
+        good (60-79), poor (below 60) and unanalyzed; empty buckets omitted
+    """
+    stats = {'status': {}, 'ats': {}, 'week': {}}
+    cur.execute("SELECT dimension, bucket, count FROM job_stats WHERE user_id = ? AND count > 0", (user_id,))
+    for dimension, bucket, count in cur.fetchall():
+        stats.setdefault(dimension, {})[bucket] = count
+    return stats
+
+
+def get_status_trends(cur, user_id, weeks=12):
+    """
+    A user's weekly applications and status transitions for the last weeks weeks.
+    
+    Returns:
+        list: One dict per week (oldest first) with week (Monday),
+        applications and transitions ({"Applied->Interview": count, ...})
+    """
+    cur.execute("SELECT date('now', '-6 days', 'weekday 1', ?)", (f"-{7 * (weeks - 1)} days",))
+    since = cur.fetchone()[0]
+    
+    trend = {}
+    cur.execute(
+        """
+        SELECT bucket, count FROM job_stats
+        WHERE user_id = ? AND dimension = 'week' AND bucket >= ? AND bucket != 'unknown'
+        """,
+        (user_id, since)
+    )
+    for week, count in cur.fetchall():
+        trend.setdefault(week, {'week': week, 'applications': 0, 'transitions': {}})['applications'] = count
+    
+    cur.execute(
+        "SELECT week, from_status, to_status, count FROM job_status_transitions WHERE user_id = ? AND week >= ?",
+        (user_id, since)
+    )
+    for week, from_status, to_status, count in cur.fetchall():
+        entry = trend.setdefault(week, {'week': week, 'applications': 0, 'transitions': {}})
+        entry['transitions'][f"{from_status}->{to_status}"] = count
+    
+    return [trend[week] for week in sorted(trend)]
+
+
+# Dashboard table options: sort key -> ORDER BY clause, ATS filter -> WHERE clause
+DASHBOARD_SORTS = {
+    'date-desc': "date_added DESC, id DESC",
+    'date-asc': "date_added ASC, id ASC",
+    'ats-desc': "ats_score IS NULL, ats_score DESC, id DESC",
+    'ats-asc': "ats_score IS NULL, ats_score ASC, id DESC",
+    'company': "company COLLATE NOCASE ASC, id ASC",
+}
+DASHBOARD_ATS_FILTERS = {
+    '80+': "ats_score >= 80",
+    '60-79': "ats_score >= 60 AND ats_score < 80",
+    'below60': "ats_score < 60",
+    'unanalyzed': "ats_score IS NULL",
+}
+# ATS filter -> job_stats bucket (see get_job_stats)
+ATS_FILTER_BUCKETS = {'80+': 'excellent', '60-79': 'good', 'below60': 'poor', 'unanalyzed': 'unanalyzed'}
+
+
+@bp.route("/dashboard")
+def dashboard():
+    """
+    Dashboard Route
+    
+    Shows:
+    - Summary cards: Total, Applied, Interview, Rejected counts
+    - Table with one page of jobs:
+      - Company name
+      - Job role
+      - Application status
+      - ATS match percentage (if analyzed)
+    
+    Query parameters (filtering, sorting and paging happen in SQL):
+    - status: Only show jobs with this status
+    - ats: ATS score band (80+, 60-79, below60, unanalyzed)
+    - sort: One of DASHBOARD_SORTS (default date-desc)
+    - page: 1-based page number (DASHBOARD_PAGE_SIZE rows per page)
+    
+    The rendered page is served from the fragment cache until jobs change.
+    """
+    status = request.args.get("status", "")
+    ats = request.args.get("ats", "")
+    if ats not in DASHBOARD_ATS_FILTERS:
+        ats = ""
+    sort = request.args.get("sort", "date-desc")
+    if sort not in DASHBOARD_SORTS:
+        sort = "date-desc"
+    page = request.args.get("page", 1, type=int)
+    page = max(page, 1)
+    per_page = current_app.config["DASHBOARD_PAGE_SIZE"]
+    
+    cur = get_db().cursor()
+    return cached_job_fragment(
+        cur, "dashboard", (status, ats, sort, page, per_page),
+        lambda: render_dashboard(cur, current_user_id(), status, ats, sort, page, per_page)
+    )
+
+
+def render_dashboard(cur, user_id, status, ats, sort, page, per_page):
+    """Query one dashboard page of a user's jobs (see dashboard) and render dashboard.html"""
+    # Summary counts come from the materialized job_stats rows
+    stats = get_job_stats(cur, user_id)
+    status_counts = stats['status']
+    total = sum(status_counts.values())
+    
+    where = ["user_id = ?"]
+    params = [user_id]
+    if status:
+        where.append("status = ?")
+        params.append(status)
+    if ats in DASHBOARD_ATS_FILTERS:
+        where.append(DASHBOARD_ATS_FILTERS[ats])
+    where_sql = f"WHERE {' AND '.join(where)}"
+    
+    # Number of rows matching the filters (known already for a single filter)
+    if ats in DASHBOARD_ATS_FILTERS and status:
+        cur.execute(f"SELECT COUNT(*) FROM jobs {where_sql}", params)
+        filtered_total = cur.fetchone()[0]
+    elif ats in DASHBOARD_ATS_FILTERS:
+        filtered_total = stats['ats'].get(ATS_FILTER_BUCKETS[ats], 0)
+    elif status:
+        filtered_total = status_counts.get(status, 0)
+    else:
+        filtered_total = total
+    
+    page_count = max((filtered_total + per_page - 1) // per_page, 1)
+    page = min(page, page_count)
+    
+    # Only the columns the table shows - never the full job description
+    cur.execute(f"""
+        SELECT id, company, role, status, ats_score, date_applied, interview_date,
+               substr(notes, 1, 200) AS notes
+        FROM jobs
+        {where_sql}
+        ORDER BY {DASHBOARD_SORTS[sort]}
+        LIMIT ? OFFSET ?
+    """, params + [per_page, (page - 1) * per_page])
+    jobs = cur.fetchall()
+    
+    return render_template(
+        "dashboard.html",
+        jobs=jobs,
+        total=total,
+        applied=status_counts.get('Applied', 0),
+        interview=status_counts.get('Interview', 0),
+        rejected=status_counts.get('Rejected', 0),
+        filters={'status': status, 'ats': ats, 'sort': sort},
+        page=page,
+        page_count=page_count,
+        filtered_total=filtered_total
+    )
+
+
+@bp.route("/search")
+def search():
+    """
+    Job Search Route
+    
+    Query parameters:
+    - q: Search text (matched against company, role, description and notes)
+    - page: 1-based page number (SEARCH_PAGE_SIZE results per page)
+    
+    Renders search.html, or returns the results as JSON when the client
+    asks for application/json (snippets are HTML with <mark> highlights).
+    """
+    query = request.args.get("q", "").strip()
+    page = request.args.get("page", 1, type=int)
+    
+    found = search_jobs(get_db().cursor(), current_user_id(), query, page, current_app.config["SEARCH_PAGE_SIZE"])
+    
+    if request.accept_mimetypes.best == "application/json":
+        for result in found['results']:
+            result['snippet'] = str(result['snippet'])
+        return jsonify(found)
+    return render_template("search.html", **found)
+
+
+@bp.route("/import-jobs", methods=["POST"])
+def import_jobs_route():
+    """
+    Bulk Import Route
+    
+    POST: Import jobs from a CSV or JSONL file
+    
+    Form fields:
+    - file: CSV (with a header row) or JSONL file; columns/keys are
+      company, role, job_description, status, date_applied, interview_date
+      and notes (others are ignored)
+    - format: Optional csv or jsonl (default: from the file extension)
+    
+    Returns JSON with the number of imported and skipped rows and the
+    errors of the first invalid rows.
+    """
+    request.max_content_length = current_app.config["MAX_IMPORT_BYTES"]
+    file = request.files.get("file")
+    if not file or file.filename == "":
+        return jsonify({'error': "No file selected. Please choose a CSV or JSONL file."}), 400
+    
+    fmt = request.form.get("format") or job_io.detect_format(file.filename)
+    if fmt not in job_io.FORMATS:
+        return jsonify({'error': "Unknown file format. Please upload a .csv or .jsonl file."}), 400
+    
+    result = import_jobs(
+        get_db(), job_io.read_records(file.stream, fmt), current_user_id(), current_app.config["IMPORT_BATCH_SIZE"]
+    )
+    return jsonify(result)
+
+
+@bp.route("/export/<any(jobs, analyses):dataset>.<any(csv, jsonl):fmt>")
+def export_dataset(dataset, fmt):
+    """Stream all jobs or all analyses as a CSV or JSONL download"""
+    columns = EXPORT_DATASETS[dataset][0]
+    chunks = job_io.write_records(export_rows(get_db().cursor(), dataset, current_user_id()), columns, fmt)
+    return Response(
+        stream_with_context(chunks),
+        mimetype="text/csv" if fmt == 'csv' else "application/x-ndjson",
+        headers={'Content-Disposition': f'attachment; filename="{dataset}.{fmt}"'}
+    )
+
+
+@bp.route("/edit-job", methods=["GET", "POST"])
+def edit_job():
+    """
+    Edit Job Route
+    
+    GET: Display form pre-filled with job details
+    POST: Update job with new information (status, dates, notes, etc.)
+    
+    Does NOT require resume re-upload: when the job description changes,
+    stored resumes analyzed against the job are re-scored in the
+    background (see rescore_job)
+    """
+    job_id = request.args.get("job_id") or request.form.get("job_id")
+    
+    if not job_id:
+        return redirect("/dashboard")
+    
+    conn = get_db()
+    cur = conn.cursor()
+    cur.execute("SELECT * FROM jobs WHERE id = ? AND user_id = ?", (job_id, current_user_id()))
+    job = cur.fetchone()
+    
+    if not job:
+        return redirect("/dashboard")
+    
+    if request.method == "POST":
+        # Validate form data (same rules as add_job and bulk import)
+        values, errors = job_io.validate_job(request.form)
+        
+        if errors:
+            return render_template("edit_job.html", job=job, errors=errors)
+        
+        job_description = values[job_io.JOB_FIELDS.index('job_description')]
+        
+        # Update database
+        cur.execute("""
+            UPDATE jobs 
+            SET company=?, role=?, job_description=?, status=?, date_applied=?, interview_date=?, notes=?
+            WHERE id=?
+        """, values + (job_id,))
+        
+        # Rebuild the keyword index only if the description changed
+        sync_job_keywords(cur, job_id, job_description)
+        
+        conn.commit()
+        invalidate_job_fragments(current_user_id())
+        
+        # Stored scores were computed against the old description
+        if job_description != (job['job_description'] or "") and resume_library.has_analyzed_resumes(cur, job_id, current_user_id()):
+            task_id = tasks.create_task(conn, int(job_id), "", current_user_id())
+            conn.commit()
+            tasks.submit(
+                task_config(), task_id, run_in_app_context,
+                task_config(), rescore_job, int(job_id)
+            )
+        
+        return redirect("/dashboard")
+    
+    # GET request - show the form with pre-filled data
+    return render_template("edit_job.html", job=job)
+
+
+def analyze_resume(conn, job_id, file_hash, filepath, score_mode="legacy"):
+    """
+    Analyze a stored resume against one job (runs as a background task).
+    
+    Steps:
+      1. Extract resume PDF text (cached by file hash)
+      2. Look up the job's precomputed keywords
+      3. Calculate ATS score (legacy or corpus-weighted) and matched/missing keywords
+      4. Save score and analysis to database
+    
+    Args:
+        conn: Database connection owned by the task
+        job_id (int): Job to analyze against
+        file_hash (str): SHA-256 of the resume (see store_upload)
+        filepath (str): Path of the stored resume PDF
+        score_mode (str): legacy, tfidf or bm25 (see scoring_engine.py)
+    
+    Returns:
+        dict: Template values for the results view of resume.html
+    
+    Raises:
+        ValueError: With a user-facing message if the job or PDF is unusable
+    """
+    cur = conn.cursor()
+    cur.execute(
+        "SELECT id, user_id, company, role, job_description FROM jobs WHERE id = ?",
+        (job_id,)
+    )
+    job = cur.fetchone()
+    if not job:
+        raise ValueError("Selected job not found. Please choose a different job.")
+    if not job['job_description'] or job['job_description'].strip() == "":
+        raise ValueError("Job description is missing. Please edit the job and add a description.")
+    
+    # Extract PDF text (skips parsing if this file was seen before)
+    try:
+        page_count, resume_text, resume_keywords = get_cached_pdf_text(cur, file_hash, filepath)
+    except Exception as pdf_error:
+        raise ValueError(f"Error reading PDF file: {str(pdf_error)}")
+    conn.commit()
+    
+    if page_count == 0:
+        raise ValueError("PDF file is empty. Please upload a valid resume PDF.")
+    if not resume_text or resume_text.strip() == "":
+        raise ValueError("Could not extract text from PDF. Please ensure your resume PDF contains readable text.")
+    
+    # Keep the parsed resume so later job edits can re-score it (see rescore_job)
+    resume_library.save_resume(
+        cur, job['user_id'], file_hash, resume_text, resume_keywords, current_app.config["SKILL_SYNONYMS"]
+    )
+    
+    # Calculate ATS score against the precomputed job keywords
+    job_keywords = sync_job_keywords(cur, job['id'], job['job_description'])
+    if score_mode != "legacy":
+        index_all_jobs(cur, job['user_id'])
+    resume_phrases = find_resume_phrases(cur, resume_text, job['user_id'])
+    with metrics.stage("score"):
+        match_percent, matched_keywords, missing_keywords = calculate_ats_score(
+            resume_text,
+            job['job_description'],
+            job_keywords,
+            list(resume_keywords) + resume_phrases
+        )
+    
+    # Weighted modes replace the percentage with the corpus-weighted score,
+    # computed from this job's own index rows (no matrix needed for one job)
+    if score_mode != "legacy":
+        with metrics.stage("score"):
+            match_percent = scoring_engine.job_score(
+                cur, job['id'], score_mode, set(tokenize(resume_text)).union(resume_phrases)
+            )
+    
+    # Save ATS score and the full analysis to database
+    cur.execute(
+        "UPDATE jobs SET ats_score = ? WHERE id = ?",
+        (match_percent, job['id'])
+    )
+    analysis_id = save_analysis(
+        cur, job['id'], file_hash, match_percent, matched_keywords, missing_keywords, score_mode
+    )
+    conn.commit()
+    invalidate_job_fragments(job['user_id'])
+    
+    return {'analysis_id': analysis_id}
+
+
+def rescore_job(conn, job_id):
+    """
+    Re-score a job against the stored resumes after its description
+    changed (runs as a background task).
+    
+    Every resume in the library that was analyzed against the job is
+    scored again from its stored term ids (see resume_library.py) - one
+    set intersection per resume, no upload and no PDF parsing - with the
+    score mode of its latest analysis. Each result is saved as a new
+    analysis and the job's ATS score is taken from the resume analyzed
+    against the job most recently (by analysis time). Resumes analyzed
+    before the library existed are not re-scored.
+    
+    Args:
+        conn: Database connection owned by the task
+        job_id (int): Edited job
+    
+    Returns:
+        dict: {'job_id', 'rescored', 'ats_score'} - ats_score is None if
+        no stored resume was analyzed against the job
+    """
+    cur = conn.cursor()
+    cur.execute("SELECT user_id, job_description FROM jobs WHERE id = ?", (job_id,))
+    job = cur.fetchone()
+    if not job:
+        raise ValueError("Job not found.")
+    
+    resumes = resume_library.analyzed_resumes(cur, job_id, job['user_id'])
+    if not resumes:
+        return {'job_id': job_id, 'rescored': 0, 'ats_score': None}
+    
+    job_keywords = sync_job_keywords(cur, job_id, job['job_description'])
+    with metrics.stage("score"):
+        weights = {
+            score_mode: scoring_engine.job_term_weights(cur, job_id, score_mode)
+            for score_mode in {resume[1] for resume in resumes} if score_mode != "legacy"
+        }
+        term_ids = resume_library.lookup_terms(cur, set(job_keywords).union(*weights.values()))
+        
+        results = []
+        for file_hash, score_mode, keyword_ids, resume_term_ids in resumes:
+            keyword_ids = set(keyword_ids)
+            matched = sorted(word for word in job_keywords if term_ids.get(word) in keyword_ids)
+            missing = sorted(word for word in job_keywords if term_ids.get(word) not in keyword_ids)
+            score = int((len(matched) / len(job_keywords)) * 100) if job_keywords else 0
+            if score_mode != "legacy":
+                resume_term_ids = set(resume_term_ids)
+                job_weights = weights[score_mode]
+                total = sum(job_weights.values())
+                found = sum(weight for term, weight in job_weights.items() if term_ids.get(term) in resume_term_ids)
+                score = int(found * 100.0 / total + 1e-9) if total > 0 else 0
+            results.append((job['user_id'], job_id, file_hash, score, score_mode, encode_keywords(matched), encode_keywords(missing)))
+    
+    cur.executemany(
+        """
+        INSERT INTO analyses (user_id, job_id, resume_hash, ats_score, score_mode, matched_keywords, missing_keywords)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        """,
+        results
+    )
+    # analyzed_resumes orders by latest analysis time, newest last
+    ats_score = results[-1][3]
+    cur.execute("UPDATE jobs SET ats_score = ? WHERE id = ?", (ats_score, job_id))
+    conn.commit()
+    invalidate_job_fragments(job['user_id'])
+    
+    return {'job_id': job_id, 'rescored': len(results), 'ats_score': ats_score}
+
+
+def analysis_view(cur, analysis_id, user_id):
+    """
+    Build the resume.html results values for a stored analysis of a user.
+    
+    The resume text comes from the PDF text cache; if it has been evicted
+    the results are still shown, just without the extracted text.
+    
+    Returns:
+        dict: Template values, or None if the analysis does not exist
+    """
+    analysis = get_analysis(cur, analysis_id, user_id)
+    if analysis is None:
+        return None
+    
+    cur.execute("SELECT id, company, role FROM jobs WHERE id = ?", (analysis['job_id'],))
+    job = cur.fetchone()
+    cur.execute("SELECT text FROM pdf_text_cache WHERE file_hash = ?", (analysis['resume_hash'],))
+    cached = cur.fetchone()
+    
+    missing_keywords = analysis['missing_keywords']
+    return {
+        'resume_text': cached[0] if cached else "",
+        'matched_keywords': analysis['matched_keywords'],
+        'missing_keywords': missing_keywords,
+        'match_percent': analysis['ats_score'],
+        'selected_job': dict(job) if job else {'company': "(deleted job)", 'role': ""},
+        'analyzed_job_id': analysis['job_id'],
+        'analysis_id': analysis['id'],
+        'improvement_suggestions': get_resume_improvement_suggestions(
+            analysis['ats_score'],
+            len(missing_keywords),
+            missing_keywords
+        ),
+    }
+
+
+def render_job_options(cur, user_id):
+    """Render the <option> list of a user's jobs for the resume checker's job dropdown"""
+    cur.execute("SELECT id, company, role FROM jobs WHERE user_id = ? ORDER BY date_added DESC", (user_id,))
+    return render_template("job_options.html", all_jobs=cur.fetchall())
+
+
+@bp.route("/upload-resume", methods=["GET", "POST"])
+def upload_resume():
+    """
+    Resume Upload & ATS Analysis Route
+    
+    GET: Show form to upload resume and select job to analyze
+         With ?task=<id>: show the progress or results of that analysis
+         With ?analysis=<id>: show a stored analysis again (no re-upload)
+    POST: 
+      1. Validate the form and the selected job
+      2. Stream the resume into upload storage
+      3. Queue analyze_resume on the background worker pool
+      4. Redirect to ?task=<id> (JSON clients get 202 with the task id)
+    
+    Workflow:
+    - User selects which job to analyze against
+    - Uploads resume PDF
+    - Page polls /analysis-tasks/<id> until the analysis finishes
+    - System compares resume keywords with job keywords
+    - ATS score is saved to that job's record
+    - Improvement suggestions are provided
+    """
+    
+    # Job dropdown, rendered once per change to jobs (one connection is reused for the whole request)
+    conn = get_db()
+    cur = conn.cursor()
+    user_id = current_user_id()
+    job_options = Markup(cached_job_fragment(cur, "job_options", (), lambda: render_job_options(cur, user_id)))
+    
+    if request.method == "POST":
+        # Get uploaded file and selected job
+        file = request.files.get("resume")
+        job_id = request.form.get("job_id")
+        score_mode = request.form.get("score_mode") or current_app.config["SCORE_MODE"]
+        
+        # Validate inputs
+        errors = []
+        
+        if not file or file.filename == "":
+            errors.append("No file selected. Please choose a PDF file to upload.")
+        elif not file.filename.endswith(".pdf"):
+            errors.append("Invalid file type. Please upload a PDF file only.")
+        
+        if not job_id:
+            errors.append("Please select a job to analyze.")
+        
+        if score_mode not in scoring_engine.SCORE_MODES:
+            errors.append("Unknown scoring method. Please choose one from the list.")
+        
+        if not errors:
+            cur.execute("SELECT job_description FROM jobs WHERE id = ? AND user_id = ?", (job_id, user_id))
+            job = cur.fetchone()
+            if not job:
+                errors.append("Selected job not found. Please choose a different job.")
+            elif not job['job_description'] or job['job_description'].strip() == "":
+                errors.append("Job description is missing. Please edit the job and add a description.")
+        
+        if not errors:
+            # Stream the upload to content-addressed storage
+            try:
+                file_hash, filepath = store_upload(file)
+            except ValueError as upload_error:
+                errors.append(str(upload_error))
+        
+        if errors:
+            return render_template(
+                "resume.html",
+                job_options=job_options,
+                errors=errors
+            )
+        
+        task_id = tasks.create_task(conn, int(job_id), file_hash, user_id)
+        conn.commit()
+        tasks.submit(
+            task_config(), task_id, run_in_app_context,
+            task_config(), analyze_resume, int(job_id), file_hash, filepath, score_mode
+        )
+        
+        if request.accept_mimetypes.best == "application/json":
+            return jsonify({'task_id': task_id, 'status_url': f"/analysis-tasks/{task_id}"}), 202
+        return redirect(f"/upload-resume?task={task_id}", code=303)
+    
+    # A stored analysis
+    analysis_id = request.args.get("analysis", type=int)
+    if analysis_id:
+        view = analysis_view(cur, analysis_id, user_id)
+        if view is None:
+            return render_template(
+                "resume.html",
+                job_options=job_options,
+                errors=["Analysis not found."]
+            )
+        return render_template("resume.html", job_options=job_options, **view)
+    
+    # Progress or results of a submitted analysis
+    task_id = request.args.get("task")
+    if task_id:
+        task = tasks.get_task(conn, task_id, user_id)
+        if task is not None and task['status'] == 'done' and 'analysis_id' not in task['result']:
+            # A rescore task of edit_job, not a resume upload - nothing to show here
+            task = None
+        if task is None:
+            return render_template(
+                "resume.html",
+                job_options=job_options,
+                errors=["Analysis not found or expired. Please upload your resume again."]
+            )
+        if task['status'] == 'failed':
+            return render_template(
+                "resume.html",
+                job_options=job_options,
+                errors=[task['error']]
+            )
+        if task['status'] == 'done':
+            return redirect(f"/upload-resume?analysis={task['result']['analysis_id']}")
+        return render_template(
+            "resume.html",
+            job_options=job_options,
+            pending_task=task
+        )
+    
+    return render_template(
+        "resume.html",
+        job_options=job_options,
+        resume_text="",
+        matched_keywords=[],
+        missing_keywords=[],
+        match_percent=0,
+        selected_job=None,
+        analyzed_job_id=None,
+        improvement_suggestions=None
+    )
+
+
+@bp.route("/analysis-tasks/<task_id>")
+def analysis_task_status(task_id):
+    """Return the status (and result once done) of a background analysis as JSON"""
+    task = tasks.get_task(get_db(), task_id, current_user_id())
+    if task is None:
+        return jsonify({'error': "Task not found"}), 404
+    return jsonify(task)
+
+
+@bp.route("/batch-score", methods=["POST"])
+def batch_score():
+    """
+    Batch ATS Analysis Route
+    
+    POST: Score one uploaded resume against every saved job of the user (or a subset)
+    
+    Form fields:
+    - resume: Resume PDF (required)
+    - status: Optional status filter (Applied, Interview, Rejected)
+    - job_ids: Optional comma-separated list of job ids
+    - mode: Optional scoring method (legacy, tfidf, bm25; default SCORE_MODE)
+    
+    The PDF is parsed once and all ATS scores are saved in one transaction.
+    Returns a JSON list of jobs ranked by ATS score (best match first).
+    """
+    file = request.files.get("resume")
+    status = request.form.get("status", "").strip()
+    job_ids = request.form.get("job_ids", "").strip()
+    score_mode = request.form.get("mode", "").strip() or current_app.config["SCORE_MODE"]
+    
+    if not file or file.filename == "":
+        return jsonify({'error': "No file selected. Please choose a PDF file to upload."}), 400
+    if not file.filename.endswith(".pdf"):
+        return jsonify({'error': "Invalid file type. Please upload a PDF file only."}), 400
+    
+    if score_mode not in scoring_engine.SCORE_MODES:
+        return jsonify({'error': f"mode must be one of: {', '.join(scoring_engine.SCORE_MODES)}."}), 400
+    
+    try:
+        job_ids = [int(job_id) for job_id in job_ids.split(",") if job_id.strip()]
+    except ValueError:
+        return jsonify({'error': "job_ids must be a comma-separated list of job ids."}), 400
+    
+    try:
+        file_hash, filepath = store_upload(file)
+    except ValueError as upload_error:
+        return jsonify({'error': str(upload_error)}), 413
+    
+    conn = get_db()
+    cur = conn.cursor()
+    
+    try:
+        page_count, resume_text, resume_keywords = get_cached_pdf_text(cur, file_hash, filepath)
+    except Exception as pdf_error:
+        return jsonify({'error': f"Error reading PDF file: {str(pdf_error)}"}), 400
+    
+    if not resume_text.strip():
+        conn.commit()
+        return jsonify({'error': "Could not extract text from PDF. Please ensure your resume PDF contains readable text."}), 400
+    
+    results = score_resume_against_jobs(
+        cur, current_user_id(), resume_text, status or None, job_ids or None, resume_keywords, file_hash, score_mode
+    )
+    conn.commit()
+    invalidate_job_fragments(current_user_id())
+    
+    return jsonify({'count': len(results), 'results': results})
+
+
+@bp.route("/cache-stats")
+def cache_stats():
+    """
+    Return the cache counters as JSON: hits, misses, size and truncated
+    entries of the extracted-text cache, and the fragment cache's counters
+    (this process only) and size.
+    """
+    conn = get_db()
+    cur = conn.cursor()
+    cur.execute("""
+        SELECT COUNT(*), COALESCE(SUM(size), 0),
+               COUNT(json_extract(extraction, '$.truncated'))
+        FROM pdf_text_cache
+    """)
+    entries, size, truncated = cur.fetchone()
+    
+    cur.execute("SELECT hits, misses FROM cache_counters WHERE name = 'pdf_text_cache'")
+    row = cur.fetchone()
+    hits, misses = (row[0], row[1]) if row else (0, 0)
+    fragments = current_app.extensions.get('fragment_cache')
+    
+    return jsonify({
+        'pdf_text_cache': {
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': round(hits / (hits + misses), 3) if hits + misses else 0.0,
+            'entries': entries,
+            'bytes': size,
+            'max_bytes': current_app.config["PDF_CACHE_MAX_BYTES"],
+            'truncated': truncated,
+        },
+        'fragment_cache': fragments.stats() if fragments is not None else {'backend': 'off'},
+    })
+
+
+@bp.route("/metrics")
+def metrics_endpoint():
+    """
+    Request, SQLite and stage timing histograms in the Prometheus text format
+    
+    Task workers flush into the database of the task's tenant, so every
+    tenant database is read. Request histograms are this process's only
+    (see metrics.py).
+    """
+    conns = [db.connect(path) for path in all_databases()]
+    try:
+        return Response(metrics.render(*conns), mimetype="text/plain; version=0.0.4")
+    finally:
+        for conn in conns:
+            conn.close()
+
+
+# ============================================================
+# REPORTS
+# ============================================================
+
+# Report formats, rendering and ZIP packing live in reports.py
+
+# Jobs per batch-export query page
+REPORT_BATCH_SIZE = 200
+
+
+def build_report(job, history, analysis=None):
+    """
+    Collect the data of an ATS report for a job (see reports.py).
+    
+    Args:
+        job: jobs row
+        history (list): The job's latest stored analyses, newest first
+            (see get_analyses)
+        analysis (dict): Analysis to report on (default: the newest)
+    
+    Returns:
+        dict: {'job', 'ats_score', 'analysis', 'matched_keywords',
+        'missing_keywords', 'suggestions', 'history', 'generated_at'} -
+        ats_score and suggestions are None if the job was never analyzed
+    """
+    if analysis is None and history:
+        analysis = history[0]
+    
+    # Scores saved before analyses were stored have no keyword lists
+    ats_score = analysis['ats_score'] if analysis else job['ats_score']
+    matched_keywords = analysis['matched_keywords'] if analysis else []
+    missing_keywords = analysis['missing_keywords'] if analysis else []
+    
+    return {
+        'job': {
+            field: job[field]
+            for field in ('id', 'company', 'role', 'status', 'date_applied', 'interview_date')
+        },
+        'ats_score': ats_score,
+        'analysis': {
+            field: analysis[field] for field in ('id', 'score_mode', 'resume_hash', 'created_at')
+        } if analysis else None,
+        'matched_keywords': matched_keywords,
+        'missing_keywords': missing_keywords,
+        'suggestions': get_resume_improvement_suggestions(
+            ats_score, len(missing_keywords), missing_keywords
+        ) if ats_score is not None else None,
+        'history': [
+            {field: previous[field] for field in ('id', 'created_at', 'ats_score', 'resume_hash')}
+            for previous in history
+        ],
+        'generated_at': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+    }
+
+
+def iter_reports(conn, user_id, status=None, job_ids=None):
+    """
+    Yield the report of each of a user's jobs (or a subset), oldest first.
+    
+    Jobs are read a page of REPORT_BATCH_SIZE at a time (keyset on id),
+    so a whole pipeline can be exported without loading it at once.
+    """
+    cur = conn.cursor()
+    filters = ""
+    params = []
+    if status:
+        filters += " AND status = ?"
+        params.append(status)
+    if job_ids:
+        filters += f" AND id IN ({', '.join('?' * len(job_ids))})"
+        params.extend(job_ids)
+    
+    after = 0
+    while True:
+        cur.execute(
+            f"""
+            SELECT id, company, role, status, date_applied, interview_date, ats_score
+            FROM jobs WHERE user_id = ? AND id > ?{filters} ORDER BY id LIMIT ?
+            """,
+            [user_id, after] + params + [REPORT_BATCH_SIZE]
+        )
+        jobs = cur.fetchall()
+        for job in jobs:
+            yield build_report(job, get_analyses(cur, job['id'], limit=10))
+        if len(jobs) < REPORT_BATCH_SIZE:
+            return
+        after = jobs[-1]['id']
+
+
+def report_format():
+    """Parse ?format= (txt by default) or raise a 400 ApiError"""
+    fmt = request.args.get("format", "txt")
+    if fmt not in reports.FORMATS:
+        raise ApiError(f"Unknown format: {fmt}. Allowed: {', '.join(reports.FORMATS)}")
+    return fmt
+
+
+@bp.route("/export-results/<int:job_id>")
+def export_results(job_id):
+    """
+    Download the ATS analysis report of a job.
+    
+    The report covers:
+    - Job and company details
+    - ATS match score with interpretation
+    - Matched and missing keywords
+    - Actionable improvement suggestions
+    
+    Query parameters:
+    - format: txt (default), md, html, csv or json (see reports.py)
+    - analysis: Id of an older stored analysis to report on (default: newest)
+    """
+    fmt = report_format()
+    
+    conn = get_db()
+    cur = conn.cursor()
+    cur.execute("SELECT * FROM jobs WHERE id = ? AND user_id = ?", (job_id, current_user_id()))
+    job = cur.fetchone()
     
     if not job:
         return "Job not found", 404
     
+    # Stored analyses, newest first (?analysis=<id> selects an older run)
+    history = get_analyses(cur, job_id, limit=10)
+    analysis_id = request.args.get("analysis", type=int)
+    analysis = None
+    if analysis_id:
+        analysis = get_analysis(cur, analysis_id, current_user_id())
+        if analysis is None or analysis['job_id'] != job_id:
+            return "Analysis not found", 404
+    
     # Check if ATS analysis was done
-    if job['ats_score'] is None:
+    if analysis is None and not history and job['ats_score'] is None:
         return "This job has not been analyzed yet. Please upload a resume first.", 400
     
-    # Re-generate improvement suggestions for the report
-    improvement_suggestions = get_resume_improvement_suggestions(
-        job['ats_score'],
-        0,  # Will be calculated from matched/missing
-        []
+    report = build_report(job, history, analysis)
+    mimetype = reports.FORMATS[fmt][0]
+    response = Response(
+        stream_with_context(reports.render_report(report, fmt, current_app.jinja_env)),
+        mimetype=mimetype
     )
+    response.headers.set("Content-Disposition", "attachment", filename=reports.report_filename(report, fmt))
+    return response
+
+
+@bp.route("/export-results.zip")
+def export_results_zip():
+    """
+    Download the ATS reports of many jobs as one ZIP, streamed as it is built.
     
-    # Build professional report text
-    report = f"""
-╔════════════════════════════════════════════════════════════════════════════╗
-║                    ATS COMPATIBILITY ANALYSIS REPORT                       ║
-╚════════════════════════════════════════════════════════════════════════════╝
-
-POSITION DETAILS
-─────────────────────────────────────────────────────────────────────────────
-Company:                {job['company']}
-Position:               {job['role']}
-Date Applied:          {job['date_applied'] if job['date_applied'] else 'Not specified'}
-Application Status:    {job['status']}
-
-ATS MATCH SCORE
-─────────────────────────────────────────────────────────────────────────────
-Score:                 {job['ats_score']}%
-
-Score Interpretation:
-  • 80-100%:  EXCELLENT MATCH - Strong candidate, high priority application
-  • 60-79%:   GOOD MATCH - Competitive candidate, consider targeted updates
-  • Below 60%: NEEDS IMPROVEMENT - Critical gaps to address
-
-Current Status:        {improvement_suggestions['main_message']}
-
-RECOMMENDED ACTIONS
-─────────────────────────────────────────────────────────────────────────────
-Priority Actions:
-"""
-    
-    for i, action in enumerate(improvement_suggestions['priority_actions'], 1):
-        report += f"  {i}. {action}\n"
+    Query parameters:
+    - format: Report format, as for export_results (default txt)
+    - status: Only jobs with this status
+    - job_ids: Comma-separated job ids (default: all of the user's jobs)
+    """
+    fmt = report_format()
+    status = request.args.get("status", "").strip()
+    try:
+        job_ids = [int(job_id) for job_id in request.args.get("job_ids", "").split(",") if job_id.strip()]
+    except ValueError:
+        raise ApiError("job_ids must be a comma-separated list of job ids.")
     
-    report += "\nQuick Wins:\n"
-    for i, win in enumerate(improvement_suggestions['quick_wins'], 1):
-        report += f"  {i}. {win}\n"
+    archive = reports.zip_reports(
+        iter_reports(get_db(), current_user_id(), status or None, job_ids or None),
+        fmt, current_app.jinja_env
+    )
+    response = Response(stream_with_context(archive), mimetype="application/zip")
+    response.headers.set("Content-Disposition", "attachment", filename=f"ATS_Reports_{fmt}.zip")
+    return response
+
+
+# ============================================================
+# JSON API
+# ============================================================
+
+# Served under /api/v1 and, for the current version, under /api
+API_VERSION = "1"
+
+# Job fields available through ?fields= (list responses omit the description by default)
+API_JOB_FIELDS = (
+    'id', 'company', 'role', 'job_description', 'status', 'ats_score',
+    'date_added', 'date_applied', 'interview_date', 'notes', 'revision', 'updated_at',
+)
+API_JOB_LIST_FIELDS = tuple(field for field in API_JOB_FIELDS if field != 'job_description')
+API_ANALYSIS_FIELDS = (
+    'id', 'job_id', 'resume_hash', 'ats_score', 'score_mode',
+    'matched_keywords', 'missing_keywords', 'created_at',
+)
+
+
+class ApiError(Exception):
+    """Client error in a JSON API request (rendered as {'error': message})"""
     
-    report += """
-─────────────────────────────────────────────────────────────────────────────
-Generated: """ + datetime.now().strftime("%Y-%m-%d %H:%M:%S") + """
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.message = message
+        self.status = status
 
-This report was generated by the Job Tracker Application.
-For the best results, ensure your resume is:
-  ✓ ATS-friendly with standard formatting
-  ✓ Tailored to specific job requirements
-  ✓ Using industry keywords and terminology
-  ✓ Highlighting measurable achievements
-"""
+
+@bp.app_errorhandler(ApiError)
+def api_error(e):
+    return jsonify({'error': e.message}), e.status
+
+
+def api_fields(allowed, default):
+    """Parse ?fields=a,b into a tuple of allowed field names"""
+    requested = request.args.get("fields", "").strip()
+    if not requested:
+        return default
+    fields = tuple(field.strip() for field in requested.split(",") if field.strip())
+    unknown = [field for field in fields if field not in allowed]
+    if unknown:
+        raise ApiError(f"Unknown fields: {', '.join(unknown)}. Allowed: {', '.join(allowed)}")
+    return fields
+
+
+def api_limit():
+    """Parse ?limit= (API_PAGE_SIZE by default, at most API_MAX_PAGE_SIZE)"""
+    limit = request.args.get("limit", current_app.config["API_PAGE_SIZE"], type=int)
+    return min(max(limit, 1), current_app.config["API_MAX_PAGE_SIZE"])
+
+
+def encode_cursor(last_id):
+    """Opaque pagination cursor pointing after last_id"""
+    return base64.urlsafe_b64encode(json.dumps({'after': last_id}).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """Return the id a cursor points after (None for the first page)"""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        return int(json.loads(base64.urlsafe_b64decode(padded))['after'])
+    except (ValueError, KeyError, TypeError):
+        raise ApiError("Invalid cursor")
+
+
+def sql_timestamp(value):
+    """Parse a SQLite CURRENT_TIMESTAMP value (UTC) into an aware datetime"""
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value[:19], "%Y-%m-%d %H:%M:%S").replace(tzinfo=timezone.utc)
+    except ValueError:
+        return None
+
+
+def table_revision(cur, name, user_id):
+    """Return (revision, updated_at) of a user's rows of a table tracked in table_revisions"""
+    cur.execute("SELECT revision, updated_at FROM table_revisions WHERE user_id = ? AND name = ?", (user_id, name))
+    revision, updated_at = cur.fetchone()
+    return revision, sql_timestamp(updated_at)
+
+
+def api_etag(*parts):
+    """ETag built from revision numbers plus the database, user and query string (fields, cursor, ...)"""
+    scope = f"{db.database_path()}\0{current_user_id()}\0".encode("utf-8") + request.query_string
+    digest = hashlib.sha1(scope).hexdigest()[:12]
+    return "-".join(str(part) for part in parts) + "-" + digest
+
+
+def not_modified(etag, last_modified=None):
+    """
+    Return a 304 response if the client's cached copy is still current.
     
-    # Return as downloadable text file
-    from flask import make_response
-    response = make_response(report)
-    response.headers["Content-Disposition"] = f"attachment; filename=ATS_Analysis_{job['company']}.txt"
-    response.headers["Content-Type"] = "text/plain; charset=utf-8"
+    Checked before the response is built, so a matching If-None-Match (or,
+    without one, a current If-Modified-Since) costs one revision lookup.
+    """
+    if request.if_none_match:
+        fresh = request.if_none_match.contains(etag)
+    else:
+        fresh = bool(last_modified and request.if_modified_since
+                     and last_modified.replace(microsecond=0) <= request.if_modified_since)
+    if not fresh:
+        return None
+    response = current_app.response_class(status=304)
+    response.set_etag(etag)
+    if last_modified:
+        response.last_modified = last_modified
     return response
 
 
-@app.route("/upload-resume", methods=["GET", "POST"])
-def upload_resume():
+def api_response(payload, etag, last_modified=None):
+    """JSON response with API version, ETag and Last-Modified headers"""
+    response = jsonify(payload)
+    response.set_etag(etag)
+    if last_modified:
+        response.last_modified = last_modified
+    response.headers["API-Version"] = API_VERSION
+    response.cache_control.no_cache = True
+    return response
+
+
+def _api_job(cur, job_id):
+    """Return (revision, updated_at) of a job of the current user, or raise a 404 ApiError"""
+    cur.execute("SELECT revision, updated_at FROM jobs WHERE id = ? AND user_id = ?", (job_id, current_user_id()))
+    row = cur.fetchone()
+    if row is None:
+        raise ApiError("Job not found", 404)
+    return row[0], sql_timestamp(row[1])
+
+
+@bp.route("/api/v1/jobs")
+@bp.route("/api/jobs")
+def api_jobs():
     """
-    Resume Upload & ATS Analysis Route
+    List jobs, newest first, with cursor pagination.
     
-    GET: Show form to upload resume and select job to analyze
-    POST: 
-      1. Extract resume PDF text
-      2. Get selected job's description
-      3. Calculate ATS score
-      4. Show matched and missing keywords
-      5. Generate improvement suggestions
-      6. Save score to database
+    Query parameters:
+    - fields: Comma-separated API_JOB_FIELDS (default: all but job_description)
+    - status: Only jobs with this status
+    - limit: Page size (default API_PAGE_SIZE, max API_MAX_PAGE_SIZE)
+    - cursor: next_cursor of the previous page
+    """
+    fields = api_fields(API_JOB_FIELDS, API_JOB_LIST_FIELDS)
+    limit = api_limit()
+    after = decode_cursor(request.args.get("cursor"))
+    status = request.args.get("status", "").strip()
     
-    Workflow:
-    - User selects which job to analyze against
-    - Uploads resume PDF
-    - System compares resume keywords with job keywords
-    - ATS score is saved to that job's record
-    - Improvement suggestions are provided
+    cur = get_db().cursor()
+    revision, last_modified = table_revision(cur, 'jobs', current_user_id())
+    etag = api_etag("jobs", revision)
+    cached = not_modified(etag, last_modified)
+    if cached:
+        return cached
+    
+    where = ["user_id = ?"]
+    params = [current_user_id()]
+    if after is not None:
+        where.append("id < ?")
+        params.append(after)
+    if status:
+        where.append("status = ?")
+        params.append(status)
+    where_sql = f"WHERE {' AND '.join(where)}"
+    
+    columns = ", ".join(dict.fromkeys(('id',) + fields))
+    cur.execute(f"SELECT {columns} FROM jobs {where_sql} ORDER BY id DESC LIMIT ?", params + [limit + 1])
+    rows = cur.fetchall()
+    
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    return api_response({
+        'data': [{field: row[field] for field in fields} for row in rows],
+        'next_cursor': encode_cursor(rows[-1]['id']) if has_more else None,
+    }, etag, last_modified)
+
+
+@bp.route("/api/v1/jobs/<int:job_id>")
+@bp.route("/api/jobs/<int:job_id>")
+def api_job(job_id):
+    """
+    One job.
+    
+    Query parameters:
+    - fields: Comma-separated API_JOB_FIELDS (default: all)
+    """
+    fields = api_fields(API_JOB_FIELDS, API_JOB_FIELDS)
+    
+    cur = get_db().cursor()
+    revision, last_modified = _api_job(cur, job_id)
+    etag = api_etag("job", job_id, revision)
+    cached = not_modified(etag, last_modified)
+    if cached:
+        return cached
+    
+    cur.execute(f"SELECT {', '.join(fields)} FROM jobs WHERE id = ?", (job_id,))
+    row = cur.fetchone()
+    return api_response({'data': {field: row[field] for field in fields}}, etag, last_modified)
+
+
+@bp.route("/api/v1/jobs/<int:job_id>/analyses")
+@bp.route("/api/jobs/<int:job_id>/analyses")
+def api_job_analyses(job_id):
+    """
+    Stored analyses of a job, newest first, with cursor pagination.
+    
+    Query parameters:
+    - fields: Comma-separated API_ANALYSIS_FIELDS (default: all)
+    - limit: Page size (default API_PAGE_SIZE, max API_MAX_PAGE_SIZE)
+    - cursor: next_cursor of the previous page
+    """
+    fields = api_fields(API_ANALYSIS_FIELDS, API_ANALYSIS_FIELDS)
+    limit = api_limit()
+    after = decode_cursor(request.args.get("cursor"))
+    
+    cur = get_db().cursor()
+    _api_job(cur, job_id)
+    revision, last_modified = table_revision(cur, 'analyses', current_user_id())
+    etag = api_etag("analyses", job_id, revision)
+    cached = not_modified(etag, last_modified)
+    if cached:
+        return cached
+    
+    where_sql = "WHERE job_id = ?" + (" AND id < ?" if after is not None else "")
+    params = [job_id] + ([after] if after is not None else [])
+    columns = ", ".join(dict.fromkeys(('id',) + fields))
+    cur.execute(
+        f"SELECT {columns} FROM analyses {where_sql} ORDER BY id DESC LIMIT ?",
+        params + [limit + 1]
+    )
+    rows = cur.fetchall()
+    
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    data = []
+    for row in rows:
+        item = {field: row[field] for field in fields}
+        for field in ('matched_keywords', 'missing_keywords'):
+            if field in item:
+                item[field] = decode_keywords(item[field])
+        data.append(item)
+    
+    return api_response({
+        'data': data,
+        'next_cursor': encode_cursor(rows[-1]['id']) if has_more else None,
+    }, etag, last_modified)
+
+
+@bp.route("/api/v1/stats")
+@bp.route("/api/stats")
+def api_stats():
+    """Job counts by status, ATS band and application week, plus the number of stored analyses"""
+    cur = get_db().cursor()
+    jobs_revision, jobs_modified = table_revision(cur, 'jobs', current_user_id())
+    analyses_revision, analyses_modified = table_revision(cur, 'analyses', current_user_id())
+    last_modified = max(jobs_modified, analyses_modified)
+    etag = api_etag("stats", jobs_revision, analyses_revision)
+    cached = not_modified(etag, last_modified)
+    if cached:
+        return cached
+    
+    user_id = current_user_id()
+    stats = get_job_stats(cur, user_id)
+    
+    cur.execute("SELECT COUNT(*) FROM analyses WHERE user_id = ?", (user_id,))
+    analyses = cur.fetchone()[0]
+    
+    return api_response({
+        'data': {
+            'total': sum(stats['status'].values()),
+            'by_status': stats['status'],
+            'by_ats_band': {band: stats['ats'].get(bucket, 0) for band, bucket in ATS_FILTER_BUCKETS.items()},
+            'applications_per_week': stats['week'],
+            'analyses': analyses,
+        }
+    }, etag, last_modified)
+
+
+@bp.route("/api/v1/stats/trends")
+@bp.route("/api/stats/trends")
+def api_stats_trends():
+    """
+    Weekly applications and status transitions.
+    
+    Query parameters:
+    - weeks: Number of weeks up to the current one (default 12, max 520)
+    """
+    weeks = min(max(request.args.get("weeks", 12, type=int), 1), 520)
+    
+    cur = get_db().cursor()
+    revision, last_modified = table_revision(cur, 'jobs', current_user_id())
+    etag = api_etag("trends", revision, datetime.now(timezone.utc).strftime("%Y%m%d"))
+    cached = not_modified(etag)
+    if cached:
+        return cached
+    
+    return api_response({'data': get_status_trends(cur, current_user_id(), weeks)}, etag)
+
+
+@bp.route("/api/v1/analytics")
+@bp.route("/api/analytics")
+def api_analytics():
+    """
+    Funnel conversion and time-in-stage from the job_events log.
+    
+    Query parameters:
+    - from, to: Stages for the days-between summary (default Applied, Interview)
     """
+    from_stage = request.args.get("from", "Applied")
+    to_stage = request.args.get("to", "Interview")
+    for stage in (from_stage, to_stage):
+        if stage not in job_io.JOB_STATUSES:
+            raise ApiError(f"Unknown stage: {stage}. Allowed: {', '.join(job_io.JOB_STATUSES)}")
+    
+    cur = get_db().cursor()
+    user_id = current_user_id()
+    revision, last_modified = table_revision(cur, 'jobs', user_id)
+    cur.execute("SELECT MAX(id) FROM job_events WHERE user_id = ?", (user_id,))
+    last_event = cur.fetchone()[0]
+    etag = api_etag("analytics", revision, last_event)
+    cached = not_modified(etag, last_modified)
+    if cached:
+        return cached
     
-    # Get all jobs for the dropdown
+    return api_response({
+        'data': {
+            'funnel': analytics.funnel(cur, user_id),
+            'time_in_stage': analytics.time_in_stage(cur, user_id),
+            'days_between': {
+                'from': from_stage,
+                'to': to_stage,
+                **(analytics.days_between(cur, user_id, from_stage, to_stage) or {'count': 0}),
+            },
+        }
+    }, etag, last_modified)
+
+
+# ============================================================
+# CLI COMMANDS
+# ============================================================
+
+@bp.cli.command("score-all")
+@click.argument("resume", type=click.Path(exists=True, dir_okay=False))
+@click.option("--status", default=None, help="Only score jobs with this status.")
+@click.option("--limit", default=20, show_default=True, help="Number of ranked jobs to print.")
+@click.option("--mode", type=click.Choice(scoring_engine.SCORE_MODES), default=None,
+              help="Scoring method (default: SCORE_MODE config).")
+@click.option("--user", default=None, help="User whose jobs to use (default: DEFAULT_USER).")
+def score_all_command(resume, status, limit, mode, user):
+    """Score RESUME (a PDF) against all saved jobs and print the ranking."""
+    use_tenant(user)
     conn = get_db()
     cur = conn.cursor()
-    cur.execute("SELECT id, company, role, job_description FROM jobs ORDER BY date_added DESC")
-    all_jobs = cur.fetchall()
-    conn.close()
-    
-    # Default values
-    resume_text = ""
-    matched_keywords = []
-    missing_keywords = []
-    match_percent = 0
-    selected_job = None
-    analyzed_job_id = None
-    improvement_suggestions = None
+    file_hash = hash_file(resume)
+    page_count, resume_text, resume_keywords = get_cached_pdf_text(cur, file_hash, resume)
+    if not resume_text.strip():
+        conn.commit()
+        raise click.ClickException("Could not extract text from PDF.")
     
-    if request.method == "POST":
-        # Get uploaded file and selected job
-        file = request.files.get("resume")
-        job_id = request.form.get("job_id")
-        
-        # Validate inputs
-        errors = []
-        
-        if not file or file.filename == "":
-            errors.append("No file selected. Please choose a PDF file to upload.")
-        elif not file.filename.endswith(".pdf"):
-            errors.append("Invalid file type. Please upload a PDF file only.")
-        
-        if not job_id:
-            errors.append("Please select a job to analyze.")
-        
-        if errors:
-            return render_template(
-                "resume.html",
-                all_jobs=all_jobs,
-                errors=errors
-            )
-        
+    results = score_resume_against_jobs(
+        cur, current_user_id(), resume_text, status, resume_keywords=resume_keywords, resume_hash=file_hash,
+        score_mode=mode or current_app.config["SCORE_MODE"]
+    )
+    conn.commit()
+    invalidate_job_fragments(current_user_id())
+    
+    click.echo(f"Scored {len(results)} jobs")
+    for rank, result in enumerate(results[:limit], 1):
+        click.echo(f"{rank:>4}. {result['ats_score']:>3}%  {result['company']} - {result['role']}")
+
+
+@bp.cli.command("import-jobs")
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+@click.option("--format", "fmt", type=click.Choice(job_io.FORMATS), default=None,
+              help="File format (default: from the file extension).")
+@click.option("--batch-size", default=None, type=int, help="Rows per insert batch (default: IMPORT_BATCH_SIZE).")
+@click.option("--user", default=None, help="User whose jobs to use (default: DEFAULT_USER).")
+def import_jobs_command(path, fmt, batch_size, user):
+    """Import jobs from a CSV or JSONL file at PATH."""
+    use_tenant(user)
+    fmt = fmt or job_io.detect_format(path)
+    if fmt is None:
+        raise click.ClickException("Unknown file format; pass --format csv or --format jsonl.")
+    
+    started = time.perf_counter()
+    with open(path, "rb") as f:
+        result = import_jobs(
+            get_db(), job_io.read_records(f, fmt), current_user_id(),
+            batch_size or current_app.config["IMPORT_BATCH_SIZE"]
+        )
+    elapsed = time.perf_counter() - started
+    
+    for error in result['errors']:
+        click.echo(f"line {error['line']}: {'; '.join(error['errors'])}", err=True)
+    click.echo(f"Imported {result['imported']} jobs, skipped {result['skipped']} in {elapsed:.2f}s")
+
+
+@bp.cli.command("export")
+@click.argument("dataset", type=click.Choice(sorted(EXPORT_DATASETS)))
+@click.argument("path", type=click.Path(dir_okay=False, writable=True))
+@click.option("--format", "fmt", type=click.Choice(job_io.FORMATS), default=None,
+              help="File format (default: from the file extension).")
+@click.option("--user", default=None, help="User whose jobs to use (default: DEFAULT_USER).")
+def export_command(dataset, path, fmt, user):
+    """Write all jobs or analyses (DATASET) to PATH as CSV or JSONL."""
+    use_tenant(user)
+    fmt = fmt or job_io.detect_format(path)
+    if fmt is None:
+        raise click.ClickException("Unknown file format; pass --format csv or --format jsonl.")
+    
+    columns = EXPORT_DATASETS[dataset][0]
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        for chunk in job_io.write_records(export_rows(get_db().cursor(), dataset, current_user_id()), columns, fmt):
+            f.write(chunk)
+    click.echo(f"Exported {dataset} to {path}")
+
+
+@bp.cli.command("export-reports")
+@click.argument("path", type=click.Path(dir_okay=False, writable=True))
+@click.option("--format", "fmt", type=click.Choice(sorted(reports.FORMATS)), default="txt", show_default=True,
+              help="Report format.")
+@click.option("--status", default=None, help="Only jobs with this status.")
+@click.option("--user", default=None, help="User whose jobs to use (default: DEFAULT_USER).")
+def export_reports_command(path, fmt, status, user):
+    """Write the ATS report of every job to a ZIP archive at PATH."""
+    use_tenant(user)
+    with open(path, "wb") as f:
+        for chunk in reports.zip_reports(
+            iter_reports(get_db(), current_user_id(), status), fmt, current_app.jinja_env
+        ):
+            f.write(chunk)
+    click.echo(f"Exported reports to {path}")
+
+
+@bp.cli.command("gc-uploads")
+def gc_uploads_command():
+    """Delete stored uploads past retention or over the folder size bound."""
+    result = gc_uploads()
+    click.echo(f"Removed {result['removed']} files; {result['kept']} files ({result['bytes']} bytes) kept")
+
+
+@bp.cli.command("backfill-events")
+def backfill_events_command():
+    """Create job_events history for jobs saved before the event log existed (every tenant database)."""
+    for path in all_databases():
+        conn = db.connect(path)
         try:
-            # Get the selected job's description first
-            conn = get_db()
-            cur = conn.cursor()
-            cur.execute(
-                "SELECT id, company, role, job_description FROM jobs WHERE id = ?",
-                (job_id,)
-            )
-            job = cur.fetchone()
-            conn.close()
-            
-            if not job:
-                errors.append("Selected job not found. Please choose a different job.")
-                return render_template(
-                    "resume.html",
-                    all_jobs=all_jobs,
-                    errors=errors
-                )
-            
-            if not job['job_description'] or job['job_description'].strip() == "":
-                errors.append("Job description is missing. Please edit the job and add a description.")
-                return render_template(
-                    "resume.html",
-                    all_jobs=all_jobs,
-                    errors=errors
-                )
-            
-            selected_job = dict(job)
-            analyzed_job_id = job_id
-            
-            # Save and extract PDF text
-            filepath = os.path.join(app.config["UPLOAD_FOLDER"], file.filename)
-            file.save(filepath)
-            
-            try:
-                reader = PdfReader(filepath)
-                if len(reader.pages) == 0:
-                    errors.append("PDF file is empty. Please upload a valid resume PDF.")
-                    return render_template(
-                        "resume.html",
-                        all_jobs=all_jobs,
-                        errors=errors
-                    )
-                
-                for page in reader.pages:
-                    text = page.extract_text()
-                    if text:
-                        resume_text += text
-                
-                if not resume_text or resume_text.strip() == "":
-                    errors.append("Could not extract text from PDF. Please ensure your resume PDF contains readable text.")
-                    return render_template(
-                        "resume.html",
-                        all_jobs=all_jobs,
-                        errors=errors
-                    )
-            
-            except Exception as pdf_error:
-                errors.append(f"Error reading PDF file: {str(pdf_error)}")
-                return render_template(
-                    "resume.html",
-                    all_jobs=all_jobs,
-                    errors=errors
-                )
-            
-            # Calculate ATS score
-            match_percent, matched_keywords, missing_keywords = calculate_ats_score(
-                resume_text,
-                job['job_description']
-            )
-            
-            # Generate improvement suggestions
-            improvement_suggestions = get_resume_improvement_suggestions(
-                match_percent,
-                len(missing_keywords),
-                missing_keywords
-            )
-            
-            # Save ATS score to database
-            conn = get_db()
-            cur = conn.cursor()
-            cur.execute(
-                "UPDATE jobs SET ats_score = ? WHERE id = ?",
-                (match_percent, job_id)
-            )
+            backfilled = analytics.backfill_job_events(conn.cursor())
             conn.commit()
+        finally:
             conn.close()
-            
-        except Exception as e:
-            errors.append(f"An unexpected error occurred: {str(e)}")
-            return render_template(
-                "resume.html",
-                all_jobs=all_jobs,
-                errors=errors
-            )
-    
-    return render_template(
-        "resume.html",
-        all_jobs=all_jobs,
-        resume_text=resume_text,
-        matched_keywords=matched_keywords,
-        missing_keywords=missing_keywords,
-        match_percent=match_percent,
-        selected_job=selected_job,
-        analyzed_job_id=analyzed_job_id,
-        improvement_suggestions=improvement_suggestions
-    )
+        click.echo(f"Backfilled events for {backfilled} jobs in {path}")
 
 
 # ============================================================
 # ERROR HANDLERS
 # ============================================================
 
-@app.errorhandler(404)
+@bp.app_errorhandler(404)
 def page_not_found(e):
     """Handle 404 errors"""
     return render_template("error.html", error="Page not found"), 404
 
 
-@app.errorhandler(500)
+@bp.app_errorhandler(413)
+def request_too_large(e):
+    """Handle uploads larger than MAX_CONTENT_LENGTH (MAX_IMPORT_BYTES for imports)"""
+    if request.endpoint == "jobtracker.import_jobs_route":
+        max_mb = current_app.config["MAX_IMPORT_BYTES"] // (1024 * 1024)
+        return jsonify({'error': f"File is too large. Please import files under {max_mb}MB."}), 413
+    max_mb = current_app.config["MAX_UPLOAD_BYTES"] // (1024 * 1024)
+    return f"File is too large. Please upload a PDF under {max_mb}MB.", 413
+
+
+@bp.app_errorhandler(500)
 def server_error(e):
     """Handle 500 errors"""
     return render_template("error.html", error="Server error"), 500
@@ -726,5 +2645,6 @@ def server_error(e):
 # RUN APPLICATION
 # ============================================================
 
+# Development server only; production serving is described in wsgi.py
 if __name__ == "__main__":
-    app.run(debug=True)
+    create_app().run(debug=True)
@@ -0,0 +1,158 @@
+"""
+Route Benchmarks
+================
+pytest-benchmark suite timing single requests to every main route through
+the Flask test client, against a database seeded with synthetic jobs
+(the generators of loadtest.py, so data matches the load test).
+
+Run from the repository root:
+
+    pip install pytest pytest-benchmark
+    pytest benchmarks/bench_routes.py --benchmark-autosave
+
+BENCH_ROWS sets the number of seeded jobs (default 1000). The fragment
+cache is off, so page benchmarks measure the queries and the render; see
+loadtest.py for concurrent load, percentiles and memory.
+
+test_batch_score_target always seeds its own 2,000 jobs and fails when a
+warm /batch-score request takes a second or more.
+"""
+
+import io
+import os
+import random
+import statistics
+import sys
+import time
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.dirname(__file__))
+
+import app  # noqa: E402
+import loadtest  # noqa: E402
+
+ROWS = int(os.environ.get("BENCH_ROWS", 1000))
+SEED = 1
+BATCH_SCORE_ROWS = 2000
+BATCH_SCORE_SECONDS = 1.0
+
+
+@pytest.fixture(scope="module")
+def client(tmp_path_factory):
+    workdir = tmp_path_factory.mktemp("routes")
+    database = str(workdir / "database.db")
+    loadtest.seed_database(database, ROWS, SEED)
+    application = app.create_app({
+        'DATABASE': database,
+        'UPLOAD_FOLDER': str(workdir / "uploads"),
+        'ASYNC_ANALYSIS': False,
+        'FRAGMENT_CACHE': "off",
+    })
+    yield application.test_client()
+    app.db.close_pool()
+
+
+@pytest.fixture(scope="module")
+def batch_client(tmp_path_factory):
+    workdir = tmp_path_factory.mktemp("batch")
+    database = str(workdir / "database.db")
+    loadtest.seed_database(database, BATCH_SCORE_ROWS, SEED)
+    application = app.create_app({
+        'DATABASE': database,
+        'UPLOAD_FOLDER': str(workdir / "uploads"),
+        'ASYNC_ANALYSIS': False,
+        'FRAGMENT_CACHE': "off",
+    })
+    yield application.test_client()
+    app.db.close_pool()
+
+
+@pytest.fixture(scope="module")
+def resume_pdf():
+    return loadtest.synthetic_pdf(random.Random(SEED))
+
+
+@pytest.fixture(scope="module")
+def analyzed_job(client, resume_pdf):
+    response = client.post("/upload-resume", data={'job_id': "1", 'resume': (io.BytesIO(resume_pdf), "resume.pdf")})
+    assert response.status_code == 303
+    return 1
+
+
+@pytest.mark.parametrize("path", [
+    "/dashboard",
+    "/dashboard?status=Interview&sort=ats-desc&page=3",
+    "/search?q=kubernetes+python",
+    "/upload-resume",
+    "/api/v1/jobs?limit=100",
+    "/api/v1/stats",
+    "/api/v1/analytics",
+    "/metrics",
+])
+def test_get(benchmark, client, path):
+    response = benchmark(client.get, path)
+    assert response.status_code == 200
+
+
+def test_export_results(benchmark, client, analyzed_job):
+    data = benchmark(lambda: client.get(f"/export-results/{analyzed_job}").get_data())
+    assert b"ATS COMPATIBILITY ANALYSIS REPORT" in data
+
+
+@pytest.mark.parametrize("fmt", ["txt", "html", "json"])
+def test_export_results_zip(benchmark, client, analyzed_job, fmt):
+    # Streamed: the archive is only built while the body is read
+    data = benchmark(lambda: client.get(f"/export-results.zip?format={fmt}").get_data())
+    assert data.startswith(b"PK")
+
+
+def test_add_job(benchmark, client):
+    rng = random.Random(SEED)
+    response = benchmark(lambda: client.post("/add-job", data=loadtest.synthetic_job(rng)))
+    assert response.status_code == 302
+
+
+def test_edit_job(benchmark, client):
+    rng = random.Random(SEED)
+
+    def edit():
+        job_id = rng.randrange(1, ROWS + 1)
+        fields = loadtest.synthetic_job(rng)
+        fields['job_description'] = loadtest.seeded_job(SEED, job_id)['job_description']
+        fields['job_id'] = job_id
+        return client.post("/edit-job", data=fields)
+
+    assert benchmark(edit).status_code == 302
+
+
+def test_upload_resume(benchmark, client, resume_pdf):
+    rng = random.Random(SEED)
+
+    def upload():
+        data = {'job_id': str(rng.randrange(1, ROWS + 1)), 'resume': (io.BytesIO(resume_pdf), "resume.pdf")}
+        return client.post("/upload-resume", data=data)
+
+    assert benchmark(upload).status_code == 303
+
+
+@pytest.mark.parametrize("mode", ["legacy", "tfidf", "bm25"])
+def test_batch_score_target(benchmark, batch_client, resume_pdf, mode):
+    timings = []
+
+    def score():
+        start = time.perf_counter()
+        data = {'mode': mode, 'resume': (io.BytesIO(resume_pdf), "resume.pdf")}
+        response = batch_client.post("/batch-score", data=data)
+        timings.append(time.perf_counter() - start)
+        return response
+
+    score()  # warm the text cache and the term matrix
+    del timings[:]
+    response = benchmark(score)
+    assert response.status_code == 200
+    assert response.get_json()['count'] == BATCH_SCORE_ROWS
+    assert statistics.median(timings) < BATCH_SCORE_SECONDS
@@ -0,0 +1,81 @@
+"""
+Startup Benchmarks
+==================
+pytest-benchmark suite for worker cold start: importing the app, building
+it with create_app() and serving the first dashboard request, each in a
+fresh interpreter (a forked or autoscaled worker pays exactly this).
+
+Run from the repository root:
+
+    pip install pytest pytest-benchmark
+    pytest benchmarks/bench_startup.py --benchmark-autosave
+
+Every run uses a throwaway database and upload folder. The last test
+checks that heavy optional modules (PyPDF2, NumPy) are still not loaded
+after serving pages, so a regression in lazy importing fails loudly
+instead of only showing up as slower numbers.
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+# Modules only needed to parse PDFs or build score matrices
+HEAVY_MODULES = ("PyPDF2", "numpy")
+
+IMPORT_APP = "import app"
+
+CREATE_APP = """
+import app
+app.create_app({'DATABASE': %(database)r, 'UPLOAD_FOLDER': %(uploads)r})
+"""
+
+FIRST_REQUEST = """
+import app
+application = app.create_app({'DATABASE': %(database)r, 'UPLOAD_FOLDER': %(uploads)r})
+assert application.test_client().get('/dashboard').status_code == 200
+"""
+
+LOADED_MODULES = FIRST_REQUEST + """
+import json, sys
+print(json.dumps([name for name in %(modules)r if name in sys.modules]))
+"""
+
+
+def run_python(code):
+    """Run code in a fresh interpreter from the repository root; return stdout"""
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    return result.stdout
+
+
+@pytest.fixture
+def paths(tmp_path):
+    return {'database': str(tmp_path / "database.db"), 'uploads': str(tmp_path / "uploads")}
+
+
+def test_import_app(benchmark):
+    benchmark.pedantic(run_python, args=(IMPORT_APP,), rounds=10, iterations=1)
+
+
+def test_create_app(benchmark, paths):
+    run_python(CREATE_APP % paths)  # migrate once; later rounds start from an existing database
+    benchmark.pedantic(run_python, args=(CREATE_APP % paths,), rounds=10, iterations=1)
+
+
+def test_first_dashboard_request(benchmark, paths):
+    run_python(CREATE_APP % paths)
+    benchmark.pedantic(run_python, args=(FIRST_REQUEST % paths,), rounds=10, iterations=1)
+
+
+def test_heavy_modules_not_loaded(paths):
+    loaded = json.loads(run_python(LOADED_MODULES % dict(paths, modules=HEAVY_MODULES)))
+    assert loaded == []
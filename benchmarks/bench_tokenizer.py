@@ -0,0 +1,122 @@
+"""
+Tokenizer Benchmarks
+====================
+pytest-benchmark suite for the keyword extraction hot path (tokenizer.py).
+
+Run from the repository root:
+
+    pip install pytest pytest-benchmark
+    pytest benchmarks/bench_tokenizer.py --benchmark-autosave
+
+Compare against a saved run with --benchmark-compare. Documents are
+synthetic job descriptions and resumes from 1 KB to 1 MB, generated from a
+fixed seed so runs are comparable. Every benchmark first checks that the
+tokenizer still produces exactly the keywords of the original
+implementation (legacy_extract_keywords below).
+"""
+
+import os
+import random
+import re
+import sys
+from collections import Counter
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import tokenizer  # noqa: E402
+
+SIZES = {
+    "1KB": 1024,
+    "16KB": 16 * 1024,
+    "256KB": 256 * 1024,
+    "1MB": 1024 * 1024,
+}
+
+SKILLS = [
+    "python", "java", "c++", "c#", "node.js", "react", "kubernetes", "docker",
+    "aws", "azure", "gcp", "terraform", "sql", "postgresql", "kafka", "spark",
+    "airflow", "pandas", "tensorflow", "pytorch", "linux", "bash", "git",
+    "ci/cd", "rest", "graphql", "microservices", "agile", "scrum", "leadership",
+]
+FILLER = [
+    "the", "and", "with", "for", "you", "will", "our", "team", "build",
+    "design", "develop", "maintain", "scalable", "systems", "customers",
+    "experience", "years", "strong", "knowledge", "ability", "work", "role",
+    "responsible", "collaborate", "across", "product", "engineering", "data",
+]
+PUNCTUATION = ["", "", "", ",", ".", ";", ":", "/", "(", ")", "-", "!"]
+
+
+def synthetic_document(size, skill_ratio, seed):
+    """Build a document of roughly size bytes from skills and filler words"""
+    rng = random.Random(seed)
+    words = []
+    length = 0
+    while length < size:
+        pool = SKILLS if rng.random() < skill_ratio else FILLER
+        word = rng.choice(pool)
+        if rng.random() < 0.2:
+            word = word.capitalize()
+        word += rng.choice(PUNCTUATION)
+        words.append(word)
+        length += len(word) + 1
+    return " ".join(words)[:size]
+
+
+def legacy_extract_keywords(text, min_length=3):
+    """The original extract_keywords implementation, kept as the reference"""
+    text = text.lower()
+    text = re.sub(r'[^a-z0-9\s\+\#\.]', ' ', text)
+    words = text.split()
+    keywords = [
+        word for word in words
+        if len(word) >= min_length and word not in tokenizer.STOP_WORDS
+    ]
+    return [word for word, count in Counter(keywords).most_common(50)]
+
+
+@pytest.fixture(params=list(SIZES), scope="module")
+def job_description(request):
+    return synthetic_document(SIZES[request.param], skill_ratio=0.3, seed=1)
+
+
+@pytest.fixture(params=list(SIZES), scope="module")
+def resume(request):
+    return synthetic_document(SIZES[request.param], skill_ratio=0.15, seed=2)
+
+
+def test_extract_keywords_job_description(benchmark, job_description):
+    expected = legacy_extract_keywords(job_description)
+    assert benchmark(tokenizer.extract_keywords, job_description) == expected
+
+
+def test_extract_keywords_resume(benchmark, resume):
+    expected = legacy_extract_keywords(resume)
+    assert benchmark(tokenizer.extract_keywords, resume) == expected
+
+
+def test_legacy_extract_keywords_job_description(benchmark, job_description):
+    """Baseline: the original implementation on the same inputs"""
+    benchmark(legacy_extract_keywords, job_description)
+
+
+def test_keyword_frequencies_many(benchmark):
+    documents = [synthetic_document(4096, 0.3, seed) for seed in range(200)]
+    expected = [legacy_extract_keywords(document) for document in documents]
+    result = benchmark(tokenizer.keyword_frequencies_many, documents)
+    assert [[word for word, count in pairs] for pairs in result] == expected
+
+
+def test_vocabulary_encode(benchmark):
+    documents = tokenizer.tokenize_many(
+        synthetic_document(4096, 0.3, seed) for seed in range(200)
+    )
+    vocabulary = tokenizer.Vocabulary()
+    vocabulary.encode_many(documents)
+    encoded = benchmark(vocabulary.encode_many, documents, False)
+    assert [sorted(set(vocabulary.decode(ids))) for ids in encoded] == \
+        [sorted(set(tokens)) for tokens in documents]
@@ -0,0 +1,462 @@
+"""
+Load Test Harness
+=================
+Offline end-to-end load test: seeds a database with synthetic jobs, serves
+the app on a local port and drives the main routes from concurrent
+clients, then reports latency percentiles, throughput and peak memory as
+JSON.
+
+Run from the repository root:
+
+    python benchmarks/loadtest.py --rows 1000 10000 100000 --output loadtest.json
+
+Each row count runs in a fresh interpreter:
+
+1. Seed: jobs are generated from a fixed seed and inserted through the
+   bulk import path (import_jobs), so keyword, term, search and
+   statistics indexes are built exactly as in production. Seeded
+   databases are kept in --workdir and reused by later runs.
+2. Warm up: a few synthetic resume PDFs are analyzed so /export-results
+   has analyses to report on.
+3. Load: --concurrency client threads send requests for --duration
+   seconds to a threaded server on 127.0.0.1, picking routes by weight:
+
+   dashboard       GET  /dashboard (random filter, sort and page)
+   add_job         POST /add-job
+   edit_job        POST /edit-job (a tenth change the description)
+   upload_resume   POST /upload-resume (synthetic PDF)
+   export_results  GET  /export-results/<analyzed job>
+
+Resume analyses run inline (ASYNC_ANALYSIS off) so upload latency covers
+the whole analysis; pass --config ASYNC_ANALYSIS=true to measure only the
+hand-off. Any other setting can be overridden the same way (values are
+parsed as JSON), e.g. --config FRAGMENT_CACHE='"off"'.
+
+Report: for every row count, seeding time, peak RSS of the process
+(server and clients together) and per route the number of requests,
+errors (HTTP 400 and above, or no response), throughput and mean/p50/p95/
+p99 latency in milliseconds. The same --seed gives the same data and the
+same request mix.
+"""
+
+import argparse
+import http.client
+import json
+import logging
+import multiprocessing
+import os
+import platform
+import queue
+import random
+import resource
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from datetime import date, timedelta
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+# Route -> relative weight in the request mix
+SCENARIO_WEIGHTS = {
+    'dashboard': 50,
+    'add_job': 10,
+    'edit_job': 10,
+    'upload_resume': 10,
+    'export_results': 20,
+}
+
+SKILLS = [
+    "python", "java", "c++", "c#", "node.js", "react", "kubernetes", "docker",
+    "aws", "azure", "gcp", "terraform", "sql", "postgresql", "kafka", "spark",
+    "airflow", "pandas", "tensorflow", "pytorch", "linux", "bash", "git",
+    "ci/cd", "rest api", "graphql", "microservices", "agile", "scrum",
+    "machine learning", "data science", "spring boot", "unit testing",
+]
+FILLER = [
+    "the", "and", "with", "for", "you", "will", "our", "team", "build",
+    "design", "develop", "maintain", "scalable", "systems", "customers",
+    "experience", "years", "strong", "knowledge", "ability", "work", "role",
+    "responsible", "collaborate", "across", "product", "engineering", "data",
+]
+COMPANIES = ["Acme", "Globex", "Initech", "Umbrella", "Hooli", "Stark", "Wayne", "Wonka", "Tyrell", "Cyberdyne"]
+ROLES = ["Backend Engineer", "Data Scientist", "DevOps Engineer", "Frontend Developer", "ML Engineer", "SRE"]
+STATUSES = ["Applied", "Applied", "Applied", "Interview", "Rejected"]
+
+# Jobs analyzed during warm-up (targets of export_results)
+WARMUP_ANALYSES = 20
+
+
+# ============================================================
+# SYNTHETIC DATA
+# ============================================================
+
+def synthetic_text(rng, words, skill_ratio):
+    """Sentence-cased text of roughly words words mixing skills and filler"""
+    out = []
+    for i in range(words):
+        word = rng.choice(SKILLS if rng.random() < skill_ratio else FILLER)
+        out.append(word + ("." if i % 12 == 11 else ""))
+    return " ".join(out)
+
+
+def synthetic_job(rng):
+    """One job record as accepted by the add-job form and bulk import"""
+    applied = date(2024, 1, 1) + timedelta(days=rng.randrange(700))
+    status = rng.choice(STATUSES)
+    return {
+        'company': f"{rng.choice(COMPANIES)} {rng.randrange(1000)}",
+        'role': rng.choice(ROLES),
+        'job_description': synthetic_text(rng, rng.randrange(80, 250), skill_ratio=0.3),
+        'status': status,
+        'date_applied': applied.isoformat(),
+        'interview_date': (applied + timedelta(days=14)).isoformat() if status == "Interview" else "",
+        'notes': "Referral" if rng.random() < 0.1 else "",
+    }
+
+
+def _pdf_string(text):
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def synthetic_pdf(rng, pages=2, lines_per_page=40):
+    """A minimal valid PDF whose pages hold synthetic resume lines"""
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None, "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for page in range(pages):
+        lines = [_pdf_string(synthetic_text(rng, 10, skill_ratio=0.2)) for _ in range(lines_per_page)]
+        stream = "BT /F1 10 Tf 12 TL 50 750 Td " + " ".join(f"({line}) Tj T*" for line in lines) + " ET"
+        kids.append(f"{len(objects) + 1} 0 R")
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects) + 2} 0 R >>"
+        )
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {pages} >>"
+
+    out = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1")
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode()
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return out
+
+
+def seeded_job(seed, job_id):
+    """The job record seeded as job_id (the same for every run with seed)"""
+    return synthetic_job(random.Random(f"{seed}-job-{job_id}"))
+
+
+def seed_database(path, rows, seed):
+    """
+    Create a database with rows synthetic jobs through the bulk import path.
+
+    Returns:
+        float: Seconds taken
+    """
+    import app
+
+    started = time.perf_counter()
+    application = app.create_app({'DATABASE': path, 'UPLOAD_FOLDER': os.path.join(os.path.dirname(path), "uploads")})
+    records = ((line, seeded_job(seed, line), None) for line in range(1, rows + 1))
+    with application.app_context():
+        result = app.import_jobs(
+            app.get_db(), records, app.current_user_id(), application.config["IMPORT_BATCH_SIZE"]
+        )
+    if result['imported'] != rows:
+        raise RuntimeError(f"Seeding imported {result['imported']} of {rows} jobs: {result['errors']}")
+    app.db.close_pool()
+    return time.perf_counter() - started
+
+
+# ============================================================
+# CLIENT
+# ============================================================
+
+def encode_multipart(fields, files):
+    """Encode form fields and (name, filename, bytes) files as multipart/form-data"""
+    boundary = uuid.uuid4().hex
+    body = bytearray()
+    for name, value in fields.items():
+        body += f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode()
+    for name, filename, content in files:
+        body += (
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"; filename="{filename}"\r\n'
+            f'Content-Type: application/pdf\r\n\r\n'
+        ).encode()
+        body += content + b"\r\n"
+    body += f"--{boundary}--\r\n".encode()
+    return bytes(body), f"multipart/form-data; boundary={boundary}"
+
+
+class Client:
+    """Issues scenario requests against the local server and records their latency"""
+
+    def __init__(self, port, rng, state):
+        self.port = port
+        self.rng = rng
+        self.state = state
+        self.samples = []  # (scenario, seconds, ok)
+
+    def request(self, method, path, body=None, content_type=None):
+        connection = http.client.HTTPConnection("127.0.0.1", self.port, timeout=120)
+        headers = {'Content-Type': content_type} if content_type else {}
+        try:
+            connection.request(method, path, body=body, headers=headers)
+            response = connection.getresponse()
+            response.read()
+            return response.status
+        finally:
+            connection.close()
+
+    def run(self, scenario):
+        started = time.perf_counter()
+        try:
+            status = getattr(self, scenario)()
+            ok = status < 400
+        except (OSError, http.client.HTTPException):
+            ok = False
+        self.samples.append((scenario, time.perf_counter() - started, ok))
+
+    def dashboard(self):
+        rng = self.rng
+        params = [f"page={rng.randrange(1, 20)}", f"sort={rng.choice(['date-desc', 'ats-desc', 'company'])}"]
+        if rng.random() < 0.3:
+            params.append(f"status={rng.choice(['Applied', 'Interview', 'Rejected'])}")
+        if rng.random() < 0.2:
+            params.append(f"ats={rng.choice(['80+', '60-79', 'below60', 'unanalyzed'])}")
+        return self.request("GET", "/dashboard?" + "&".join(params))
+
+    def add_job(self):
+        body, content_type = encode_multipart(synthetic_job(self.rng), [])
+        return self.request("POST", "/add-job", body, content_type)
+
+    def edit_job(self):
+        rng = self.rng
+        job_id = rng.randrange(1, self.state['rows'] + 1)
+        fields = synthetic_job(rng)
+        if rng.random() >= 0.1:
+            # Description kept (as seeded): no re-index or re-score
+            fields['job_description'] = seeded_job(self.state['seed'], job_id)['job_description']
+        fields['job_id'] = job_id
+        body, content_type = encode_multipart(fields, [])
+        return self.request("POST", "/edit-job", body, content_type)
+
+    def upload_resume(self):
+        rng = self.rng
+        job_id = rng.randrange(1, self.state['rows'] + 1)
+        body, content_type = encode_multipart(
+            {'job_id': job_id}, [("resume", "resume.pdf", rng.choice(self.state['resumes']))]
+        )
+        return self.request("POST", "/upload-resume", body, content_type)
+
+    def export_results(self):
+        return self.request("GET", f"/export-results/{self.rng.choice(self.state['analyzed'])}")
+
+
+# ============================================================
+# RUN
+# ============================================================
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an ascending list"""
+    if not sorted_values:
+        return None
+    rank = max(int(fraction * len(sorted_values) + 0.999999) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+def summarize(samples, elapsed):
+    """Request count, errors, throughput and latency percentiles (ms) of samples"""
+    latencies = sorted(seconds for scenario, seconds, ok in samples)
+    return {
+        'requests': len(samples),
+        'errors': sum(1 for scenario, seconds, ok in samples if not ok),
+        'throughput_rps': round(len(samples) / elapsed, 2) if elapsed else 0.0,
+        'mean_ms': round(1000 * sum(latencies) / len(latencies), 2) if latencies else None,
+        'p50_ms': round(1000 * percentile(latencies, 0.50), 2) if latencies else None,
+        'p95_ms': round(1000 * percentile(latencies, 0.95), 2) if latencies else None,
+        'p99_ms': round(1000 * percentile(latencies, 0.99), 2) if latencies else None,
+    }
+
+
+def peak_rss_bytes():
+    """Peak resident set size of this process"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024  # Linux reports KiB
+
+
+def run_load(rows, options):
+    """Seed (or reuse) a database of rows jobs, load the server, return the report entry"""
+    sys.path.insert(0, ROOT)
+    from werkzeug.serving import make_server
+
+    import app
+
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)  # no line per request
+    seeded = os.path.join(options['workdir'], f"jobs-{rows}-{options['seed']}.db")
+    seed_seconds = None
+    if not os.path.exists(seeded):
+        seed_seconds = seed_database(seeded + ".tmp", rows, options['seed'])
+        os.replace(seeded + ".tmp", seeded)
+
+    # Every run starts from a copy of the seeded database
+    run_dir = tempfile.mkdtemp(dir=options['workdir'])
+    database = os.path.join(run_dir, "database.db")
+    shutil.copyfile(seeded, database)
+    config = {'DATABASE': database, 'UPLOAD_FOLDER': os.path.join(run_dir, "uploads"), 'ASYNC_ANALYSIS': False}
+    config.update(options['config'])
+    application = app.create_app(config)
+
+    server = make_server("127.0.0.1", 0, application, threaded=True)
+    server_thread = threading.Thread(target=server.serve_forever, daemon=True)
+    server_thread.start()
+    try:
+        rng = random.Random(options['seed'])
+        state = {
+            'rows': rows,
+            'seed': options['seed'],
+            'resumes': [synthetic_pdf(rng) for _ in range(options['resumes'])],
+            'analyzed': [],
+        }
+
+        # Warm up: analyze resumes so export_results has reports to build
+        warmup = Client(server.server_port, rng, state)
+        for job_id in rng.sample(range(1, rows + 1), min(WARMUP_ANALYSES, rows)):
+            body, content_type = encode_multipart(
+                {'job_id': job_id}, [("resume", "resume.pdf", rng.choice(state['resumes']))]
+            )
+            warmup.request("POST", "/upload-resume", body, content_type)
+            state['analyzed'].append(job_id)
+
+        scenarios = list(SCENARIO_WEIGHTS)
+        weights = [SCENARIO_WEIGHTS[scenario] for scenario in scenarios]
+        clients = [
+            Client(server.server_port, random.Random(f"{options['seed']}-{rows}-{number}"), state)
+            for number in range(options['concurrency'])
+        ]
+        deadline = time.perf_counter() + options['duration']
+
+        def drive(client):
+            while time.perf_counter() < deadline:
+                client.run(client.rng.choices(scenarios, weights)[0])
+
+        threads = [threading.Thread(target=drive, args=(client,)) for client in clients]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+    finally:
+        server.shutdown()
+        server.server_close()
+        app.db.close_pool()
+
+    samples = [sample for client in clients for sample in client.samples]
+    if not options['keep']:
+        shutil.rmtree(run_dir, ignore_errors=True)
+    return {
+        'rows': rows,
+        'seed_seconds': round(seed_seconds, 2) if seed_seconds is not None else None,
+        'elapsed_seconds': round(elapsed, 2),
+        'peak_rss_bytes': peak_rss_bytes(),
+        'total': summarize(samples, elapsed),
+        'routes': {
+            scenario: summarize([sample for sample in samples if sample[0] == scenario], elapsed)
+            for scenario in scenarios
+        },
+    }
+
+
+def _run_in_child(rows, options, results):
+    results.put(run_load(rows, options))
+
+
+def parse_config(values):
+    """KEY=VALUE settings, values parsed as JSON when possible (as for JOBTRACKER_* variables)"""
+    config = {}
+    for item in values:
+        key, _, value = item.partition("=")
+        try:
+            config[key] = json.loads(value)
+        except ValueError:
+            config[key] = value
+    return config
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline load test of the job tracker routes")
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000, 100000], help="Seeded job counts")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent client threads")
+    parser.add_argument("--duration", type=float, default=20.0, help="Seconds of load per row count")
+    parser.add_argument("--resumes", type=int, default=4, help="Distinct synthetic resume PDFs")
+    parser.add_argument("--seed", type=int, default=1, help="Seed for data and request mix")
+    parser.add_argument("--workdir", help="Where seeded databases are kept (default: a temporary folder)")
+    parser.add_argument("--keep", action="store_true", help="Keep each run's database and uploads")
+    parser.add_argument("--config", action="append", default=[], metavar="KEY=VALUE", help="App setting override")
+    parser.add_argument("--output", help="Write the JSON report here (default: stdout)")
+    args = parser.parse_args(argv)
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix="jobtracker-loadtest-")
+    os.makedirs(workdir, exist_ok=True)
+    options = {
+        'workdir': os.path.abspath(workdir),
+        'seed': args.seed,
+        'concurrency': args.concurrency,
+        'duration': args.duration,
+        'resumes': args.resumes,
+        'keep': args.keep,
+        'config': parse_config(args.config),
+    }
+
+    # A fresh interpreter per row count keeps peak RSS and caches separate
+    context = multiprocessing.get_context("spawn")
+    runs = []
+    try:
+        for rows in args.rows:
+            results = context.Queue()
+            child = context.Process(target=_run_in_child, args=(rows, options, results))
+            child.start()
+            while True:
+                try:
+                    runs.append(results.get(timeout=1))
+                    break
+                except queue.Empty:
+                    if not child.is_alive():
+                        raise RuntimeError(f"Load test of {rows} rows failed (exit code {child.exitcode})")
+            child.join()
+            print(f"{rows} rows: {runs[-1]['total']}", file=sys.stderr)
+    finally:
+        if not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        'meta': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'seed': args.seed,
+            'concurrency': args.concurrency,
+            'duration_seconds': args.duration,
+            'weights': SCENARIO_WEIGHTS,
+            'config': options['config'],
+        },
+        'runs': runs,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+"""
+Database Connection Layer
+=========================
+Manages SQLite connections for the Job Tracker application.
+
+Each request (or app context) gets exactly one connection, reused by every
+get_db() call made while handling it. When the app context is torn down the
+connection is rolled back to a clean state and returned to a small
+per-database pool, so later requests skip the cost of opening and
+configuring a new connection.
+
+Every new connection is tuned for concurrent web traffic:
+- WAL journal mode (readers don't block the writer)
+- synchronous=NORMAL (no fsync on every commit; safe with WAL)
+- larger page cache and memory-mapped I/O
+- busy timeout so concurrent writers wait instead of failing
+
+With tenant sharding (TENANT_DATABASES, see app.py) the current request's
+database is the signed-in tenant's own file: database_path() returns it
+and get_db() connects to it, each file with its own pool.
+
+Connections are TimedConnection objects: every statement's execution and
+fetch time is added to the current request's metrics (see metrics.py).
+"""
+
+import sqlite3
+import threading
+import time
+from flask import g, current_app, has_app_context
+
+import metrics
+
+DEFAULT_DATABASE = "database.db"
+DEFAULT_POOL_SIZE = 8
+
+# PRAGMAs applied to every new connection
+CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA cache_size = -16000",      # 16MB page cache (negative = KiB)
+    "PRAGMA mmap_size = 268435456",    # 256MB memory-mapped I/O
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA busy_timeout = 5000",
+)
+
+# Idle connections per database path
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+class TimedCursor(sqlite3.Cursor):
+    """Cursor that reports statement and fetch time to metrics.record_query"""
+
+    def execute(self, *args):
+        started = time.perf_counter()
+        try:
+            return super().execute(*args)
+        finally:
+            metrics.record_query(time.perf_counter() - started)
+
+    def executemany(self, *args):
+        started = time.perf_counter()
+        try:
+            return super().executemany(*args)
+        finally:
+            metrics.record_query(time.perf_counter() - started)
+
+    def fetchone(self):
+        started = time.perf_counter()
+        try:
+            return super().fetchone()
+        finally:
+            timings = metrics.current()
+            if timings is not None:
+                timings.db_seconds += time.perf_counter() - started
+
+    def fetchall(self):
+        started = time.perf_counter()
+        try:
+            return super().fetchall()
+        finally:
+            timings = metrics.current()
+            if timings is not None:
+                timings.db_seconds += time.perf_counter() - started
+
+
+class TimedConnection(sqlite3.Connection):
+    """Connection whose cursors (including execute shortcuts) are TimedCursors"""
+
+    def cursor(self, factory=TimedCursor):
+        return super().cursor(factory)
+
+    def execute(self, *args):
+        return self.cursor().execute(*args)
+
+    def executemany(self, *args):
+        return self.cursor().executemany(*args)
+
+
+def connect(path):
+    """Open a new configured connection with row factory for easier data access"""
+    # Pooled connections move between worker threads, but only one request
+    # uses a connection at a time
+    conn = sqlite3.connect(path, check_same_thread=False, factory=TimedConnection)
+    conn.row_factory = sqlite3.Row  # Access columns by name
+    for pragma in CONNECTION_PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+
+def _acquire(path):
+    """Take an idle connection from the pool, or open a new one"""
+    with _pools_lock:
+        pool = _pools.get(path)
+        if pool:
+            return pool.pop()
+    return connect(path)
+
+
+def _release(path, conn, pool_size):
+    """Return a connection to the pool, closing it if the pool is full"""
+    try:
+        # Discard anything the request left uncommitted
+        conn.rollback()
+    except sqlite3.Error:
+        conn.close()
+        return
+
+    with _pools_lock:
+        pool = _pools.setdefault(path, [])
+        if len(pool) < pool_size:
+            pool.append(conn)
+            return
+    conn.close()
+
+
+def database_path():
+    """Database file of the current app context: the tenant's shard (g.tenant_database) or DATABASE"""
+    return g.get("tenant_database") or current_app.config.get("DATABASE", DEFAULT_DATABASE)
+
+
+def get_db():
+    """
+    Get the database connection for the current request.
+
+    The same connection is returned on every call and released
+    automatically on teardown - callers must not close it. Code running
+    outside an app context (worker processes, scripts) has no configured
+    DATABASE to fall back on and must use connect(path) instead.
+
+    Raises:
+        RuntimeError: If called outside an app context
+    """
+    if not has_app_context():
+        raise RuntimeError("get_db() needs an app context; use db.connect(path) outside one")
+
+    if "db" not in g:
+        g.db_path = database_path()
+        g.db = _acquire(g.db_path)
+    return g.db
+
+
+def close_db(e=None):
+    """Release the current request's connection back to the pool"""
+    conn = g.pop("db", None)
+    if conn is not None:
+        pool_size = current_app.config.get("DB_POOL_SIZE", DEFAULT_POOL_SIZE)
+        _release(g.pop("db_path"), conn, pool_size)
+
+
+def close_pool():
+    """Close every idle pooled connection (e.g. before forking workers)"""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        for conn in pool:
+            conn.close()
+
+
+def init_app(app):
+    """Register connection teardown with the Flask app"""
+    app.teardown_appcontext(close_db)
@@ -0,0 +1,227 @@
+"""
+Fragment Cache
+==============
+Rendered HTML (the dashboard page, the job dropdown of the resume
+checker) kept between requests, so pages that only show jobs are rendered
+once per change instead of once per hit.
+
+Entries are keyed by a namespace, the namespace's revision and the render
+parameters:
+
+- Each database and user has its own jobs namespace, whose revision is
+  the user's jobs row of table_revisions, bumped by triggers on every
+  change to that user's job data (add, edit, import, ATS score update).
+  A change means a new key, so stale HTML is never served - not even
+  after writes made by another worker process or the CLI - while other
+  users' entries stay valid. A hit costs that one primary-key read
+  instead of the job queries and the Jinja render.
+- invalidate(namespace) is called after every write (write-through) and
+  drops the namespace's entries right away, so superseded revisions don't
+  hold memory until they age out.
+- Entries expire FRAGMENT_CACHE_TTL seconds after they were rendered, and
+  beyond FRAGMENT_CACHE_SIZE entries the least recently used are evicted.
+
+Backends (FRAGMENT_CACHE setting):
+- memory: an LRU dictionary per process (default)
+- sqlite: a SQLite file (FRAGMENT_CACHE_PATH) shared by all worker
+  processes, so a fragment rendered by one worker serves every worker
+- off: no caching
+"""
+
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import db
+
+BACKENDS = ('memory', 'sqlite', 'off')
+
+
+class MemoryBackend:
+    """Per-process LRU dictionary with a time-to-live per entry"""
+
+    name = 'memory'
+
+    def __init__(self, max_entries, ttl):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (expires_at, value), least recently used first
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= now:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, namespace):
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == namespace]:
+                del self._entries[key]
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SQLiteBackend:
+    """
+    LRU table with a time-to-live per entry in a SQLite file shared by all
+    processes. Each thread of each process opens its own connection.
+    """
+
+    name = 'sqlite'
+
+    def __init__(self, path, max_entries, ttl):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._local = threading.local()
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        # A connection must not cross a fork
+        if conn is None or self._local.pid != os.getpid():
+            conn = db.connect(self.path)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS fragments (
+                    key TEXT PRIMARY KEY,
+                    namespace TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    expires_at REAL NOT NULL,
+                    last_used REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_fragments_namespace ON fragments(namespace)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_fragments_last_used ON fragments(last_used)")
+            conn.commit()
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def get(self, key):
+        conn = self._connect()
+        now = time.time()
+        row = conn.execute(
+            "SELECT value FROM fragments WHERE key = ? AND expires_at > ?", (_encode(key), now)
+        ).fetchone()
+        if row is None:
+            return None
+        conn.execute("UPDATE fragments SET last_used = ? WHERE key = ?", (now, _encode(key)))
+        conn.commit()
+        return row[0]
+
+    def set(self, key, value):
+        conn = self._connect()
+        now = time.time()
+        conn.execute(
+            """
+            INSERT OR REPLACE INTO fragments (key, namespace, value, expires_at, last_used)
+            VALUES (?, ?, ?, ?, ?)
+            """,
+            (_encode(key), key[0], value, now + self.ttl, now)
+        )
+        conn.execute("DELETE FROM fragments WHERE expires_at <= ?", (now,))
+        conn.execute(
+            """
+            DELETE FROM fragments WHERE key IN (
+                SELECT key FROM fragments ORDER BY last_used DESC LIMIT -1 OFFSET ?
+            )
+            """,
+            (self.max_entries,)
+        )
+        conn.commit()
+
+    def invalidate(self, namespace):
+        conn = self._connect()
+        conn.execute("DELETE FROM fragments WHERE namespace = ?", (namespace,))
+        conn.commit()
+
+    def __len__(self):
+        return self._connect().execute("SELECT COUNT(*) FROM fragments").fetchone()[0]
+
+
+def _encode(key):
+    return json.dumps(key, separators=(",", ":"))
+
+
+class FragmentCache:
+    """Rendered fragments keyed by (namespace, revision, *params) on a backend"""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_render(self, namespace, revision, params, render):
+        """
+        Return the cached fragment, rendering and storing it on a miss.
+
+        Args:
+            namespace (str): Data the fragment shows (invalidated together)
+            revision: Current revision of that data
+            params (tuple): Everything else the output depends on
+            render: Function returning the fragment as a string
+
+        Returns:
+            str: The rendered fragment
+        """
+        key = (namespace, revision) + tuple(params)
+        value = self.backend.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+        self.misses += 1
+        value = str(render())
+        self.backend.set(key, value)
+        return value
+
+    def invalidate(self, namespace):
+        """Drop every fragment of a namespace (call after writing its data)"""
+        self.backend.invalidate(namespace)
+
+    def stats(self):
+        """Hit/miss counters of this process and the backend's size"""
+        lookups = self.hits + self.misses
+        return {
+            'backend': self.backend.name,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+            'entries': len(self.backend),
+            'max_entries': self.backend.max_entries,
+            'ttl_seconds': self.backend.ttl,
+        }
+
+
+def create_cache(config):
+    """
+    Build the fragment cache described by the FRAGMENT_CACHE* settings.
+
+    Returns:
+        FragmentCache: The cache, or None if FRAGMENT_CACHE is off
+    """
+    backend = config.get("FRAGMENT_CACHE", "memory")
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown FRAGMENT_CACHE backend: {backend!r} (expected one of {', '.join(BACKENDS)})")
+    if backend == 'off':
+        return None
+    max_entries = config.get("FRAGMENT_CACHE_SIZE", 256)
+    ttl = config.get("FRAGMENT_CACHE_TTL", 300)
+    if backend == 'sqlite':
+        return FragmentCache(SQLiteBackend(config.get("FRAGMENT_CACHE_PATH", "fragment_cache.db"), max_entries, ttl))
+    return FragmentCache(MemoryBackend(max_entries, ttl))
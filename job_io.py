@@ -0,0 +1,150 @@
+"""
+Job Import / Export
+===================
+Validation and streaming CSV / JSONL readers and writers for job records.
+
+Readers take a binary stream and yield one record at a time, so an import
+never holds the whole file in memory. Writers take an iterable of row
+dicts and yield text chunks, suitable for a streamed HTTP response or for
+writing to a file.
+
+The database side (batched inserts, keyword precomputation) lives in
+app.py (import_jobs / export_rows).
+"""
+
+import csv
+import io
+import json
+from datetime import date
+
+# Columns accepted from an import file, in insert order (others are ignored)
+JOB_FIELDS = ('company', 'role', 'job_description', 'status', 'date_applied', 'interview_date', 'notes')
+
+JOB_STATUSES = ('Applied', 'Interview', 'Rejected')
+
+# Optional date fields, stored as ISO dates (what <input type="date"> sends)
+DATE_FIELDS = ('date_applied', 'interview_date')
+
+FORMATS = ('csv', 'jsonl')
+
+
+def validate_job(record):
+    """
+    Validate and normalize one job, with the same rules as the add-job form.
+
+    Args:
+        record: Mapping with (some of) JOB_FIELDS - a form or an import row
+
+    Returns:
+        tuple: (values, errors) - values is a tuple in JOB_FIELDS order with
+        blanks turned into None (status defaults to Applied); errors is a
+        list of messages, empty if the job is valid
+    """
+    job = {}
+    for field in JOB_FIELDS:
+        value = record.get(field)
+        job[field] = str(value).strip() if value is not None else ""
+
+    errors = []
+    if not job['company']:
+        errors.append("Company name is required")
+    if not job['role']:
+        errors.append("Job role is required")
+    if not job['job_description']:
+        errors.append("Job description is required for ATS analysis")
+
+    if not job['status']:
+        job['status'] = "Applied"
+    elif job['status'] not in JOB_STATUSES:
+        errors.append(f"Status must be one of: {', '.join(JOB_STATUSES)}")
+
+    for field in DATE_FIELDS:
+        if job[field]:
+            try:
+                date.fromisoformat(job[field])
+            except ValueError:
+                errors.append(f"{field.replace('_', ' ').capitalize()} must be a date (YYYY-MM-DD)")
+
+    values = tuple(job[field] or None for field in JOB_FIELDS)
+    return values, errors
+
+
+def detect_format(filename, default=None):
+    """Return 'csv' or 'jsonl' from a file name's extension (default if unknown)"""
+    extension = filename.rsplit(".", 1)[-1].lower() if filename and "." in filename else ""
+    if extension in ("jsonl", "ndjson"):
+        return 'jsonl'
+    if extension == "csv":
+        return 'csv'
+    return default
+
+
+def read_records(stream, fmt):
+    """
+    Stream records from a CSV or JSONL file.
+
+    Args:
+        stream: Binary file-like object
+        fmt (str): 'csv' (header row required) or 'jsonl' (one object per line)
+
+    Yields:
+        tuple: (line_number, record, error) - record is a dict, or None
+        with an error message if the line could not be parsed
+    """
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+
+    if fmt == 'csv':
+        reader = csv.DictReader(text)
+        for record in reader:
+            yield reader.line_num, record, None
+        return
+
+    for line_number, line in enumerate(text, 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield line_number, None, f"Invalid JSON: {e}"
+            continue
+        if not isinstance(record, dict):
+            yield line_number, None, "Each line must be a JSON object"
+            continue
+        yield line_number, record, None
+
+
+def write_records(rows, columns, fmt):
+    """
+    Stream rows as CSV (with a header row) or JSONL.
+
+    Args:
+        rows (iterable): Dicts keyed by column name; list values are written
+            as JSON arrays, or space-separated in CSV
+        columns (list): Column names, in output order
+        fmt (str): 'csv' or 'jsonl'
+
+    Yields:
+        str: Output chunks (one line or CSV record each)
+    """
+    if fmt == 'jsonl':
+        for row in rows:
+            yield json.dumps({column: row[column] for column in columns}) + "\n"
+        return
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def flush():
+        chunk = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return chunk
+
+    writer.writerow(columns)
+    yield flush()
+    for row in rows:
+        writer.writerow([
+            " ".join(value) if isinstance(value, list) else value
+            for value in (row[column] for column in columns)
+        ])
+        yield flush()
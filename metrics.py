@@ -0,0 +1,271 @@
+"""
+Performance Metrics
+===================
+In-process timing hooks and Prometheus text-format histograms.
+
+Histograms:
+- jobtracker_request_duration_seconds{endpoint, method, status}
+- jobtracker_request_db_seconds{endpoint}: SQLite time per request
+- jobtracker_request_db_queries{endpoint}: SQLite statements per request
+- jobtracker_stage_duration_seconds{stage}: pdf_parse, tokenize, score
+  and render; background tasks also record task (whole task) and task_db
+
+Each process keeps its own histograms in memory. Background analysis
+tasks run in worker processes, so run_task flushes their histograms into
+the metric_histograms table when a task ends; render() adds those to the
+serving process's own, so /metrics covers both without any external
+service.
+
+With several web server processes (e.g. gunicorn --workers 4), /metrics
+therefore reports the in-memory histograms of whichever process served
+the scrape, plus every flushed task worker row - not the other web
+processes' requests. Scrape each web process separately (or run a
+single one) for complete request histograms.
+
+Timing of the request (or task) in progress is tracked per thread:
+begin() starts a Timings record, stage() / record_query() add to it, and
+end() returns it for the Server-Timing header and the slow-request log.
+Records nest, so a task run inline inside a request is timed on its own.
+"""
+
+import json
+import threading
+import time
+from contextlib import contextmanager
+
+# Bucket upper bounds (seconds unless noted); +Inf is implicit
+DURATION_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+
+class Histogram:
+    """Prometheus-style histogram with a fixed label set"""
+
+    def __init__(self, name, help_text, buckets, label_names):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        self.label_names = label_names
+        self._series = {}  # label values -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        """Record one observation for the given label values (in label_names order)"""
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                index = i
+                break
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+            series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def drain(self):
+        """Return and reset all series (label values -> counts/sum/count list)"""
+        with self._lock:
+            series, self._series = self._series, {}
+        return series
+
+    def snapshot(self):
+        """Return a copy of all series"""
+        with self._lock:
+            return {labels: list(values) for labels, values in self._series.items()}
+
+
+REQUEST_DURATION = Histogram(
+    "jobtracker_request_duration_seconds", "Time to handle a request",
+    DURATION_BUCKETS, ("endpoint", "method", "status"),
+)
+REQUEST_DB_TIME = Histogram(
+    "jobtracker_request_db_seconds", "Time spent in SQLite per request",
+    DURATION_BUCKETS, ("endpoint",),
+)
+REQUEST_DB_QUERIES = Histogram(
+    "jobtracker_request_db_queries", "SQLite statements executed per request",
+    QUERY_COUNT_BUCKETS, ("endpoint",),
+)
+STAGE_DURATION = Histogram(
+    "jobtracker_stage_duration_seconds", "Time spent in a processing stage",
+    DURATION_BUCKETS, ("stage",),
+)
+
+HISTOGRAMS = (REQUEST_DURATION, REQUEST_DB_TIME, REQUEST_DB_QUERIES, STAGE_DURATION)
+
+
+# ============================================================
+# PER-REQUEST TIMINGS
+# ============================================================
+
+class Timings:
+    """Time spent by one request or task, in seconds"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.db_seconds = 0.0
+        self.db_queries = 0
+        self.stages = {}
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+
+_local = threading.local()
+
+
+def _stack():
+    stack = getattr(_local, "stack", None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+
+def begin():
+    """Start timing a request or task on this thread"""
+    timings = Timings()
+    _stack().append(timings)
+    return timings
+
+
+def end():
+    """Stop timing the innermost request or task and return its Timings (None if none)"""
+    stack = _stack()
+    return stack.pop() if stack else None
+
+
+def current():
+    """Timings of the innermost request or task running on this thread, or None"""
+    stack = getattr(_local, "stack", None)
+    return stack[-1] if stack else None
+
+
+def record_query(seconds):
+    """Add one SQLite statement to the current timings (see db.TimedCursor)"""
+    timings = current()
+    if timings is not None:
+        timings.db_seconds += seconds
+        timings.db_queries += 1
+
+
+def record_stage(stage, seconds):
+    """Record time spent in a stage (histogram and current timings)"""
+    STAGE_DURATION.observe(seconds, stage)
+    timings = current()
+    if timings is not None:
+        timings.stages[stage] = timings.stages.get(stage, 0.0) + seconds
+
+
+@contextmanager
+def stage(name):
+    """Time the enclosed block as stage name"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(name, time.perf_counter() - started)
+
+
+def server_timing(timings):
+    """Format Timings as a Server-Timing header value (durations in ms)"""
+    entries = [f'db;dur={timings.db_seconds * 1000:.2f};desc="{timings.db_queries} queries"']
+    for name, seconds in sorted(timings.stages.items()):
+        entries.append(f"{name};dur={seconds * 1000:.2f}")
+    entries.append(f"total;dur={timings.elapsed() * 1000:.2f}")
+    return ", ".join(entries)
+
+
+# ============================================================
+# CROSS-PROCESS AGGREGATION AND EXPORT
+# ============================================================
+
+def flush(conn):
+    """
+    Move this process's histograms into the metric_histograms table.
+
+    Called by worker processes when a task ends, so the serving process
+    can include their stage timings in render(). The read-merge-write
+    runs in one BEGIN IMMEDIATE transaction, so workers flushing at the
+    same time never overwrite each other's counts.
+
+    Args:
+        conn: Database connection with no open transaction (committed here)
+    """
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        for histogram in HISTOGRAMS:
+            for labels, values in histogram.drain().items():
+                key = json.dumps(labels)
+                row = conn.execute(
+                    "SELECT counts FROM metric_histograms WHERE name = ? AND labels = ?",
+                    (histogram.name, key)
+                ).fetchone()
+                if row:
+                    values = [a + b for a, b in zip(json.loads(row[0]), values)]
+                conn.execute(
+                    "INSERT OR REPLACE INTO metric_histograms (name, labels, counts) VALUES (?, ?, ?)",
+                    (histogram.name, key, json.dumps(values))
+                )
+    except BaseException:
+        conn.rollback()
+        raise
+    conn.commit()
+
+
+def reset():
+    """Discard this process's histograms (e.g. copies inherited by a forked worker)"""
+    for histogram in HISTOGRAMS:
+        histogram.drain()
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def render(*conns):
+    """
+    Render all histograms in the Prometheus text exposition format.
+
+    Args:
+        *conns: Database connections (one per tenant database); histograms
+            flushed by worker processes (metric_histograms) are added to
+            this process's own
+    """
+    stored = {}
+    for conn in conns:
+        for name, labels, counts in conn.execute("SELECT name, labels, counts FROM metric_histograms"):
+            key = (name, tuple(json.loads(labels)))
+            counts = json.loads(counts)
+            previous = stored.get(key)
+            stored[key] = [a + b for a, b in zip(previous, counts)] if previous else counts
+
+    lines = []
+    for histogram in HISTOGRAMS:
+        series = histogram.snapshot()
+        for (name, labels), values in stored.items():
+            if name == histogram.name:
+                local = series.get(labels)
+                series[labels] = [a + b for a, b in zip(local, values)] if local else values
+
+        lines.append(f"# HELP {histogram.name} {histogram.help_text}")
+        lines.append(f"# TYPE {histogram.name} histogram")
+        for labels in sorted(series):
+            values = series[labels]
+            cumulative = 0
+            for bound, count in zip(histogram.buckets + ("+Inf",), values):
+                cumulative += count
+                label_text = _format_labels(histogram.label_names, labels, [("le", bound)])
+                lines.append(f"{histogram.name}_bucket{label_text} {cumulative}")
+            label_text = _format_labels(histogram.label_names, labels)
+            lines.append(f"{histogram.name}_sum{label_text} {values[-2]:.6f}")
+            lines.append(f"{histogram.name}_count{label_text} {values[-1]}")
+    return "\n".join(lines) + "\n"
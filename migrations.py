@@ -0,0 +1,1047 @@
+"""
+Schema Migrations
+=================
+Versioned schema changes for the Job Tracker database.
+
+The schema version is stored in SQLite's PRAGMA user_version. Each entry in
+MIGRATIONS upgrades the schema by exactly one version and is applied once,
+inside its own transaction, together with the version bump. On an
+up-to-date database migrate() only reads user_version and runs no DDL.
+
+To change the schema, append a new function to MIGRATIONS - never edit a
+migration that has already shipped.
+"""
+
+
+def _column_names(cur, table):
+    """Return the column names of a table"""
+    cur.execute(f"PRAGMA table_info({table})")
+    return {row[1] for row in cur.fetchall()}
+
+
+def create_jobs_table(cur):
+    """
+    Table: jobs
+    - id: Unique job identifier
+    - company: Company name
+    - role: Job position/title
+    - job_description: Full job posting text (for keyword extraction)
+    - status: Applied, Interview, or Rejected
+    - ats_score: ATS match percentage (0-100), NULL if not analyzed yet
+    - date_added: Timestamp when job was added
+    - date_applied: Date when application was submitted
+    - interview_date: Optional date of scheduled interview
+    - notes: Optional notes or comments about the application
+    """
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            company TEXT NOT NULL,
+            role TEXT NOT NULL,
+            job_description TEXT,
+            status TEXT DEFAULT 'Applied',
+            ats_score INTEGER,
+            date_added TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            date_applied TEXT,
+            interview_date TEXT,
+            notes TEXT
+        )
+    """)
+
+    # Databases created before these columns existed
+    columns = _column_names(cur, "jobs")
+    for column in ("date_applied", "interview_date", "notes"):
+        if column not in columns:
+            cur.execute(f"ALTER TABLE jobs ADD COLUMN {column} TEXT")
+
+
+def create_job_keywords_table(cur):
+    """
+    Table: job_keywords
+    - job_id: Job the keywords belong to (one row per job)
+    - content_hash: SHA-256 of the job description the keywords were built from
+    - keywords: JSON list of [keyword, count] pairs, most frequent first
+    """
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS job_keywords (
+            job_id INTEGER PRIMARY KEY REFERENCES jobs(id) ON DELETE CASCADE,
+            content_hash TEXT NOT NULL,
+            keywords TEXT NOT NULL
+        )
+    """)
+
+
+def create_pdf_text_cache_table(cur):
+    """
+    Table: pdf_text_cache
+    - file_hash: SHA-256 of the uploaded PDF bytes
+    - page_count: Number of pages in the PDF
+    - text: Extracted resume text
+    - keywords: JSON list of resume keywords
+    - size: Bytes of cached text (used for the size bound)
+    - last_used: Julian day of the last hit (used for LRU eviction)
+    """
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS pdf_text_cache (
+            file_hash TEXT PRIMARY KEY,
+            page_count INTEGER NOT NULL,
+            text TEXT NOT NULL,
+            keywords TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            last_used REAL NOT NULL
+        )
+    """)
+
+
+def add_job_indexes(cur):
+    """
+    Indexes for the dashboard and job dropdown queries.
+
+    - idx_jobs_date_added: default dashboard order; covers the dropdown
+      query (id, company, role ordered by date_added) without touching rows
+    - idx_jobs_status_date: status filter with date ordering
+    - idx_jobs_ats_score: ATS band filters and ATS ordering
+    - idx_jobs_status_ats: status filter combined with ATS band/ordering
+    """
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_jobs_date_added ON jobs (date_added, company, role)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status_date ON jobs (status, date_added)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_jobs_ats_score ON jobs (ats_score)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status_ats ON jobs (status, ats_score)")
+
+
+def create_analysis_tasks_table(cur):
+    """
+    Table: analysis_tasks
+    - id: Task identifier (random hex)
+    - job_id: Job the resume is analyzed against
+    - file_hash: SHA-256 of the uploaded resume
+    - status: queued, running, done or failed
+    - result: JSON analysis result once done
+    - error: Error message if failed
+    - created_at / finished_at: Julian days
+    """
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS analysis_tasks (
+            id TEXT PRIMARY KEY,
+            job_id INTEGER NOT NULL,
+            file_hash TEXT NOT NULL,
+            status TEXT NOT NULL,
+            result TEXT,
+            error TEXT,
+            created_at REAL NOT NULL,
+            finished_at REAL
+        )
+    """)
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_analysis_tasks_finished ON analysis_tasks (finished_at)")
+
+
+def create_cache_counters_table(cur):
+    """
+    Table: cache_counters
+    - name: Cache name (e.g. pdf_text_cache)
+    - hits / misses: Lookups since the table was created, across all processes
+    """
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS cache_counters (
+            name TEXT PRIMARY KEY,
+            hits INTEGER NOT NULL DEFAULT 0,
+            misses INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+
+
+def create_analyses_table(cur):
+    """
+    Table: analyses
+    - id: Unique analysis identifier
+    - job_id: Job the resume was analyzed against
+    - resume_hash: SHA-256 of the resume PDF (joins pdf_text_cache)
+    - ats_score: ATS match percentage of this run
+    - matched_keywords / missing_keywords: Keywords, one per line
+    - created_at: Timestamp of the run
+    """
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS analyses (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            job_id INTEGER NOT NULL REFERENCES jobs(id) ON DELETE CASCADE,
+            resume_hash TEXT NOT NULL,
+            ats_score INTEGER NOT NULL,
+            matched_keywords TEXT NOT NULL,
+            missing_keywords TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_analyses_job_created ON analyses (job_id, created_at)")
+
+
+def create_term_index_tables(cur):
+    """
+    Corpus index for weighted (TF-IDF / BM25) scoring, see scoring_engine.py.
+
+    Table: job_terms
+    - job_id / term: One row per distinct term of a job description
+    - tf: Number of occurrences of the term in the description
+
+    Table: term_df
+    - term: Indexed term
+    - df: Number of jobs containing the term
+
+    Table: corpus_stats (single row, id = 1)
+    - documents: Number of indexed jobs with at least one term
+    - total_length: Sum of term counts over all jobs (for average length)
+    - revision: Bumped on every index change (invalidates cached matrices)
+
+    Also records the scoring method of each analysis and clears
+    job_keywords so every job is re-indexed on its next use.
+    """
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS job_terms (
+            job_id INTEGER NOT NULL REFERENCES jobs(id) ON DELETE CASCADE,
+            term TEXT NOT NULL,
+            tf INTEGER NOT NULL,
+            PRIMARY KEY (job_id, term)
+        ) WITHOUT ROWID
+    """)
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS term_df (
+            term TEXT PRIMARY KEY,
+            df INTEGER NOT NULL
+        ) WITHOUT ROWID
+    """)
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS corpus_stats (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            documents INTEGER NOT NULL,
+            total_length INTEGER NOT NULL,
+            revision INTEGER NOT NULL
+        )
+    """)
+    cur.execute("INSERT OR IGNORE INTO corpus_stats (id, documents, total_length, revision) VALUES (1, 0, 0, 0)")
+
+    if "score_mode" not in _column_names(cur, "analyses"):
+        cur.execute("ALTER TABLE analyses ADD COLUMN score_mode TEXT NOT NULL DEFAULT 'legacy'")
+    cur.execute("DELETE FROM job_keywords")
+
+
+def create_jobs_fts_table(cur):
+    """
+    Table: jobs_fts (FTS5, external content = jobs)
+    - company, role, job_description, notes: Indexed copies of the job columns
+
+    Kept in sync by triggers on jobs; updates that touch none of the
+    indexed columns (status, ATS score, dates) do not reindex the row.
+    Existing jobs are indexed with a one-off rebuild.
+    """
+    cur.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS jobs_fts USING fts5(
+            company, role, job_description, notes,
+            content='jobs', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2'
+        )
+    """)
+    cur.execute("""
+        CREATE TRIGGER IF NOT EXISTS jobs_fts_insert AFTER INSERT ON jobs BEGIN
+            INSERT INTO jobs_fts (rowid, company, role, job_description, notes)
+            VALUES (new.id, new.company, new.role, new.job_description, new.notes);
+        END
+    """)
+    cur.execute("""
+        CREATE TRIGGER IF NOT EXISTS jobs_fts_delete AFTER DELETE ON jobs BEGIN
+            INSERT INTO jobs_fts (jobs_fts, rowid, company, role, job_description, notes)
+            VALUES ('delete', old.id, old.company, old.role, old.job_description, old.notes);
+        END
+    """)
+    cur.execute("""
+        CREATE TRIGGER IF NOT EXISTS jobs_fts_update
+        AFTER UPDATE OF company, role, job_description, notes ON jobs BEGIN
+            INSERT INTO jobs_fts (jobs_fts, rowid, company, role, job_description, notes)
+            VALUES ('delete', old.id, old.company, old.role, old.job_description, old.notes);
+            INSERT INTO jobs_fts (rowid, company, role, job_description, notes)
+            VALUES (new.id, new.company, new.role, new.job_description, new.notes);
+        END
+    """)
+    cur.execute("INSERT INTO jobs_fts (jobs_fts) VALUES ('rebuild')")
+
+
+def add_pdf_extraction_stats(cur):
+    """
+    Column pdf_text_cache.extraction: JSON extraction statistics
+    (page_count, pages_read, truncated, seconds, page_timings), NULL for
+    entries cached before it existed.
+    """
+    if "extraction" not in _column_names(cur, "pdf_text_cache"):
+        cur.execute("ALTER TABLE pdf_text_cache ADD COLUMN extraction TEXT")
+
+
+def add_revision_tracking(cur):
+    """
+    Revision counters for conditional GET (ETag / Last-Modified) in the JSON API.
+
+    Table: table_revisions
+    - name: Tracked table (jobs, analyses)
+    - revision: Bumped on every insert, update or delete in that table
+    - updated_at: Time of the last change
+
+    Columns jobs.revision / jobs.updated_at: the table revision and time
+    of the row's last change. Only actual changes to job data count -
+    rewriting an unchanged ATS score or the triggers' own bookkeeping
+    update does not.
+    """
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS table_revisions (
+            name TEXT PRIMARY KEY,
+            revision INTEGER NOT NULL,
+            updated_at TEXT NOT NULL
+        )
+    """)
+    cur.execute("""
+        INSERT OR IGNORE INTO table_revisions (name, revision, updated_at)
+        VALUES ('jobs', 1, CURRENT_TIMESTAMP), ('analyses', 1, CURRENT_TIMESTAMP)
+    """)
+
+    columns = _column_names(cur, "jobs")
+    if "revision" not in columns:
+        cur.execute("ALTER TABLE jobs ADD COLUMN revision INTEGER NOT NULL DEFAULT 1")
+    if "updated_at" not in columns:
+        cur.execute("ALTER TABLE jobs ADD COLUMN updated_at TEXT")
+    cur.execute("UPDATE jobs SET updated_at = date_added WHERE updated_at IS NULL")
+
+    bump_jobs = """
+        UPDATE table_revisions SET revision = revision + 1, updated_at = CURRENT_TIMESTAMP
+        WHERE name = 'jobs';
+        UPDATE jobs
+        SET revision = (SELECT revision FROM table_revisions WHERE name = 'jobs'),
+            updated_at = CURRENT_TIMESTAMP
+        WHERE id = new.id;
+    """
+    cur.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS jobs_revision_insert AFTER INSERT ON jobs BEGIN
+            {bump_jobs}
+        END
+    """)
+    cur.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS jobs_revision_update
+        AFTER UPDATE OF company, role, job_description, status, ats_score,
+                        date_applied, interview_date, notes ON jobs
+        WHEN new.company IS NOT old.company OR new.role IS NOT old.role
+          OR new.job_description IS NOT old.job_description OR new.status IS NOT old.status
+          OR new.ats_score IS NOT old.ats_score OR new.date_applied IS NOT old.date_applied
+          OR new.interview_date IS NOT old.interview_date OR new.notes IS NOT old.notes
+        BEGIN
+            {bump_jobs}
+        END
+    """)
+    cur.execute("""
+        CREATE TRIGGER IF NOT EXISTS jobs_revision_delete AFTER DELETE ON jobs BEGIN
+            UPDATE table_revisions SET revision = revision + 1, updated_at = CURRENT_TIMESTAMP
+            WHERE name = 'jobs';
+        END
+    """)
+    cur.execute("""
+        CREATE TRIGGER IF NOT EXISTS analyses_revision_insert AFTER INSERT ON analyses BEGIN
+            UPDATE table_revisions SET revision = revision + 1, updated_at = CURRENT_TIMESTAMP
+            WHERE name = 'analyses';
+        END
+    """)
+
+
+def create_metric_histograms_table(cur):
+    """
+    Table: metric_histograms
+    - name / labels: Histogram name and JSON list of label values
+    - counts: JSON list of per-bucket counts followed by sum and count,
+      accumulated from background worker processes (see metrics.flush)
+    """
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS metric_histograms (
+            name TEXT NOT NULL,
+            labels TEXT NOT NULL,
+            counts TEXT NOT NULL,
+            PRIMARY KEY (name, labels)
+        ) WITHOUT ROWID
+    """)
+
+
+# ATS score band of a job row (thresholds of get_resume_improvement_suggestions)
+_ATS_BUCKET = """CASE WHEN {row}.ats_score IS NULL THEN 'unanalyzed'
+    WHEN {row}.ats_score >= 80 THEN 'excellent'
+    WHEN {row}.ats_score >= 60 THEN 'good' ELSE 'poor' END"""
+
+# Monday of the week a job was applied to (date added if no application date)
+_APPLICATION_WEEK = """IFNULL(date(COALESCE(NULLIF({row}.date_applied, ''), {row}.date_added),
+    '-6 days', 'weekday 1'), 'unknown')"""
+
+
+def _stats_change(row, delta):
+    """Trigger statements adding delta to the status/ATS/week counters of row (new or old)"""
+    return f"""
+        INSERT INTO job_stats (dimension, bucket, count) VALUES ('status', IFNULL({row}.status, ''), {delta})
+        ON CONFLICT (dimension, bucket) DO UPDATE SET count = count + {delta};
+        INSERT INTO job_stats (dimension, bucket, count) VALUES ('ats', {_ATS_BUCKET.format(row=row)}, {delta})
+        ON CONFLICT (dimension, bucket) DO UPDATE SET count = count + {delta};
+        INSERT INTO job_stats (dimension, bucket, count) VALUES ('week', {_APPLICATION_WEEK.format(row=row)}, {delta})
+        ON CONFLICT (dimension, bucket) DO UPDATE SET count = count + {delta};
+    """
+
+
+def create_job_stats_tables(cur):
+    """
+    Materialized dashboard statistics, maintained by triggers on jobs.
+
+    Table: job_stats
+    - dimension: status, ats (excellent / good / poor / unanalyzed) or
+      week (Monday of the application week, YYYY-MM-DD)
+    - bucket: Value within the dimension
+    - count: Number of jobs currently in the bucket
+
+    Table: job_status_transitions
+    - week: Monday of the week the status changed
+    - from_status / to_status: The change
+    - count: Number of such changes that week
+
+    Only changes that move a job between buckets touch these tables.
+    """
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS job_stats (
+            dimension TEXT NOT NULL,
+            bucket TEXT NOT NULL,
+            count INTEGER NOT NULL,
+            PRIMARY KEY (dimension, bucket)
+        ) WITHOUT ROWID
+    """)
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS job_status_transitions (
+            week TEXT NOT NULL,
+            from_status TEXT NOT NULL,
+            to_status TEXT NOT NULL,
+            count INTEGER NOT NULL,
+            PRIMARY KEY (week, from_status, to_status)
+        ) WITHOUT ROWID
+    """)
+
+    cur.execute(f"CREATE TRIGGER IF NOT EXISTS jobs_stats_insert AFTER INSERT ON jobs BEGIN {_stats_change('new', 1)} END")
+    cur.execute(f"CREATE TRIGGER IF NOT EXISTS jobs_stats_delete AFTER DELETE ON jobs BEGIN {_stats_change('old', -1)} END")
+    cur.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS jobs_stats_update
+        AFTER UPDATE OF status, ats_score, date_applied ON jobs
+        WHEN new.status IS NOT old.status
+          OR {_ATS_BUCKET.format(row='new')} != {_ATS_BUCKET.format(row='old')}
+          OR {_APPLICATION_WEEK.format(row='new')} != {_APPLICATION_WEEK.format(row='old')}
+        BEGIN
+            {_stats_change('old', -1)}
+            {_stats_change('new', 1)}
+        END
+    """)
+    cur.execute("""
+        CREATE TRIGGER IF NOT EXISTS jobs_status_transition
+        AFTER UPDATE OF status ON jobs
+        WHEN new.status IS NOT old.status
+        BEGIN
+            INSERT INTO job_status_transitions (week, from_status, to_status, count)
+            VALUES (date('now', '-6 days', 'weekday 1'), IFNULL(old.status, ''), IFNULL(new.status, ''), 1)
+            ON CONFLICT (week, from_status, to_status) DO UPDATE SET count = count + 1;
+        END
+    """)
+
+    # Backfill from the current jobs
+    cur.execute("DELETE FROM job_stats")
+    cur.execute("""
+        INSERT INTO job_stats (dimension, bucket, count)
+        SELECT 'status', IFNULL(status, ''), COUNT(*) FROM jobs GROUP BY 2
+    """)
+    cur.execute(f"""
+        INSERT INTO job_stats (dimension, bucket, count)
+        SELECT 'ats', {_ATS_BUCKET.format(row='jobs')}, COUNT(*) FROM jobs GROUP BY 2
+    """)
+    cur.execute(f"""
+        INSERT INTO job_stats (dimension, bucket, count)
+        SELECT 'week', {_APPLICATION_WEEK.format(row='jobs')}, COUNT(*) FROM jobs GROUP BY 2
+    """)
+
+
+def create_job_events_table(cur):
+    """
+    Table: job_events (append-only, written by triggers on jobs)
+    - id: Event identifier (insertion order)
+    - job_id: Job the event belongs to
+    - event_type: created, status, interview_date or ats_score
+    - old_value / new_value: Value before and after (created: new_value is
+      the initial status)
+    - occurred_at: When it happened (created: application date if given)
+    - stage_days: status events only - days spent in the stage being left
+      (old_value), i.e. since the job's previous created / status event
+
+    stage_days is worked out once by the trigger, with an indexed lookup of
+    the job's previous stage event, so time-in-stage reads one index instead
+    of pairing up every job's history on each request.
+
+    Existing jobs get their events from the backfill-events command.
+    """
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS job_events (
+            id INTEGER PRIMARY KEY,
+            job_id INTEGER NOT NULL,
+            event_type TEXT NOT NULL,
+            old_value TEXT,
+            new_value TEXT,
+            occurred_at TEXT NOT NULL,
+            stage_days REAL
+        )
+    """)
+    # A job's events in order (the status trigger's previous-stage lookup)
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_job_events_job ON job_events (job_id, occurred_at)")
+    # Covering indexes for the analytics queries, which filter on event_type:
+    # stages reached per job (funnel, days between stages) and finished
+    # stays sorted by duration per stage (time-in-stage percentiles)
+    cur.execute("""
+        CREATE INDEX IF NOT EXISTS idx_job_events_stage
+        ON job_events (event_type, new_value, job_id, occurred_at)
+    """)
+    cur.execute("""
+        CREATE INDEX IF NOT EXISTS idx_job_events_stay
+        ON job_events (event_type, old_value, stage_days, new_value, job_id)
+    """)
+
+    cur.execute("""
+        CREATE TRIGGER IF NOT EXISTS job_events_insert AFTER INSERT ON jobs BEGIN
+            INSERT INTO job_events (job_id, event_type, new_value, occurred_at)
+            VALUES (new.id, 'created', new.status, COALESCE(NULLIF(new.date_applied, ''), CURRENT_TIMESTAMP));
+            INSERT INTO job_events (job_id, event_type, new_value, occurred_at)
+            SELECT new.id, 'interview_date', new.interview_date, CURRENT_TIMESTAMP
+            WHERE new.interview_date IS NOT NULL;
+            INSERT INTO job_events (job_id, event_type, new_value, occurred_at)
+            SELECT new.id, 'ats_score', new.ats_score, CURRENT_TIMESTAMP
+            WHERE new.ats_score IS NOT NULL;
+        END
+    """)
+    cur.execute("""
+        CREATE TRIGGER IF NOT EXISTS job_events_status AFTER UPDATE OF status ON jobs
+        WHEN new.status IS NOT old.status
+        BEGIN
+            INSERT INTO job_events (job_id, event_type, old_value, new_value, occurred_at, stage_days)
+            VALUES (new.id, 'status', old.status, new.status, CURRENT_TIMESTAMP,
+                    julianday(CURRENT_TIMESTAMP) - julianday((
+                        SELECT occurred_at FROM job_events
+                        WHERE job_id = new.id AND event_type IN ('created', 'status')
+                        ORDER BY occurred_at DESC, id DESC LIMIT 1
+                    )));
+        END
+    """)
+    for column in ("interview_date", "ats_score"):
+        cur.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS job_events_{column} AFTER UPDATE OF {column} ON jobs
+            WHEN new.{column} IS NOT old.{column}
+            BEGIN
+                INSERT INTO job_events (job_id, event_type, old_value, new_value, occurred_at)
+                VALUES (new.id, '{column}', old.{column}, new.{column}, CURRENT_TIMESTAMP);
+            END
+        """)
+
+
+def reindex_job_phrases(cur):
+    """
+    Job keywords and indexed terms now include skill phrases and synonyms
+    (see phrases.py): clear job_keywords so every job is re-indexed on its
+    next use.
+    """
+    cur.execute("DELETE FROM job_keywords")
+
+
+def create_resume_library_tables(cur):
+    """
+    Parsed resumes kept for re-scoring without the PDF, see resume_library.py.
+
+    Table: vocabulary
+    - id: Term id used in the resumes arrays
+    - term: Keyword, token or phrase
+
+    Table: resumes
+    - file_hash: SHA-256 of the resume PDF (joins analyses.resume_hash)
+    - keyword_ids: Sorted uint32 term ids of its top keywords and phrases
+    - term_ids: Sorted uint32 term ids of all its terms and phrases
+    - created_at: When the resume was first scored
+    """
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS vocabulary (
+            id INTEGER PRIMARY KEY,
+            term TEXT NOT NULL UNIQUE
+        )
+    """)
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS resumes (
+            id INTEGER PRIMARY KEY,
+            file_hash TEXT NOT NULL UNIQUE,
+            keyword_ids BLOB NOT NULL,
+            term_ids BLOB NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_analyses_job_resume ON analyses (job_id, resume_hash, id)")
+
+
+def _user_stats_change(row, delta):
+    """Trigger statements adding delta to the status/ATS/week counters of row's user"""
+    return "".join(
+        f"""
+        INSERT INTO job_stats (user_id, dimension, bucket, count) VALUES ({row}.user_id, '{dimension}', {bucket}, {delta})
+        ON CONFLICT (user_id, dimension, bucket) DO UPDATE SET count = count + {delta};"""
+        for dimension, bucket in (
+            ('status', f"IFNULL({row}.status, '')"),
+            ('ats', _ATS_BUCKET.format(row=row)),
+            ('week', _APPLICATION_WEEK.format(row=row)),
+        )
+    )
+
+
+def add_user_tenancy(cur):
+    """
+    Jobs and their analyses, tasks, events and statistics belong to a user.
+
+    Table: users
+    - id: User identifier (1 is the default user that owns existing data)
+    - name: Login name, as sent by the authenticating proxy (see app.py)
+
+    Columns user_id on jobs, analyses, analysis_tasks and job_events, and a
+    leading user_id in the keys of job_stats and job_status_transitions.
+    Every index a per-user query uses starts with user_id, so a user's
+    dashboard, API pages and analytics read only that user's index range
+    however many other users share the database.
+
+    Content-addressed and derived tables (pdf_text_cache, resumes,
+    vocabulary, the term index, jobs_fts, table_revisions) stay shared.
+    """
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL UNIQUE,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    cur.execute("INSERT OR IGNORE INTO users (id, name) VALUES (1, 'default')")
+
+    for table in ("jobs", "analyses", "analysis_tasks", "job_events"):
+        if "user_id" not in _column_names(cur, table):
+            cur.execute(f"ALTER TABLE {table} ADD COLUMN user_id INTEGER NOT NULL DEFAULT 1")
+
+    # Statistics keyed by user: rebuild, recount job_stats from jobs and
+    # carry the (so far single-user) transition history over to user 1
+    for trigger in ("jobs_stats_insert", "jobs_stats_delete", "jobs_stats_update", "jobs_status_transition"):
+        cur.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+    cur.execute("DROP TABLE IF EXISTS job_stats")
+    cur.execute("""
+        CREATE TABLE job_stats (
+            user_id INTEGER NOT NULL,
+            dimension TEXT NOT NULL,
+            bucket TEXT NOT NULL,
+            count INTEGER NOT NULL,
+            PRIMARY KEY (user_id, dimension, bucket)
+        ) WITHOUT ROWID
+    """)
+    for dimension, bucket in (
+        ('status', "IFNULL(status, '')"),
+        ('ats', _ATS_BUCKET.format(row='jobs')),
+        ('week', _APPLICATION_WEEK.format(row='jobs')),
+    ):
+        cur.execute(f"""
+            INSERT INTO job_stats (user_id, dimension, bucket, count)
+            SELECT user_id, '{dimension}', {bucket}, COUNT(*) FROM jobs GROUP BY 1, 3
+        """)
+    cur.execute("ALTER TABLE job_status_transitions RENAME TO job_status_transitions_old")
+    cur.execute("""
+        CREATE TABLE job_status_transitions (
+            user_id INTEGER NOT NULL,
+            week TEXT NOT NULL,
+            from_status TEXT NOT NULL,
+            to_status TEXT NOT NULL,
+            count INTEGER NOT NULL,
+            PRIMARY KEY (user_id, week, from_status, to_status)
+        ) WITHOUT ROWID
+    """)
+    cur.execute("""
+        INSERT INTO job_status_transitions (user_id, week, from_status, to_status, count)
+        SELECT 1, week, from_status, to_status, count FROM job_status_transitions_old
+    """)
+    cur.execute("DROP TABLE job_status_transitions_old")
+
+    cur.execute(f"CREATE TRIGGER jobs_stats_insert AFTER INSERT ON jobs BEGIN {_user_stats_change('new', 1)} END")
+    cur.execute(f"CREATE TRIGGER jobs_stats_delete AFTER DELETE ON jobs BEGIN {_user_stats_change('old', -1)} END")
+    cur.execute(f"""
+        CREATE TRIGGER jobs_stats_update
+        AFTER UPDATE OF status, ats_score, date_applied ON jobs
+        WHEN new.status IS NOT old.status
+          OR {_ATS_BUCKET.format(row='new')} != {_ATS_BUCKET.format(row='old')}
+          OR {_APPLICATION_WEEK.format(row='new')} != {_APPLICATION_WEEK.format(row='old')}
+        BEGIN
+            {_user_stats_change('old', -1)}
+            {_user_stats_change('new', 1)}
+        END
+    """)
+    cur.execute("""
+        CREATE TRIGGER jobs_status_transition
+        AFTER UPDATE OF status ON jobs
+        WHEN new.status IS NOT old.status
+        BEGIN
+            INSERT INTO job_status_transitions (user_id, week, from_status, to_status, count)
+            VALUES (new.user_id, date('now', '-6 days', 'weekday 1'),
+                    IFNULL(old.status, ''), IFNULL(new.status, ''), 1)
+            ON CONFLICT (user_id, week, from_status, to_status) DO UPDATE SET count = count + 1;
+        END
+    """)
+
+    # Events carry the user of their job
+    for trigger in ("job_events_insert", "job_events_status", "job_events_interview_date", "job_events_ats_score"):
+        cur.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+    cur.execute("""
+        CREATE TRIGGER job_events_insert AFTER INSERT ON jobs BEGIN
+            INSERT INTO job_events (user_id, job_id, event_type, new_value, occurred_at)
+            VALUES (new.user_id, new.id, 'created', new.status,
+                    COALESCE(NULLIF(new.date_applied, ''), CURRENT_TIMESTAMP));
+            INSERT INTO job_events (user_id, job_id, event_type, new_value, occurred_at)
+            SELECT new.user_id, new.id, 'interview_date', new.interview_date, CURRENT_TIMESTAMP
+            WHERE new.interview_date IS NOT NULL;
+            INSERT INTO job_events (user_id, job_id, event_type, new_value, occurred_at)
+            SELECT new.user_id, new.id, 'ats_score', new.ats_score, CURRENT_TIMESTAMP
+            WHERE new.ats_score IS NOT NULL;
+        END
+    """)
+    cur.execute("""
+        CREATE TRIGGER job_events_status AFTER UPDATE OF status ON jobs
+        WHEN new.status IS NOT old.status
+        BEGIN
+            INSERT INTO job_events (user_id, job_id, event_type, old_value, new_value, occurred_at, stage_days)
+            VALUES (new.user_id, new.id, 'status', old.status, new.status, CURRENT_TIMESTAMP,
+                    julianday(CURRENT_TIMESTAMP) - julianday((
+                        SELECT occurred_at FROM job_events
+                        WHERE job_id = new.id AND event_type IN ('created', 'status')
+                        ORDER BY occurred_at DESC, id DESC LIMIT 1
+                    )));
+        END
+    """)
+    for column in ("interview_date", "ats_score"):
+        cur.execute(f"""
+            CREATE TRIGGER job_events_{column} AFTER UPDATE OF {column} ON jobs
+            WHEN new.{column} IS NOT old.{column}
+            BEGIN
+                INSERT INTO job_events (user_id, job_id, event_type, old_value, new_value, occurred_at)
+                VALUES (new.user_id, new.id, '{column}', old.{column}, new.{column}, CURRENT_TIMESTAMP);
+            END
+        """)
+
+    # Per-user versions of the dashboard, dropdown, API and analytics indexes
+    for index in ("idx_jobs_date_added", "idx_jobs_status_date", "idx_jobs_ats_score", "idx_jobs_status_ats",
+                  "idx_job_events_stage", "idx_job_events_stay"):
+        cur.execute(f"DROP INDEX IF EXISTS {index}")
+    cur.execute("CREATE INDEX idx_jobs_user_date ON jobs (user_id, date_added, company, role)")
+    cur.execute("CREATE INDEX idx_jobs_user_status_date ON jobs (user_id, status, date_added)")
+    cur.execute("CREATE INDEX idx_jobs_user_ats ON jobs (user_id, ats_score)")
+    cur.execute("CREATE INDEX idx_jobs_user_status_ats ON jobs (user_id, status, ats_score)")
+    cur.execute("CREATE INDEX idx_jobs_user_id ON jobs (user_id, id)")
+    cur.execute("CREATE INDEX idx_analyses_user ON analyses (user_id, id)")
+    cur.execute("""
+        CREATE INDEX idx_job_events_stage
+        ON job_events (user_id, event_type, new_value, job_id, occurred_at)
+    """)
+    cur.execute("""
+        CREATE INDEX idx_job_events_stay
+        ON job_events (user_id, event_type, old_value, stage_days, new_value, job_id)
+    """)
+
+
+def add_resume_owners(cur):
+    """
+    Stored resumes belong to the user who uploaded them.
+
+    Column user_id on resumes, unique with file_hash: the same PDF uploaded
+    by two users is stored once for each, so a job is only ever re-scored
+    with its own user's resumes. Existing resumes are copied to every user
+    that analyzed them; resumes no analysis refers to are dropped, as
+    nothing would re-score them.
+    """
+    cur.execute("""
+        CREATE TABLE resumes_new (
+            id INTEGER PRIMARY KEY,
+            user_id INTEGER NOT NULL,
+            file_hash TEXT NOT NULL,
+            keyword_ids BLOB NOT NULL,
+            term_ids BLOB NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE (user_id, file_hash)
+        )
+    """)
+    cur.execute("""
+        INSERT INTO resumes_new (user_id, file_hash, keyword_ids, term_ids, created_at)
+        SELECT owners.user_id, r.file_hash, r.keyword_ids, r.term_ids, r.created_at
+        FROM resumes r
+        JOIN (SELECT DISTINCT user_id, resume_hash FROM analyses) owners ON owners.resume_hash = r.file_hash
+    """)
+    cur.execute("DROP TABLE resumes")
+    cur.execute("ALTER TABLE resumes_new RENAME TO resumes")
+
+
+def key_revisions_and_corpus_by_user(cur):
+    """
+    Revision counters and weighted-scoring statistics kept per user.
+
+    Table: table_revisions, rebuilt with key (user_id, name)
+    - revision / updated_at: Bumped by writes of that user's jobs or analyses
+    Column jobs.revision is the owner's jobs revision at the row's last
+    change. A write therefore only invalidates its own user's cached
+    fragments and ETags.
+
+    Table: term_df, rebuilt with key (user_id, term)
+    - df: Number of the user's jobs containing the term
+
+    Table: corpus_stats, one row per user (key user_id)
+    - documents, total_length, revision: As before, over the user's jobs
+
+    Weighted scores (and the phrases they match) are computed against the
+    user's own jobs only, so another user's writes never change them.
+    A new user gets its revision and corpus rows on creation.
+
+    jobs_fts stays one index: FTS5 cannot partition its statistics.
+    Searches filter it to the user's jobs, so only the relevance order of
+    results depends on the other jobs' text.
+    """
+    for trigger in ("jobs_revision_insert", "jobs_revision_update", "jobs_revision_delete",
+                    "analyses_revision_insert"):
+        cur.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+    cur.execute("ALTER TABLE table_revisions RENAME TO table_revisions_old")
+    cur.execute("""
+        CREATE TABLE table_revisions (
+            user_id INTEGER NOT NULL,
+            name TEXT NOT NULL,
+            revision INTEGER NOT NULL,
+            updated_at TEXT NOT NULL,
+            PRIMARY KEY (user_id, name)
+        ) WITHOUT ROWID
+    """)
+    cur.execute("""
+        INSERT INTO table_revisions (user_id, name, revision, updated_at)
+        SELECT u.id, t.name, t.revision, t.updated_at FROM users u, table_revisions_old t
+    """)
+    cur.execute("DROP TABLE table_revisions_old")
+
+    bump_jobs = """
+        UPDATE table_revisions SET revision = revision + 1, updated_at = CURRENT_TIMESTAMP
+        WHERE user_id = new.user_id AND name = 'jobs';
+        UPDATE jobs
+        SET revision = (SELECT revision FROM table_revisions WHERE user_id = new.user_id AND name = 'jobs'),
+            updated_at = CURRENT_TIMESTAMP
+        WHERE id = new.id;
+    """
+    cur.execute(f"""
+        CREATE TRIGGER jobs_revision_insert AFTER INSERT ON jobs BEGIN
+            {bump_jobs}
+        END
+    """)
+    cur.execute(f"""
+        CREATE TRIGGER jobs_revision_update
+        AFTER UPDATE OF company, role, job_description, status, ats_score,
+                        date_applied, interview_date, notes ON jobs
+        WHEN new.company IS NOT old.company OR new.role IS NOT old.role
+          OR new.job_description IS NOT old.job_description OR new.status IS NOT old.status
+          OR new.ats_score IS NOT old.ats_score OR new.date_applied IS NOT old.date_applied
+          OR new.interview_date IS NOT old.interview_date OR new.notes IS NOT old.notes
+        BEGIN
+            {bump_jobs}
+        END
+    """)
+    cur.execute("""
+        CREATE TRIGGER jobs_revision_delete AFTER DELETE ON jobs BEGIN
+            UPDATE table_revisions SET revision = revision + 1, updated_at = CURRENT_TIMESTAMP
+            WHERE user_id = old.user_id AND name = 'jobs';
+        END
+    """)
+    cur.execute("""
+        CREATE TRIGGER analyses_revision_insert AFTER INSERT ON analyses BEGIN
+            UPDATE table_revisions SET revision = revision + 1, updated_at = CURRENT_TIMESTAMP
+            WHERE user_id = new.user_id AND name = 'analyses';
+        END
+    """)
+
+    # Recount the corpus statistics per user from the (per-job) term index
+    cur.execute("DROP TABLE term_df")
+    cur.execute("""
+        CREATE TABLE term_df (
+            user_id INTEGER NOT NULL,
+            term TEXT NOT NULL,
+            df INTEGER NOT NULL,
+            PRIMARY KEY (user_id, term)
+        ) WITHOUT ROWID
+    """)
+    cur.execute("""
+        INSERT INTO term_df (user_id, term, df)
+        SELECT j.user_id, t.term, COUNT(*)
+        FROM job_terms t JOIN jobs j ON j.id = t.job_id
+        GROUP BY j.user_id, t.term
+    """)
+    cur.execute("DROP TABLE corpus_stats")
+    cur.execute("""
+        CREATE TABLE corpus_stats (
+            user_id INTEGER PRIMARY KEY,
+            documents INTEGER NOT NULL,
+            total_length INTEGER NOT NULL,
+            revision INTEGER NOT NULL
+        )
+    """)
+    cur.execute("INSERT INTO corpus_stats (user_id, documents, total_length, revision) SELECT id, 0, 0, 1 FROM users")
+    cur.execute("""
+        UPDATE corpus_stats
+        SET (documents, total_length) = (
+            SELECT COUNT(*), IFNULL(SUM(length), 0)
+            FROM (SELECT SUM(t.tf) AS length
+                  FROM jobs j JOIN job_terms t ON t.job_id = j.id
+                  WHERE j.user_id = corpus_stats.user_id
+                  GROUP BY t.job_id)
+        )
+    """)
+
+    cur.execute("""
+        CREATE TRIGGER users_create_counters AFTER INSERT ON users BEGIN
+            INSERT INTO table_revisions (user_id, name, revision, updated_at)
+            VALUES (new.id, 'jobs', 1, CURRENT_TIMESTAMP), (new.id, 'analyses', 1, CURRENT_TIMESTAMP);
+            INSERT INTO corpus_stats (user_id, documents, total_length, revision) VALUES (new.id, 0, 0, 1);
+        END
+    """)
+
+
+def create_job_term_revisions_table(cur):
+    """
+    Table: job_term_revisions
+    - job_id: Job whose terms were (re-)indexed
+    - user_id: Owner of the job
+    - revision: The owner's corpus revision after that indexing
+
+    Lets a cached matrix built at an older revision find the jobs indexed
+    since, so those few are scored exactly while the matrix is rebuilt in
+    the background (see scoring_engine.get_matrix). Jobs indexed before
+    this table existed have no row: every matrix built from now on
+    already contains them.
+    """
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS job_term_revisions (
+            job_id INTEGER PRIMARY KEY,
+            user_id INTEGER NOT NULL,
+            revision INTEGER NOT NULL
+        )
+    """)
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_job_term_revisions_user ON job_term_revisions (user_id, revision)")
+
+
+def create_corpus_phrases_table(cur):
+    """
+    Table: corpus_phrases
+    - user_id / phrase: A multi-word term of term_df ("machine learning")
+    - revision: The user's corpus revision when the phrase first appeared
+
+    Kept in sync with term_df by triggers, so the phrase automaton reads a
+    user's phrases - or only those added since a given revision - from an
+    index range instead of scanning term_df for terms with a space.
+    """
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS corpus_phrases (
+            user_id INTEGER NOT NULL,
+            phrase TEXT NOT NULL,
+            revision INTEGER NOT NULL,
+            PRIMARY KEY (user_id, phrase)
+        ) WITHOUT ROWID
+    """)
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_corpus_phrases_revision ON corpus_phrases (user_id, revision)")
+    cur.execute("""
+        INSERT OR IGNORE INTO corpus_phrases (user_id, phrase, revision)
+        SELECT d.user_id, d.term, c.revision
+        FROM term_df d JOIN corpus_stats c ON c.user_id = d.user_id
+        WHERE instr(d.term, ' ') > 0
+    """)
+    cur.execute("""
+        CREATE TRIGGER IF NOT EXISTS term_df_phrase_insert AFTER INSERT ON term_df
+        WHEN instr(new.term, ' ') > 0
+        BEGIN
+            INSERT OR REPLACE INTO corpus_phrases (user_id, phrase, revision)
+            SELECT new.user_id, new.term, revision FROM corpus_stats WHERE user_id = new.user_id;
+        END
+    """)
+    cur.execute("""
+        CREATE TRIGGER IF NOT EXISTS term_df_phrase_delete AFTER DELETE ON term_df
+        WHEN instr(old.term, ' ') > 0
+        BEGIN
+            DELETE FROM corpus_phrases WHERE user_id = old.user_id AND phrase = old.term;
+        END
+    """)
+
+
+def add_job_events_user_index(cur):
+    """
+    Index: idx_job_events_user (user_id, id)
+
+    The analytics ETag is the user's newest job_events id; with this index
+    that is one lookup at the end of the user's range instead of a walk
+    over all of the user's events.
+    """
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_job_events_user ON job_events (user_id, id)")
+
+
+# Applied in order; the schema version equals the number of migrations applied
+MIGRATIONS = [
+    create_jobs_table,
+    create_job_keywords_table,
+    create_pdf_text_cache_table,
+    add_job_indexes,
+    create_analysis_tasks_table,
+    create_cache_counters_table,
+    create_analyses_table,
+    create_term_index_tables,
+    create_jobs_fts_table,
+    add_pdf_extraction_stats,
+    add_revision_tracking,
+    create_metric_histograms_table,
+    create_job_stats_tables,
+    create_job_events_table,
+    reindex_job_phrases,
+    create_resume_library_tables,
+    add_user_tenancy,
+    add_resume_owners,
+    key_revisions_and_corpus_by_user,
+    create_job_term_revisions_table,
+    create_corpus_phrases_table,
+    add_job_events_user_index,
+]
+
+
+def schema_version(conn):
+    """Return the schema version recorded in the database"""
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn):
+    """
+    Apply all pending migrations.
+
+    Each migration runs in its own BEGIN IMMEDIATE transaction, so
+    concurrent workers booting at the same time serialize on the write
+    lock and the version is re-checked before anything is applied.
+
+    Args:
+        conn: Database connection
+
+    Returns:
+        int: Schema version after migrating
+    """
+    target = len(MIGRATIONS)
+    if schema_version(conn) >= target:
+        return target
+
+    for version, migration in enumerate(MIGRATIONS, 1):
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if schema_version(conn) >= version:
+                conn.rollback()
+                continue
+            migration(conn.cursor())
+            conn.execute(f"PRAGMA user_version = {version}")
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+
+    return target
@@ -0,0 +1,156 @@
+"""
+PDF Text Extraction
+===================
+Streams resume text out of a PDF one page at a time, within budgets.
+
+PyPDF2 parses page content lazily, so iterating pages and tokenizing each
+page's text as it arrives keeps only one page's parse state alive at a
+time; keywords accumulate in a Counter instead of being recomputed from a
+re-concatenated document.
+
+Every extraction runs under three budgets (0 or None disables one):
+- max_pages:   pages read at most (a resume rarely needs more than a few)
+- max_bytes:   UTF-8 bytes of text kept; the page crossing the limit is cut
+               at the last whitespace before it
+- max_seconds: wall-clock time; checked between pages, so one pathological
+               page can overrun it, but no further page is started
+
+Hitting a budget stops extraction early and marks the result truncated
+rather than failing - the first pages of a resume carry its content.
+"""
+
+import time
+from collections import Counter
+
+from tokenizer import tokenize, TOP_KEYWORDS
+
+# Pages are joined with a newline so words never merge across a page break
+PAGE_SEPARATOR = "\n"
+
+
+class PdfExtraction:
+    """
+    Result of extract_pdf().
+
+    Attributes:
+        page_count (int): Pages in the PDF
+        pages_read (int): Pages actually extracted
+        text (str): Extracted text (pages joined by PAGE_SEPARATOR)
+        term_counts (Counter): Keyword counts over the extracted text
+        truncated (str): None, or the budget that stopped extraction
+            ('pages', 'bytes' or 'time')
+        page_timings (list): Seconds spent extracting each page read
+        tokenize_seconds (float): Seconds spent tokenizing page text
+    """
+
+    def __init__(self, page_count):
+        self.page_count = page_count
+        self.pages_read = 0
+        self.text = ""
+        self.term_counts = Counter()
+        self.truncated = None
+        self.page_timings = []
+        self.tokenize_seconds = 0.0
+
+    def keywords(self, limit=TOP_KEYWORDS):
+        """Most frequent keywords, as tokenizer.extract_keywords would return them"""
+        return [word for word, count in self.term_counts.most_common(limit)]
+
+    def stats(self):
+        """JSON-serializable summary of the extraction (no text)"""
+        return {
+            'page_count': self.page_count,
+            'pages_read': self.pages_read,
+            'truncated': self.truncated,
+            'seconds': round(sum(self.page_timings), 6),
+            'page_timings': [round(seconds, 6) for seconds in self.page_timings],
+            'tokenize_seconds': round(self.tokenize_seconds, 6),
+        }
+
+
+def iter_pages(reader, max_pages=None):
+    """
+    Yield (page_text, seconds) for each page of a PdfReader, in order.
+
+    Args:
+        reader: PdfReader
+        max_pages (int): Stop after this many pages (None = all)
+    """
+    for index, page in enumerate(reader.pages):
+        if max_pages and index >= max_pages:
+            return
+        started = time.perf_counter()
+        page_text = page.extract_text() or ""
+        yield page_text, time.perf_counter() - started
+
+
+def _cut_to_bytes(text, max_bytes):
+    """
+    Return the longest prefix of text that fits in max_bytes of UTF-8 and
+    ends on a word boundary, so neither a character nor a word is split
+    (a single word longer than the budget is dropped entirely)
+    """
+    encoded = text.encode("utf-8")
+    if len(encoded) <= max_bytes:
+        return text
+    # The byte at the cut is the next character's first byte or a space
+    if encoded[max_bytes:max_bytes + 1].isspace():
+        return encoded[:max_bytes].decode("utf-8")
+    cut = max(encoded.rfind(space, 0, max_bytes + 1) for space in (b" ", b"\t", b"\n", b"\r"))
+    return encoded[:max(cut, 0)].decode("utf-8")
+
+
+def extract_pdf(source, max_pages=None, max_bytes=None, max_seconds=None):
+    """
+    Extract and tokenize PDF text page by page within the given budgets.
+
+    Args:
+        source: Path to the PDF file or a binary file-like object
+        max_pages (int): Page budget (None or 0 = unlimited)
+        max_bytes (int): Text budget in UTF-8 bytes (None or 0 = unlimited)
+        max_seconds (float): Time budget (None or 0 = unlimited)
+
+    Returns:
+        PdfExtraction
+    """
+    # Imported here, not at module load: PyPDF2 is slow to import and only
+    # processes that actually parse a resume need it
+    from PyPDF2 import PdfReader
+
+    started = time.perf_counter()
+    reader = PdfReader(source)
+    result = PdfExtraction(len(reader.pages))
+
+    pages = []
+    size = 0
+    for page_text, seconds in iter_pages(reader, max_pages):
+        result.pages_read += 1
+        result.page_timings.append(seconds)
+
+        if max_bytes and page_text:
+            if pages:
+                size += len(PAGE_SEPARATOR)
+            page_size = len(page_text.encode("utf-8"))
+            if size + page_size > max_bytes:
+                page_text = _cut_to_bytes(page_text, max(max_bytes - size, 0))
+                result.truncated = 'bytes'
+            size += page_size
+
+        if page_text:
+            pages.append(page_text)
+            tokenize_started = time.perf_counter()
+            result.term_counts.update(tokenize(page_text))
+            result.tokenize_seconds += time.perf_counter() - tokenize_started
+
+        if result.truncated:
+            break
+        if max_seconds and time.perf_counter() - started > max_seconds:
+            if result.pages_read < result.page_count:
+                result.truncated = 'time'
+            break
+
+    if not result.truncated and max_pages and result.page_count > max_pages:
+        result.truncated = 'pages'
+
+    result.text = PAGE_SEPARATOR.join(pages)
+    return result
@@ -0,0 +1,339 @@
+"""
+Skill Phrase Matching
+=====================
+Multi-word skill phrases and aliases, matched with an Aho-Corasick automaton.
+
+The tokenizer only produces single words, so "machine learning" becomes
+two unrelated keywords and "ci/cd" or "js" vanish altogether. This module
+adds phrase keywords on top of the single-word ones:
+
+- Mined phrases: bigrams and trigrams of a job description (no stop word
+  inside, no bare numbers) that occur at least MIN_PHRASE_COUNT times in it
+- Synonyms: a configurable alias -> keyword dictionary (SKILL_SYNONYMS,
+  default DEFAULT_SYNONYMS), e.g. "js" -> "javascript", "k8s" ->
+  "kubernetes", "continuous integration" -> "ci/cd"; a keyword mapped to
+  itself ("spring boot") is always recognized as a phrase
+
+Phrases are matched on words that keep "/", "-" and "." between letters
+("ci/cd", "front-end", "node.js") and keep short words ("js", "ml"). Every
+pattern - all dictionary aliases and every phrase mined from any of the
+user's jobs - is compiled into one Aho-Corasick automaton over words, so a
+resume is scanned once, in time linear in its length plus the matches
+found, no matter how many jobs or phrases there are.
+
+A user's automaton is cached per process. When their corpus revision
+changes (see scoring_engine.corpus_revision), only the phrases added
+since are read (corpus_phrases is stamped with the revision) and compiled
+into a small second automaton scanned alongside the first; once more
+than MAX_ADDED_PHRASES have piled up, everything is recompiled into one.
+Phrases no longer indexed for any job stay in the cached automaton until
+then - they match nothing a job asks for, so they cannot change a score.
+"""
+
+import re
+import threading
+from collections import Counter, deque
+from functools import lru_cache
+
+import scoring_engine
+from tokenizer import STOP_WORDS, tokenize
+
+# Words for phrase matching: '.', '/' and '-' only join letters and digits
+_PHRASE_WORD = re.compile(r'\.?[a-z0-9+#]+(?:[./\-][a-z0-9+#]+)*')
+
+# Mined phrases: 2 to MAX_PHRASE_WORDS words, repeated in a job description
+MAX_PHRASE_WORDS = 3
+MIN_PHRASE_COUNT = 2
+
+# alias -> keyword (a keyword mapped to itself is a known phrase)
+DEFAULT_SYNONYMS = {
+    'js': 'javascript',
+    'ts': 'typescript',
+    'k8s': 'kubernetes',
+    'postgres': 'postgresql',
+    'nodejs': 'node.js',
+    'reactjs': 'react',
+    'react.js': 'react',
+    'vuejs': 'vue',
+    'vue.js': 'vue',
+    'ml': 'machine learning',
+    'machine learning': 'machine learning',
+    'deep learning': 'deep learning',
+    'ai': 'artificial intelligence',
+    'artificial intelligence': 'artificial intelligence',
+    'nlp': 'natural language processing',
+    'natural language processing': 'natural language processing',
+    'computer vision': 'computer vision',
+    'data science': 'data science',
+    'ci/cd': 'ci/cd',
+    'ci cd': 'ci/cd',
+    'continuous integration': 'ci/cd',
+    'spring boot': 'spring boot',
+    'ruby on rails': 'ruby on rails',
+    'rails': 'ruby on rails',
+    'rest api': 'rest api',
+    'rest apis': 'rest api',
+    'restful api': 'rest api',
+    'restful apis': 'rest api',
+    'amazon web services': 'aws',
+    'gcp': 'google cloud',
+    'google cloud': 'google cloud',
+    'google cloud platform': 'google cloud',
+    'unit testing': 'unit testing',
+    'unit tests': 'unit testing',
+    'project management': 'project management',
+    'version control': 'version control',
+}
+
+# Phrases compiled into a CorpusMatcher's second automaton before a full rebuild
+MAX_ADDED_PHRASES = 256
+
+# (cache key, user_id, synonyms key) -> CorpusMatcher
+_matchers = {}
+_matchers_lock = threading.Lock()
+
+
+def phrase_words(text):
+    """Split text into lowercase words for phrase matching (short words kept)"""
+    return _PHRASE_WORD.findall(text.lower())
+
+
+class PhraseMatcher:
+    """
+    Aho-Corasick automaton over word sequences.
+
+    Built from a mapping of phrase (tuple of words) -> keyword. scan() walks
+    a word list once, following failure links on mismatches, and reports
+    every phrase ending at each word - overlapping and nested phrases
+    included.
+    """
+
+    def __init__(self, patterns):
+        self.patterns = dict(patterns)
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [()]
+
+        for words, keyword in self.patterns.items():
+            state = 0
+            for word in words:
+                next_state = self._goto[state].get(word)
+                if next_state is None:
+                    next_state = self._goto[state][word] = len(self._goto)
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append(())
+                state = next_state
+            self._output[state] += (keyword,)
+
+        # Breadth-first, so a state's failure target is finished before it
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for word, child in self._goto[state].items():
+                fail = self._fail[state]
+                while fail and word not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(word, 0)
+                self._output[child] += self._output[self._fail[child]]
+                queue.append(child)
+
+    def scan(self, words):
+        """
+        Find every phrase in a word list.
+
+        Args:
+            words (list): Words from phrase_words()
+
+        Returns:
+            Counter: keyword -> number of occurrences
+        """
+        goto, fail, output = self._goto, self._fail, self._output
+        found = Counter()
+        state = 0
+        for word in words:
+            while state and word not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(word, 0)
+            if output[state]:
+                found.update(output[state])
+        return found
+
+
+def _synonym_patterns(synonyms):
+    patterns = {}
+    for alias, keyword in synonyms.items():
+        words = tuple(phrase_words(alias))
+        if words:
+            patterns[words] = keyword
+    return patterns
+
+
+@lru_cache(maxsize=8)
+def _dictionary(synonyms_key):
+    """(matcher for the synonym dictionary alone, single-word aliases)"""
+    patterns = _synonym_patterns(dict(synonyms_key))
+    single_words = frozenset(words[0] for words in patterns if len(words) == 1)
+    return PhraseMatcher(patterns), single_words
+
+
+def _synonyms_key(synonyms):
+    return tuple(sorted(synonyms.items()))
+
+
+def mine_phrases(words, min_count=MIN_PHRASE_COUNT, max_words=MAX_PHRASE_WORDS):
+    """
+    Count the bigrams and trigrams of a word list that repeat.
+
+    An n-gram qualifies if none of its words is a stop word, a bare number
+    or a single character.
+
+    Returns:
+        Counter: phrase ("word word") -> count, only phrases seen at least
+        min_count times
+    """
+    stop_words = STOP_WORDS
+    usable = [
+        len(word) > 1 and word not in stop_words and not word.isdigit()
+        for word in words
+    ]
+    counts = Counter()
+    for size in range(2, max_words + 1):
+        for start in range(len(words) - size + 1):
+            if all(usable[start:start + size]):
+                counts[" ".join(words[start:start + size])] += 1
+    return Counter({phrase: count for phrase, count in counts.items() if count >= min_count})
+
+
+def job_terms(text, synonyms, tokens=None):
+    """
+    Keyword counts of a job description: words, dictionary phrases and
+    aliases (as their keyword), and mined phrases.
+
+    Args:
+        text (str): Job description
+        synonyms (dict): alias -> keyword dictionary (SKILL_SYNONYMS)
+        tokens (list): Optional precomputed tokenizer.tokenize(text)
+
+    Returns:
+        Counter: keyword -> count
+    """
+    matcher, single_words = _dictionary(_synonyms_key(synonyms))
+    if tokens is None:
+        tokens = tokenize(text)
+    words = phrase_words(text)
+
+    # Dictionary words are counted by the automaton, under their keyword
+    # (tokens may carry a sentence-final '.', phrase words never do)
+    counts = Counter(token for token in tokens if token.rstrip(".") not in single_words)
+    counts.update(matcher.scan(words))
+    for phrase, count in mine_phrases(words).items():
+        if tuple(phrase.split(" ")) not in matcher.patterns:
+            counts[phrase] += count
+    return counts
+
+
+def phrase_terms(text, synonyms):
+    """
+    Every phrase keyword a text could match, independent of the corpus:
+    its dictionary phrases and aliases (as their keyword) plus all its
+    bigrams and trigrams that qualify as mined phrases.
+
+    resume_phrases() finds the subset of these that jobs are indexed with;
+    storing the full set lets a resume be matched against phrases mined
+    later without its text (see resume_library.py).
+
+    Returns:
+        set: Phrase keywords
+    """
+    matcher, _ = _dictionary(_synonyms_key(synonyms))
+    words = phrase_words(text)
+    return set(matcher.scan(words)).union(mine_phrases(words, min_count=1))
+
+
+class CorpusMatcher:
+    """
+    The phrase automaton of a user's corpus at a revision: a base
+    PhraseMatcher plus one for the phrases added since it was compiled.
+    """
+
+    def __init__(self, revision, base, added=None):
+        self.revision = revision
+        self.base = base
+        self.added = added or PhraseMatcher({})
+
+    def scan(self, words):
+        """Find every phrase in a word list (see PhraseMatcher.scan)"""
+        found = self.base.scan(words)
+        if self.added.patterns:
+            found.update(self.added.scan(words))
+        return found
+
+    def extend(self, revision, phrases):
+        """
+        Return a matcher that also finds phrases, or None if that would put
+        more than MAX_ADDED_PHRASES in the second automaton.
+        """
+        patterns = dict(self.added.patterns)
+        for phrase in phrases:
+            words = tuple(phrase.split(" "))
+            if words not in self.base.patterns:
+                patterns[words] = phrase
+        if len(patterns) > MAX_ADDED_PHRASES:
+            return None
+        added = self.added if len(patterns) == len(self.added.patterns) else PhraseMatcher(patterns)
+        return CorpusMatcher(revision, self.base, added)
+
+
+def build_matcher(cur, synonyms, user_id):
+    """Compile the synonym dictionary and every phrase indexed for any of a user's jobs"""
+    patterns = {}
+    cur.execute("SELECT phrase FROM corpus_phrases WHERE user_id = ?", (user_id,))
+    for (phrase,) in cur:
+        patterns[tuple(phrase.split(" "))] = phrase
+    patterns.update(_synonym_patterns(synonyms))
+    return PhraseMatcher(patterns)
+
+
+def get_matcher(cur, synonyms, user_id, cache_key=None):
+    """
+    Return the CorpusMatcher of a user's corpus, extended with the phrases
+    added since the cached one (or compiled afresh)
+    """
+    revision = scoring_engine.corpus_revision(cur, user_id)
+    key = (cache_key, user_id, _synonyms_key(synonyms))
+    with _matchers_lock:
+        cached = _matchers.get(key)
+    if cached is not None and cached.revision == revision:
+        return cached
+
+    matcher = None
+    if cached is not None:
+        cur.execute(
+            "SELECT phrase FROM corpus_phrases WHERE user_id = ? AND revision > ?",
+            (user_id, cached.revision)
+        )
+        matcher = cached.extend(revision, [phrase for (phrase,) in cur.fetchall()])
+    if matcher is None:
+        matcher = CorpusMatcher(revision, build_matcher(cur, synonyms, user_id))
+    with _matchers_lock:
+        _matchers[key] = matcher
+    return matcher
+
+
+def resume_phrases(cur, resume_text, synonyms, user_id, cache_key=None):
+    """
+    Phrase and alias keywords found in a resume, in one automaton pass.
+
+    Args:
+        cur: Database cursor
+        resume_text (str): Full resume text
+        synonyms (dict): alias -> keyword dictionary (SKILL_SYNONYMS)
+        user_id (int): Owner of the jobs whose phrases are matched
+        cache_key: Identifies the database for the per-process matcher cache
+
+    Returns:
+        list: Keywords found, sorted
+    """
+    matcher = get_matcher(cur, synonyms, user_id, cache_key)
+    return sorted(matcher.scan(phrase_words(resume_text or "")))
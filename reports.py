@@ -0,0 +1,169 @@
+"""
+ATS Reports
+===========
+Streamed ATS analysis reports in several formats, one at a time or many
+packed into a ZIP archive.
+
+A report is a plain dict assembled by app.build_report: the job, its ATS
+score, matched / missing keywords, improvement suggestions and recent
+analysis history. Formats (FORMATS):
+- txt:  plain-text report (templates/reports/report.txt)
+- md:   Markdown (templates/reports/report.md)
+- html: standalone page laid out for printing or saving as PDF
+        (templates/reports/report.html, no external assets)
+- csv:  one section,item,value row per fact
+- json: the report dict itself
+
+Every format is produced by a generator - text formats with Jinja's
+Template.generate, CSV through job_io.write_records, JSON with
+JSONEncoder.iterencode - and regrouped into CHUNK_SIZE pieces, so a
+response starts before the report is finished. zip_reports writes the
+archive to an unseekable sink and yields its bytes as they are produced:
+however many jobs are exported, only the report being written is in
+memory, never the archive.
+"""
+
+import json
+import zipfile
+
+from werkzeug.utils import secure_filename
+
+import job_io
+
+# Format -> (mimetype, template); formats without a template are built in code
+FORMATS = {
+    'txt': ('text/plain', "reports/report.txt"),
+    'md': ('text/markdown', "reports/report.md"),
+    'html': ('text/html', "reports/report.html"),
+    'csv': ('text/csv', None),
+    'json': ('application/json', None),
+}
+
+# Characters collected before a chunk is yielded
+CHUNK_SIZE = 16 * 1024
+
+CSV_COLUMNS = ['section', 'item', 'value']
+
+
+def report_filename(report, fmt):
+    """ASCII-safe file name of a report, e.g. ATS_Analysis_Acme_Corp_12.md"""
+    job = report['job']
+    name = secure_filename(f"ATS_Analysis_{job['company']}") or "ATS_Analysis"
+    return f"{name}_{job['id']}.{fmt}"
+
+
+def _buffered(chunks):
+    """Regroup small text chunks into pieces of about CHUNK_SIZE characters"""
+    pending = []
+    size = 0
+    for chunk in chunks:
+        pending.append(chunk)
+        size += len(chunk)
+        if size >= CHUNK_SIZE:
+            yield "".join(pending)
+            pending = []
+            size = 0
+    if pending:
+        yield "".join(pending)
+
+
+def _csv_rows(report):
+    """section / item / value rows of a report"""
+    job = report['job']
+    for field in ('id', 'company', 'role', 'status', 'date_applied', 'interview_date'):
+        yield {'section': 'job', 'item': field, 'value': job[field]}
+
+    analysis = report['analysis']
+    yield {'section': 'score', 'item': 'ats_score', 'value': report['ats_score']}
+    yield {'section': 'score', 'item': 'score_mode', 'value': analysis['score_mode'] if analysis else None}
+    yield {'section': 'score', 'item': 'analyzed_at', 'value': analysis['created_at'] if analysis else None}
+
+    for section in ('matched_keywords', 'missing_keywords'):
+        for keyword in report[section]:
+            yield {'section': section, 'item': keyword, 'value': None}
+
+    suggestions = report['suggestions']
+    if suggestions:
+        yield {'section': 'suggestions', 'item': 'main_message', 'value': suggestions['main_message']}
+        for section in ('priority_actions', 'quick_wins'):
+            for number, text in enumerate(suggestions[section], 1):
+                yield {'section': section, 'item': number, 'value': text}
+
+    for entry in report['history']:
+        yield {'section': 'history', 'item': entry['created_at'], 'value': entry['ats_score']}
+
+    yield {'section': 'report', 'item': 'generated_at', 'value': report['generated_at']}
+
+
+def render_report(report, fmt, environment):
+    """
+    Stream one report.
+
+    Args:
+        report (dict): Report data (see app.build_report)
+        fmt (str): One of FORMATS
+        environment: Jinja environment that loads the report templates
+            (the app's jinja_env)
+
+    Yields:
+        str: Report text in chunks of about CHUNK_SIZE characters
+    """
+    template = FORMATS[fmt][1]
+    if template:
+        chunks = environment.get_template(template).generate(report=report)
+    elif fmt == 'csv':
+        chunks = job_io.write_records(_csv_rows(report), CSV_COLUMNS, 'csv')
+    else:
+        chunks = json.JSONEncoder(indent=2, ensure_ascii=False).iterencode(report)
+    return _buffered(chunks)
+
+
+class _ArchiveSink:
+    """Write-only, unseekable file object that collects what ZipFile writes"""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        """Return and forget everything written since the last drain"""
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def zip_reports(reports, fmt, environment):
+    """
+    Stream a ZIP archive with one file per report.
+
+    The sink cannot seek, so ZipFile writes every entry with a trailing
+    data descriptor instead of patching its header afterwards, and the
+    bytes written so far can be yielded after each report chunk.
+
+    Args:
+        reports (iterable): Report dicts, consumed one at a time
+        fmt (str): One of FORMATS
+        environment: Jinja environment (see render_report)
+
+    Yields:
+        bytes: The archive, in pieces
+    """
+    sink = _ArchiveSink()
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for report in reports:
+            with archive.open(report_filename(report, fmt), "w") as entry:
+                for chunk in render_report(report, fmt, environment):
+                    entry.write(chunk.encode("utf-8"))
+                    data = sink.drain()
+                    if data:
+                        yield data
+            data = sink.drain()
+            if data:
+                yield data
+    yield sink.drain()
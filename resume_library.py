@@ -0,0 +1,163 @@
+"""
+Resume Library
+==============
+Parsed resumes stored once, so jobs can be re-scored without the PDF.
+
+An analysis only needs to know which terms a resume contains. When a
+resume is scored, its term sets are saved in the resumes table as sorted
+arrays of term ids (4 bytes per term, see vocabulary), and when a job's
+description changes its stale scores are recomputed from those arrays -
+one set intersection per resume, with no upload, PDF parsing or
+tokenizing (see app.rescore_job). Resumes belong to the user who uploaded
+them, and a job is only re-scored with its own user's resumes.
+
+Each resume keeps two term sets:
+- keyword_ids: its top keywords plus phrase terms - what the legacy score
+  intersects with a job's keywords
+- term_ids: every token plus phrase terms - what the TF-IDF / BM25 scores
+  sum weights over
+
+Phrase terms are the synonym dictionary matches and every bigram and
+trigram of the resume that could be a mined phrase (phrases.phrase_terms).
+Any phrase a job can be indexed with is one of those, so membership in
+the stored set finds exactly what phrases.resume_phrases would find with
+the resume text at hand - for phrases mined after the resume was saved
+too.
+"""
+
+from array import array
+
+import phrases
+from tokenizer import extract_keywords, tokenize
+
+# Terms per IN (...) lookup, below SQLite's host parameter limit
+_LOOKUP_CHUNK = 500
+
+
+def pack(term_ids):
+    """Sorted term ids -> BLOB"""
+    return array('I', sorted(term_ids)).tobytes()
+
+
+def unpack(blob):
+    """BLOB -> array('I') of sorted term ids"""
+    term_ids = array('I')
+    term_ids.frombytes(blob)
+    return term_ids
+
+
+def lookup_terms(cur, terms):
+    """
+    Look up the ids of terms in the vocabulary table.
+
+    Returns:
+        dict: term -> id, for the terms that have one
+    """
+    terms = list(terms)
+    found = {}
+    for start in range(0, len(terms), _LOOKUP_CHUNK):
+        chunk = terms[start:start + _LOOKUP_CHUNK]
+        cur.execute(
+            f"SELECT term, id FROM vocabulary WHERE term IN ({', '.join('?' * len(chunk))})",
+            chunk
+        )
+        found.update(cur.fetchall())
+    return found
+
+
+def encode_terms(cur, terms):
+    """
+    Encode terms as term ids, adding unseen terms to the vocabulary.
+
+    Args:
+        cur: Database cursor (caller commits)
+        terms (iterable): Terms to encode
+
+    Returns:
+        dict: term -> id
+    """
+    terms = set(terms)
+    cur.executemany("INSERT OR IGNORE INTO vocabulary (term) VALUES (?)", [(term,) for term in terms])
+    return lookup_terms(cur, terms)
+
+
+def resume_term_sets(resume_text, resume_keywords, synonyms):
+    """
+    Term sets of a resume for the resumes table.
+
+    Args:
+        resume_text (str): Full resume text
+        resume_keywords (list): Top resume keywords (see get_cached_pdf_text)
+        synonyms (dict): alias -> keyword dictionary (SKILL_SYNONYMS)
+
+    Returns:
+        tuple: (keywords, terms) - sets of terms, keywords a subset of terms
+    """
+    keywords = set(resume_keywords).union(phrases.phrase_terms(resume_text, synonyms))
+    terms = set(tokenize(resume_text)).union(keywords)
+    return keywords, terms
+
+
+def save_resume(cur, user_id, file_hash, resume_text, resume_keywords, synonyms):
+    """
+    Store the term sets of a resume, unless the user already has it.
+
+    Args:
+        cur: Database cursor (caller commits)
+        user_id (int): User who uploaded the resume
+        file_hash (str): SHA-256 of the resume PDF
+        resume_text (str): Full resume text
+        resume_keywords (list): Top resume keywords, or None to extract them
+        synonyms (dict): alias -> keyword dictionary (SKILL_SYNONYMS)
+    """
+    cur.execute("SELECT 1 FROM resumes WHERE user_id = ? AND file_hash = ?", (user_id, file_hash))
+    if cur.fetchone():
+        return
+    if resume_keywords is None:
+        resume_keywords = extract_keywords(resume_text)
+    keywords, terms = resume_term_sets(resume_text, resume_keywords, synonyms)
+    term_ids = encode_terms(cur, terms)
+    cur.execute(
+        "INSERT INTO resumes (user_id, file_hash, keyword_ids, term_ids) VALUES (?, ?, ?, ?)",
+        (user_id, file_hash, pack(term_ids[term] for term in keywords), pack(term_ids.values()))
+    )
+
+
+def has_analyzed_resumes(cur, job_id, user_id):
+    """Whether any of the user's stored resumes has been analyzed against a job of theirs"""
+    cur.execute("""
+        SELECT 1 FROM analyses a
+        JOIN resumes r ON r.user_id = a.user_id AND r.file_hash = a.resume_hash
+        WHERE a.job_id = ? AND a.user_id = ?
+        LIMIT 1
+    """, (job_id, user_id))
+    return cur.fetchone() is not None
+
+
+def analyzed_resumes(cur, job_id, user_id):
+    """
+    Stored resumes of a user that have been analyzed against a job of
+    theirs, with the score mode of their latest analysis of it.
+
+    Returns:
+        list: (file_hash, score_mode, keyword_ids, term_ids) tuples ordered
+        by the time of each resume's latest analysis of the job, so the
+        most recently analyzed resume comes last; the id arrays are
+        array('I') (see unpack)
+    """
+    cur.execute("""
+        SELECT a.resume_hash, a.score_mode, r.keyword_ids, r.term_ids
+        FROM (
+            SELECT resume_hash, score_mode, created_at, id,
+                   ROW_NUMBER() OVER (PARTITION BY resume_hash ORDER BY created_at DESC, id DESC) AS recency
+            FROM analyses
+            WHERE job_id = ? AND user_id = ?
+        ) a
+        JOIN resumes r ON r.user_id = ? AND r.file_hash = a.resume_hash
+        WHERE a.recency = 1
+        ORDER BY a.created_at, a.id
+    """, (job_id, user_id, user_id))
+    return [
+        (file_hash, score_mode, unpack(keyword_ids), unpack(term_ids))
+        for file_hash, score_mode, keyword_ids, term_ids in cur.fetchall()
+    ]
@@ -0,0 +1,430 @@
+"""
+Corpus Scoring Engine
+=====================
+Weighted (TF-IDF / BM25) ATS scoring across a user's saved jobs.
+
+The legacy ATS score treats a job's 50 most frequent words as equally
+important. This engine instead weights every term of a job description by
+how rare it is across the user's job corpus, so a decisive skill that
+shows up in few postings counts for more than boilerplate every posting
+repeats.
+
+Index (maintained incrementally on every job write, see index_job_terms):
+- job_terms:    full term counts per job (no top-50 cut-off)
+- term_df:      document frequency per user and term
+- corpus_stats: per user, number of indexed jobs, total term count and a
+                revision number bumped on every change
+
+Each user's jobs form their own corpus: weights only use that user's
+document frequencies, so one user's writes never shift another user's
+scores or invalidate their cached matrix.
+
+Scoring builds a sparse term -> (job, weight) matrix (CSC layout in flat
+arrays, NumPy-backed when available) per user and caches it per process.
+A resume is scored against every job at once by summing the weights of
+the resume's terms in each job's row:
+
+    score = 100 * sum(weights of job terms found in resume) / sum(weights of all job terms)
+
+so scores stay on the familiar 0-100 scale and the 80/60 thresholds still
+apply.
+
+Writes never make a request pay for a full rebuild: when the corpus has
+moved on since the cached matrix was built, the jobs indexed since (see
+job_term_revisions) are scored exactly from their own index rows, the
+rest from the cached matrix, and a fresh matrix is built on a background
+thread. Until it is swapped in, the other jobs' weights use the slightly
+older document frequencies. Only a first build, or one after more than
+MAX_STALE_JOBS changed jobs (e.g. a bulk import), happens inline.
+
+Modes:
+- legacy: unweighted top-50 keyword percentage (calculate_ats_score)
+- tfidf:  weight = tf * (ln((1 + N) / (1 + df)) + 1)
+- bm25:   weight = idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * len / avg_len)),
+          idf = ln(1 + (N - df + 0.5) / (df + 0.5))
+"""
+
+import math
+import threading
+from array import array
+
+import db
+from tokenizer import load_numpy, tokenize
+
+SCORE_MODES = ('legacy', 'tfidf', 'bm25')
+
+# BM25 parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Jobs indexed since the cached matrix was built that are scored one by
+# one; beyond this the matrix is rebuilt inline instead
+MAX_STALE_JOBS = 200
+
+# (cache key, user_id, mode) -> latest TermMatrix built for the user
+_matrices = {}
+_matrices_lock = threading.Lock()
+# Keys whose matrix is being rebuilt on a background thread
+_rebuilding = set()
+
+
+# ============================================================
+# INCREMENTAL INDEX
+# ============================================================
+
+def index_job_terms(cur, job_id, term_counts):
+    """
+    Replace the indexed terms of a job and update corpus statistics.
+
+    Only the difference between the old and new term sets touches the
+    owner's term_df, so an edit costs O(terms in the job), not a corpus
+    rebuild.
+
+    Args:
+        cur: Database cursor (caller commits)
+        job_id (int): Job identifier
+        term_counts (dict): term -> count for the job's current description
+    """
+    cur.execute("SELECT user_id FROM jobs WHERE id = ?", (job_id,))
+    user_id = cur.fetchone()[0]
+    cur.execute("SELECT term, tf FROM job_terms WHERE job_id = ?", (job_id,))
+    old_counts = dict(cur.fetchall())
+
+    removed = [term for term in old_counts if term not in term_counts]
+    added = [term for term in term_counts if term not in old_counts]
+
+    # Revision first: new phrases in term_df are stamped with it (corpus_phrases)
+    old_length = sum(old_counts.values())
+    new_length = sum(term_counts.values())
+    cur.execute(
+        """
+        UPDATE corpus_stats
+        SET documents = documents + ?, total_length = total_length + ?, revision = revision + 1
+        WHERE user_id = ?
+        """,
+        ((new_length > 0) - (old_length > 0), new_length - old_length, user_id)
+    )
+    cur.executemany(
+        "UPDATE term_df SET df = df - 1 WHERE user_id = ? AND term = ?",
+        [(user_id, term) for term in removed]
+    )
+    cur.executemany(
+        """
+        INSERT INTO term_df (user_id, term, df) VALUES (?, ?, 1)
+        ON CONFLICT (user_id, term) DO UPDATE SET df = df + 1
+        """,
+        [(user_id, term) for term in added]
+    )
+    if removed:
+        cur.execute("DELETE FROM term_df WHERE user_id = ? AND df <= 0", (user_id,))
+
+    cur.execute("DELETE FROM job_terms WHERE job_id = ?", (job_id,))
+    cur.executemany(
+        "INSERT INTO job_terms (job_id, term, tf) VALUES (?, ?, ?)",
+        [(job_id, term, count) for term, count in term_counts.items()]
+    )
+    _record_indexed(cur, user_id, [job_id])
+
+
+def index_new_jobs_terms(cur, job_term_counts, user_id):
+    """
+    Index the terms of many jobs that have never been indexed (bulk import).
+
+    Same effect as index_job_terms for each job, but with one executemany
+    per table and one corpus_stats update for the whole batch.
+
+    Args:
+        cur: Database cursor (caller commits)
+        job_term_counts (dict): job_id -> {term: count}
+        user_id (int): Owner of all the jobs
+    """
+    document_frequency = {}
+    for term_counts in job_term_counts.values():
+        for term in term_counts:
+            document_frequency[term] = document_frequency.get(term, 0) + 1
+
+    # Revision first: new phrases in term_df are stamped with it (corpus_phrases)
+    lengths = [sum(term_counts.values()) for term_counts in job_term_counts.values()]
+    cur.execute(
+        """
+        UPDATE corpus_stats
+        SET documents = documents + ?, total_length = total_length + ?, revision = revision + 1
+        WHERE user_id = ?
+        """,
+        (sum(1 for length in lengths if length > 0), sum(lengths), user_id)
+    )
+
+    cur.executemany(
+        "INSERT INTO job_terms (job_id, term, tf) VALUES (?, ?, ?)",
+        [(job_id, term, count)
+         for job_id, term_counts in job_term_counts.items()
+         for term, count in term_counts.items()]
+    )
+    cur.executemany(
+        """
+        INSERT INTO term_df (user_id, term, df) VALUES (?, ?, ?)
+        ON CONFLICT (user_id, term) DO UPDATE SET df = df + excluded.df
+        """,
+        [(user_id, term, df) for term, df in document_frequency.items()]
+    )
+    _record_indexed(cur, user_id, job_term_counts)
+
+
+def _record_indexed(cur, user_id, job_ids):
+    """Stamp freshly indexed jobs with the user's new corpus revision"""
+    revision = corpus_revision(cur, user_id)
+    cur.executemany(
+        "INSERT OR REPLACE INTO job_term_revisions (job_id, user_id, revision) VALUES (?, ?, ?)",
+        [(job_id, user_id, revision) for job_id in job_ids]
+    )
+
+
+def corpus_revision(cur, user_id):
+    """Return the current revision of a user's corpus (changes on every indexed write)"""
+    cur.execute("SELECT revision FROM corpus_stats WHERE user_id = ?", (user_id,))
+    return cur.fetchone()[0]
+
+
+# ============================================================
+# SPARSE JOB-TERM MATRIX
+# ============================================================
+
+class TermMatrix:
+    """
+    Job-term weight matrix in compressed sparse column layout.
+
+    Column c (term self.terms[c]) holds the jobs containing that term in
+    job_rows[indptr[c]:indptr[c + 1]] with matching weights. Row totals
+    (the best possible score of each job) are precomputed.
+    """
+
+    def __init__(self, revision, job_ids, terms, indptr, job_rows, weights, row_totals):
+        self.revision = revision
+        self.job_ids = job_ids
+        self.job_index = {job_id: row for row, job_id in enumerate(job_ids)}
+        self.terms = terms
+        self.indptr = indptr
+        self.job_rows = job_rows
+        self.weights = weights
+        self.row_totals = row_totals
+
+    def score(self, resume_terms):
+        """
+        Score a resume against every job in the matrix.
+
+        Args:
+            resume_terms (iterable): Unique resume terms
+
+        Returns:
+            list: 0-100 integer score per job, in self.job_ids order
+        """
+        columns = [self.terms[term] for term in resume_terms if term in self.terms]
+        totals = self.row_totals
+
+        numpy = load_numpy()
+        if numpy is not None:
+            if columns:
+                rows = numpy.concatenate([self.job_rows[self.indptr[c]:self.indptr[c + 1]] for c in columns])
+                weights = numpy.concatenate([self.weights[self.indptr[c]:self.indptr[c + 1]] for c in columns])
+                found = numpy.bincount(rows, weights=weights, minlength=len(self.job_ids))
+            else:
+                found = numpy.zeros(len(self.job_ids))
+            safe_totals = numpy.where(totals > 0, totals, 1.0)
+            scores = numpy.where(totals > 0, found * 100.0 / safe_totals, 0.0)
+            return [int(score + 1e-9) for score in scores.tolist()]
+
+        found = [0.0] * len(self.job_ids)
+        for c in columns:
+            for i in range(self.indptr[c], self.indptr[c + 1]):
+                found[self.job_rows[i]] += self.weights[i]
+        return [
+            int(found[row] * 100.0 / totals[row] + 1e-9) if totals[row] > 0 else 0
+            for row in range(len(self.job_ids))
+        ]
+
+
+def _term_weight(mode, tf, df, documents, length, average_length):
+    if mode == 'tfidf':
+        return tf * (math.log((1 + documents) / (1 + df)) + 1)
+    idf = math.log(1 + (documents - df + 0.5) / (df + 0.5))
+    norm = BM25_K1 * (1 - BM25_B + BM25_B * length / average_length) if average_length else BM25_K1
+    return idf * tf * (BM25_K1 + 1) / (tf + norm)
+
+
+def build_matrix(cur, mode, user_id):
+    """Build the TermMatrix for mode ('tfidf' or 'bm25') from a user's index"""
+    cur.execute("SELECT documents, total_length, revision FROM corpus_stats WHERE user_id = ?", (user_id,))
+    documents, total_length, revision = cur.fetchone()
+    average_length = total_length / documents if documents else 0.0
+
+    cur.execute("""
+        SELECT t.job_id, SUM(t.tf) FROM jobs j JOIN job_terms t ON t.job_id = j.id
+        WHERE j.user_id = ? GROUP BY t.job_id ORDER BY t.job_id
+    """, (user_id,))
+    lengths = cur.fetchall()
+    job_ids = [job_id for job_id, length in lengths]
+    job_index = {job_id: row for row, job_id in enumerate(job_ids)}
+    job_lengths = [length for job_id, length in lengths]
+
+    cur.execute("SELECT term, df FROM term_df WHERE user_id = ?", (user_id,))
+    document_frequency = dict(cur.fetchall())
+
+    # Group postings by term (column)
+    postings = {}
+    cur.execute("""
+        SELECT t.term, t.job_id, t.tf FROM jobs j JOIN job_terms t ON t.job_id = j.id
+        WHERE j.user_id = ?
+    """, (user_id,))
+    for term, job_id, tf in cur:
+        postings.setdefault(term, []).append((job_id, tf))
+
+    terms = {}
+    indptr = array('l', [0])
+    job_rows = array('l')
+    weights = array('d')
+    row_totals = array('d', [0.0] * len(job_ids))
+    for term, entries in postings.items():
+        terms[term] = len(terms)
+        df = document_frequency.get(term, len(entries))
+        for job_id, tf in entries:
+            row = job_index[job_id]
+            weight = _term_weight(mode, tf, df, documents, job_lengths[row], average_length)
+            job_rows.append(row)
+            weights.append(weight)
+            row_totals[row] += weight
+        indptr.append(len(job_rows))
+
+    numpy = load_numpy()
+    if numpy is not None:
+        indptr = numpy.array(indptr, dtype=numpy.int64)
+        job_rows = numpy.array(job_rows, dtype=numpy.int64)
+        weights = numpy.array(weights, dtype=numpy.float64)
+        row_totals = numpy.array(row_totals, dtype=numpy.float64)
+
+    return TermMatrix(revision, job_ids, terms, indptr, job_rows, weights, row_totals)
+
+
+def job_term_weights(cur, job_id, mode):
+    """
+    Term weights of a single job, read straight from the index tables.
+
+    The same weights as the job's row of the TermMatrix, so the score of a
+    resume against this one job is 100 * (weights of its terms) / (all
+    weights) without building the matrix.
+
+    Returns:
+        dict: term -> weight
+    """
+    cur.execute("""
+        SELECT c.user_id, c.documents, c.total_length
+        FROM jobs j JOIN corpus_stats c ON c.user_id = j.user_id
+        WHERE j.id = ?
+    """, (job_id,))
+    user_id, documents, total_length = cur.fetchone()
+    average_length = total_length / documents if documents else 0.0
+
+    cur.execute("""
+        SELECT t.term, t.tf, COALESCE(d.df, 1)
+        FROM job_terms t
+        LEFT JOIN term_df d ON d.user_id = ? AND d.term = t.term
+        WHERE t.job_id = ?
+    """, (user_id, job_id))
+    rows = cur.fetchall()
+    length = sum(tf for term, tf, df in rows)
+    return {
+        term: _term_weight(mode, tf, df, documents, length, average_length)
+        for term, tf, df in rows
+    }
+
+
+def job_score(cur, job_id, mode, resume_terms):
+    """Score a resume against one job from its index rows, exactly (no matrix)"""
+    weights = job_term_weights(cur, job_id, mode)
+    total = sum(weights.values())
+    found = sum(weight for term, weight in weights.items() if term in resume_terms)
+    return int(found * 100.0 / total + 1e-9) if total > 0 else 0
+
+
+def _rebuild(cache_key, mode, user_id):
+    """Build a user's matrix on its own connection and swap it into the cache"""
+    try:
+        conn = db.connect(cache_key)
+        try:
+            matrix = build_matrix(conn.cursor(), mode, user_id)
+        finally:
+            conn.close()
+        with _matrices_lock:
+            current = _matrices.get((cache_key, user_id, mode))
+            if current is None or current.revision < matrix.revision:
+                _matrices[(cache_key, user_id, mode)] = matrix
+    finally:
+        with _matrices_lock:
+            _rebuilding.discard((cache_key, user_id, mode))
+
+
+def get_matrix(cur, mode, user_id, cache_key):
+    """
+    Return a TermMatrix of a user for mode and the jobs it is stale for.
+
+    A current cached matrix is returned as is. A cached matrix of an older
+    revision is returned along with the ids of the jobs indexed since (at
+    most MAX_STALE_JOBS), and a rebuild is started on a background thread;
+    cache_key must then be the database path. Without a usable cached
+    matrix one is built inline.
+
+    Returns:
+        tuple: (TermMatrix, set of job ids to score without it)
+    """
+    revision = corpus_revision(cur, user_id)
+    key = (cache_key, user_id, mode)
+    with _matrices_lock:
+        matrix = _matrices.get(key)
+    if matrix is not None and matrix.revision == revision:
+        return matrix, set()
+
+    if matrix is not None and cache_key is not None:
+        cur.execute(
+            "SELECT job_id FROM job_term_revisions WHERE user_id = ? AND revision > ? LIMIT ?",
+            (user_id, matrix.revision, MAX_STALE_JOBS + 1)
+        )
+        stale = {row[0] for row in cur.fetchall()}
+        if len(stale) <= MAX_STALE_JOBS:
+            with _matrices_lock:
+                start = key not in _rebuilding
+                _rebuilding.add(key)
+            if start:
+                threading.Thread(target=_rebuild, args=(cache_key, mode, user_id), daemon=True).start()
+            return matrix, stale
+
+    matrix = build_matrix(cur, mode, user_id)
+    with _matrices_lock:
+        _matrices[key] = matrix
+    return matrix, set()
+
+
+def weighted_scores(cur, resume_text, mode, user_id, cache_key=None, resume_terms=None):
+    """
+    Score a resume against every indexed job of a user with TF-IDF or BM25 weights.
+
+    Args:
+        cur: Database cursor
+        resume_text (str): Full resume text (all terms are used, not just the top 50)
+        mode (str): 'tfidf' or 'bm25'
+        user_id (int): Owner of the jobs (and corpus) to score against
+        cache_key: Database path, for the per-process matrix cache and its
+            background rebuilds
+        resume_terms (set): Optional precomputed resume terms (e.g. with
+            phrases added); all tokens of resume_text if omitted
+
+    Returns:
+        dict: job_id -> 0-100 integer score
+    """
+    if mode not in ('tfidf', 'bm25'):
+        raise ValueError(f"Unknown weighted score mode: {mode}")
+    if resume_terms is None:
+        resume_terms = set(tokenize(resume_text))
+    matrix, stale = get_matrix(cur, mode, user_id, cache_key)
+    scores = dict(zip(matrix.job_ids, matrix.score(resume_terms)))
+    for job_id in stale:
+        scores[job_id] = job_score(cur, job_id, mode, resume_terms)
+    return scores
@@ -0,0 +1,167 @@
+"""
+Background Analysis Tasks
+=========================
+Runs CPU-bound resume analyses (PDF parsing and scoring) outside the web
+request.
+
+Task state lives in the analysis_tasks table, so any web worker can report
+the status of a task submitted by another. The work itself runs on a local
+process pool (ANALYSIS_WORKERS processes, created on first use), so PyPDF2
+uses every core instead of blocking web workers.
+
+A task function receives its own database connection followed by the
+arguments given to submit(), and returns a JSON-serializable result.
+Raising ValueError marks the task failed with that message (shown to the
+user as is); any other exception is reported as an unexpected error.
+
+With ASYNC_ANALYSIS disabled, tasks run inline inside submit() - handy for
+development and tests.
+
+Each task is timed (task and task_db stages) and the worker's metrics are
+flushed to the database when it ends, so /metrics includes them.
+"""
+
+import json
+import os
+import uuid
+
+import db
+import metrics
+
+# Finished tasks are kept this long so results can still be viewed
+TASK_RETENTION_DAYS = 1
+
+_executor = None
+
+
+def _get_executor(max_workers):
+    """Create the process pool on first use"""
+    global _executor
+    if _executor is None:
+        from concurrent.futures import ProcessPoolExecutor  # only needed once a task is queued
+        # Forked workers must not re-report the parent's metrics
+        _executor = ProcessPoolExecutor(max_workers=max_workers or os.cpu_count(), initializer=metrics.reset)
+    return _executor
+
+
+def shutdown():
+    """Stop the process pool (waiting for running tasks)"""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown()
+        _executor = None
+
+
+def create_task(conn, job_id, file_hash, user_id):
+    """
+    Record a new queued task and purge expired finished ones.
+
+    Args:
+        conn: Database connection (caller commits)
+        job_id (int): Job being analyzed
+        file_hash (str): SHA-256 of the uploaded resume ('' for tasks
+            without one, e.g. re-scoring an edited job)
+        user_id (int): Owner of the job
+
+    Returns:
+        str: New task id
+    """
+    task_id = uuid.uuid4().hex
+    conn.execute(
+        "DELETE FROM analysis_tasks WHERE finished_at < julianday('now') - ?",
+        (TASK_RETENTION_DAYS,)
+    )
+    conn.execute(
+        """
+        INSERT INTO analysis_tasks (id, job_id, file_hash, user_id, status, created_at)
+        VALUES (?, ?, ?, ?, 'queued', julianday('now'))
+        """,
+        (task_id, job_id, file_hash, user_id)
+    )
+    return task_id
+
+
+def pending_files(conn):
+    """Uploads (file hashes) that queued or running tasks still have to read"""
+    rows = conn.execute(
+        "SELECT DISTINCT file_hash FROM analysis_tasks WHERE status IN ('queued', 'running') AND file_hash != ''"
+    )
+    return {row[0] for row in rows}
+
+
+def get_task(conn, task_id, user_id):
+    """
+    Look up a task of a user.
+
+    Returns:
+        dict: {'id', 'job_id', 'status', 'result', 'error'} or None if unknown
+        (or another user's);
+        status is queued, running, done or failed
+    """
+    row = conn.execute(
+        "SELECT id, job_id, status, result, error FROM analysis_tasks WHERE id = ? AND user_id = ?",
+        (task_id, user_id)
+    ).fetchone()
+    if row is None:
+        return None
+    return {
+        'id': row[0],
+        'job_id': row[1],
+        'status': row[2],
+        'result': json.loads(row[3]) if row[3] else None,
+        'error': row[4],
+    }
+
+
+def _finish(conn, task_id, status, result=None, error=None):
+    conn.execute(
+        """
+        UPDATE analysis_tasks
+        SET status = ?, result = ?, error = ?, finished_at = julianday('now')
+        WHERE id = ?
+        """,
+        (status, json.dumps(result) if result is not None else None, error, task_id)
+    )
+    conn.commit()
+
+
+def run_task(db_path, task_id, func, args):
+    """Run one task with its own connection and record the outcome"""
+    conn = db.connect(db_path)
+    try:
+        timings = metrics.begin()
+        try:
+            conn.execute("UPDATE analysis_tasks SET status = 'running' WHERE id = ?", (task_id,))
+            conn.commit()
+            try:
+                result = func(conn, *args)
+            except ValueError as e:
+                conn.rollback()
+                _finish(conn, task_id, 'failed', error=str(e))
+            except Exception as e:
+                conn.rollback()
+                _finish(conn, task_id, 'failed', error=f"An unexpected error occurred: {str(e)}")
+            else:
+                _finish(conn, task_id, 'done', result=result)
+        finally:
+            metrics.end()
+        
+        metrics.record_stage('task', timings.elapsed())
+        metrics.record_stage('task_db', timings.db_seconds)
+        metrics.flush(conn)
+    finally:
+        conn.close()
+
+
+def submit(config, task_id, func, *args):
+    """
+    Queue func(conn, *args) for task_id on the process pool.
+
+    func must be a module-level function so it can be sent to a worker
+    process. The task row must already be committed (see create_task).
+    """
+    db_path = config.get("DATABASE", db.DEFAULT_DATABASE)
+    if not config.get("ASYNC_ANALYSIS", True):
+        run_task(db_path, task_id, func, args)
+        return
+    _get_executor(config.get("ANALYSIS_WORKERS")).submit(run_task, db_path, task_id, func, args)
@@ -0,0 +1,212 @@
+"""
+Keyword Tokenizer
+=================
+Turns job descriptions and resumes into ATS keywords.
+
+A keyword is a run of lowercase letters, digits, '+', '#' or '.' (so
+"c++", "c#" and "node.js" survive) that is at least min_length characters
+long and is not a common English stop word. Everything else in the text
+acts as a separator.
+
+The patterns are compiled once per min_length and the stop list is a
+module-level frozenset, so tokenizing is a single regex scan plus a set
+lookup per token. tokenize_many / keyword_frequencies_many process many
+documents in one call, and Vocabulary encodes token sets as compact
+sorted term-id arrays (NumPy-backed when NumPy is installed).
+"""
+
+import re
+from array import array
+from collections import Counter
+from functools import lru_cache
+
+
+# Keywords kept per document (more than this is mostly noise)
+TOP_KEYWORDS = 50
+
+# Common English words to ignore
+STOP_WORDS = frozenset({
+    'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for',
+    'of', 'with', 'by', 'from', 'up', 'about', 'as', 'is', 'are', 'be',
+    'been', 'being', 'have', 'has', 'had', 'do', 'does', 'did', 'will',
+    'would', 'could', 'should', 'may', 'might', 'can', 'this', 'that',
+    'these', 'those', 'i', 'you', 'he', 'she', 'it', 'we', 'they', 'your',
+    'our', 'their', 'what', 'which', 'who', 'when', 'where', 'why', 'how',
+    'all', 'each', 'every', 'both', 'few', 'more', 'most', 'other', 'some',
+    'any', 'much', 'many', 'only', 'own', 'same', 'so', 'than', 'too',
+    'very', 'just', 'such', 'no', 'not', 'nor', 'also', 'if', 'because',
+    'while', 'although', 'after', 'before', 'during', 'through',
+    'between', 'within', 'without', 'job', 'position', 'role', 'experience'
+})
+
+
+@lru_cache(maxsize=None)
+def load_numpy():
+    """
+    Return the numpy module, or None if NumPy is not installed.
+
+    NumPy is imported on first use rather than at module load: it takes
+    longer to import than the rest of the app, and most processes (web
+    workers serving pages) never need it.
+    """
+    try:
+        import numpy
+    except ImportError:  # NumPy is optional
+        return None
+    return numpy
+
+
+@lru_cache(maxsize=None)
+def _word_pattern(min_length):
+    """
+    Compiled pattern matching whole words of at least min_length characters.
+
+    Lowercased text is split on every character outside [a-z0-9+#.], so a
+    word is a maximal run of those characters. Requiring the length inside
+    the pattern skips short words without creating strings for them.
+    """
+    return re.compile(r'[a-z0-9+#.]{%d,}' % max(min_length, 1))
+
+
+def tokenize(text, min_length=3):
+    """
+    Split text into keyword tokens, in document order.
+
+    Args:
+        text (str): Text to tokenize
+        min_length (int): Minimum word length to consider (default 3)
+
+    Returns:
+        list: Tokens (lowercase, stop words removed, duplicates kept)
+    """
+    stop_words = STOP_WORDS
+    return [
+        word for word in _word_pattern(min_length).findall(text.lower())
+        if word not in stop_words
+    ]
+
+
+def keyword_frequencies(text, min_length=3, limit=TOP_KEYWORDS):
+    """
+    Extract meaningful keywords from text together with their frequencies.
+
+    Args:
+        text (str): Text to extract keywords from
+        min_length (int): Minimum word length to consider (default 3)
+        limit (int): Number of keywords to keep (default 50)
+
+    Returns:
+        list: (keyword, count) pairs sorted by frequency (most common first);
+        ties keep the order in which the words first appear
+    """
+    return Counter(tokenize(text, min_length)).most_common(limit)
+
+
+def extract_keywords(text, min_length=3, limit=TOP_KEYWORDS):
+    """
+    Extract meaningful keywords from text using simple frequency analysis.
+
+    Args:
+        text (str): Text to extract keywords from
+        min_length (int): Minimum word length to consider (default 3)
+        limit (int): Number of keywords to keep (default 50)
+
+    Returns:
+        list: Keywords sorted by frequency (most common first)
+    """
+    return [word for word, count in keyword_frequencies(text, min_length, limit)]
+
+
+def tokenize_many(texts, min_length=3):
+    """
+    Tokenize many documents in one call.
+
+    Args:
+        texts (iterable): Documents to tokenize
+        min_length (int): Minimum word length to consider (default 3)
+
+    Returns:
+        list: One token list per document
+    """
+    findall = _word_pattern(min_length).findall
+    stop_words = STOP_WORDS
+    return [
+        [word for word in findall(text.lower()) if word not in stop_words]
+        for text in texts
+    ]
+
+
+def keyword_frequencies_many(texts, min_length=3, limit=TOP_KEYWORDS):
+    """
+    Extract (keyword, count) pairs for many documents in one call.
+
+    Args:
+        texts (iterable): Documents to extract keywords from
+        min_length (int): Minimum word length to consider (default 3)
+        limit (int): Number of keywords to keep per document (default 50)
+
+    Returns:
+        list: One keyword_frequencies() result per document
+    """
+    return [
+        Counter(tokens).most_common(limit)
+        for tokens in tokenize_many(texts, min_length)
+    ]
+
+
+class Vocabulary:
+    """
+    Maps keywords to dense integer term ids.
+
+    Encoded documents are sorted arrays of unique term ids, which are far
+    smaller than sets of strings and can be intersected or loaded into a
+    sparse matrix directly.
+    """
+
+    def __init__(self, terms=()):
+        self.term_ids = {}
+        self.terms = []
+        for term in terms:
+            self.add(term)
+
+    def __len__(self):
+        return len(self.terms)
+
+    def add(self, term):
+        """Return the id of term, assigning the next free id if it is new"""
+        term_id = self.term_ids.get(term)
+        if term_id is None:
+            term_id = self.term_ids[term] = len(self.terms)
+            self.terms.append(term)
+        return term_id
+
+    def encode(self, tokens, grow=True):
+        """
+        Encode tokens as a sorted array of unique term ids.
+
+        Args:
+            tokens (iterable): Keywords to encode
+            grow (bool): Assign ids to unseen keywords (otherwise skip them)
+
+        Returns:
+            numpy.ndarray (uint32) if NumPy is installed, else array('I')
+        """
+        if grow:
+            ids = {self.add(token) for token in tokens}
+        else:
+            term_ids = self.term_ids
+            ids = {term_ids[token] for token in tokens if token in term_ids}
+        ids = sorted(ids)
+        numpy = load_numpy()
+        if numpy is not None:
+            return numpy.array(ids, dtype=numpy.uint32)
+        return array('I', ids)
+
+    def encode_many(self, documents, grow=True):
+        """Encode many token lists (see encode)"""
+        return [self.encode(tokens, grow) for tokens in documents]
+
+    def decode(self, term_ids):
+        """Return the keywords for an array of term ids"""
+        terms = self.terms
+        return [terms[term_id] for term_id in term_ids]
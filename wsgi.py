@@ -0,0 +1,35 @@
+"""
+WSGI Entry Point
+================
+Production serving with several worker processes sharing one preloaded app.
+
+    gunicorn --preload --workers 4 --bind 0.0.0.0:8000 wsgi:app
+
+With --preload, gunicorn imports this module once in the master process:
+create_app() creates the upload folder and migrates the database there,
+then closes its SQLite connections, and every worker is forked from the
+ready app - no worker repeats the init or the imports. PyPDF2 and NumPy
+are not loaded here; they are imported by the first request (or analysis
+task) that parses a PDF or builds a score matrix, so workers that only
+serve pages never pay for them.
+
+Settings come from JOBTRACKER_* environment variables, e.g.
+JOBTRACKER_DATABASE=/var/lib/jobtracker/database.db or
+JOBTRACKER_ANALYSIS_WORKERS=2 (values are parsed as JSON when possible,
+see flask.Config.from_prefixed_env).
+
+Background analyses run on a process pool created lazily in each web
+worker; set JOBTRACKER_ANALYSIS_WORKERS so workers x pool size fits the
+machine.
+
+For development use `flask --app app run` or `python app.py` instead.
+"""
+
+from flask import Config
+
+from app import create_app
+
+settings = Config(None)
+settings.from_prefixed_env("JOBTRACKER")
+
+app = create_app(settings)